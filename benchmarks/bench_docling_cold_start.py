@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark Docling cold starts with and without a pre-provisioned artifacts directory
+
+Each scenario runs in a fresh interpreter and reports the model load time and the time
+of the first and second parse:
+
+- default: DoclingParser without artifacts, as in a fresh container (models are
+  downloaded or loaded on the first parse)
+- provisioned: DoclingParser with the directory prepared by "document-parser warmup",
+  warmed up before the first document
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Times the load and the first two parses of a PDF in a fresh interpreter
+PROBE = """
+import sys, json, time
+from src.parsers.docling_parser import DoclingParser
+artifacts, pdf_path, warm = sys.argv[1] or None, sys.argv[2], sys.argv[3] == "1"
+parser = DoclingParser(artifacts_path=artifacts)
+load = parser.warmup()["docling_load_seconds"] if warm else 0.0
+timings = []
+for _ in range(2):
+    start = time.perf_counter()
+    parser.parse(pdf_path)
+    timings.append(time.perf_counter() - start)
+print(json.dumps({"load": load, "first": timings[0], "second": timings[1]}))
+"""
+
+
+def write_sample_pdf(path: str) -> str:
+    """Write a one-page PDF with a line of text"""
+    content = b"BT /F1 18 Tf 72 720 Td (Invoice 1001: 3 items, total 42.00 EUR) Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def run_probe(artifacts: str, pdf_path: str, warm: bool) -> dict:
+    """Run one scenario in a fresh interpreter and return its timings"""
+    output = subprocess.run([sys.executable, "-c", PROBE, artifacts, pdf_path, "1" if warm else "0"],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--artifacts-dir', default=os.getenv("DOCLING_ARTIFACTS_PATH"),
+                        help='Artifacts directory prepared by "document-parser warmup" (required)')
+    args = parser.parse_args()
+    if not args.artifacts_dir:
+        parser.error('run "document-parser warmup" first and pass --artifacts-dir or set DOCLING_ARTIFACTS_PATH')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = write_sample_pdf(os.path.join(tmp_dir, "sample.pdf"))
+        rows = [
+            ("default", run_probe("", pdf_path, warm=False)),
+            ("provisioned", run_probe(args.artifacts_dir, pdf_path, warm=True)),
+        ]
+
+    print(f"\n{'scenario':>12} {'load (s)':>9} {'first parse (s)':>16} {'second parse (s)':>17}")
+    for name, timings in rows:
+        print(f"{name:>12} {timings['load']:>9.2f} {timings['first']:>16.2f} {timings['second']:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
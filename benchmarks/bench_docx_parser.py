@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-pass DOCX extraction against the previous two-pass mammoth extraction
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import mammoth
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from docx_fixtures import write_synthetic_docx
+from src.parsers.docx_parser import DocxParser
+
+
+def two_pass_parse(docx_path: str):
+    """Previous behaviour: convert to HTML, then re-read the file for raw text"""
+    with open(docx_path, 'rb') as docx_file:
+        html = mammoth.convert_to_html(docx_file).value
+    with open(docx_path, 'rb') as docx_file:
+        text = mammoth.extract_raw_text(docx_file).value
+    return html, text
+
+
+def time_call(func, path: str, repeat: int) -> float:
+    """Return the best wall time of `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sections', type=int, nargs='+', default=[10, 100, 400],
+                        help='Document sizes to benchmark, in heading sections')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    args = parser.parse_args()
+
+    docx_parser = DocxParser()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'sections':>8} {'size (KB)':>10} {'two-pass (s)':>13} {'single (s)':>11} {'speedup':>8}")
+        for sections in args.sections:
+            path = write_synthetic_docx(os.path.join(tmp_dir, f"bench_{sections}.docx"), sections=sections)
+            size_kb = os.path.getsize(path) / 1024
+
+            legacy = time_call(two_pass_parse, path, args.repeat)
+            single = time_call(docx_parser.parse, path, args.repeat)
+
+            print(f"{sections:>8} {size_kb:>10.0f} {legacy:>13.3f} {single:>11.3f} {legacy / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming DOCX engine against mammoth on large documents
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from docx_fixtures import write_synthetic_docx
+from src.parsers.docx_parser import DocxParser
+
+
+def measure(docx_parser: DocxParser, path: str):
+    """Return (wall time in seconds, peak traced memory in MB) for one parse"""
+    start = time.perf_counter()
+    docx_parser.parse(path)
+    elapsed = time.perf_counter() - start
+
+    # Measure memory in a separate run so tracing overhead does not skew the timing
+    tracemalloc.start()
+    docx_parser.parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sections', type=int, nargs='+', default=[100, 400, 1600],
+                        help='Document sizes to benchmark, in heading sections')
+    args = parser.parse_args()
+
+    mammoth_parser = DocxParser(engine="mammoth")
+    stream_parser = DocxParser(engine="stream")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rows = []
+        for sections in args.sections:
+            path = write_synthetic_docx(os.path.join(tmp_dir, f"bench_{sections}.docx"), sections=sections)
+            size_kb = os.path.getsize(path) / 1024
+            mammoth_time, mammoth_peak = measure(mammoth_parser, path)
+            stream_time, stream_peak = measure(stream_parser, path)
+            rows.append((sections, size_kb, mammoth_time, mammoth_peak, stream_time, stream_peak))
+
+        print(f"\n{'sections':>8} {'size (KB)':>10} {'mammoth (s)':>12} {'peak (MB)':>10} "
+              f"{'stream (s)':>11} {'peak (MB)':>10} {'speedup':>8}")
+        for sections, size_kb, mammoth_time, mammoth_peak, stream_time, stream_peak in rows:
+            print(f"{sections:>8} {size_kb:>10.0f} {mammoth_time:>12.3f} {mammoth_peak:>10.1f} "
+                  f"{stream_time:>11.3f} {stream_peak:>10.1f} {mammoth_time / stream_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
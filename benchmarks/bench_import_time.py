@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup time and check it stays within a budget
+
+Each measurement runs in a fresh interpreter. The check fails (exit code 1) when the
+median startup time exceeds the budget, or when importing the CLI or creating a
+DocumentProcessor loads a parser or model SDK that the run does not need.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that must only be imported by runs that use the matching backend
+HEAVY_MODULES = ("docling", "mistralai", "pymupdf4llm", "mammoth", "google.generativeai", "fitz")
+
+# Imports the CLI and creates a processor for a DOCX run, then reports the time and loaded heavy modules
+PROBE = """
+import sys, json, time, tempfile
+start = time.perf_counter()
+import src.cli
+imported = time.perf_counter() - start
+from src.document_processor import DocumentProcessor
+DocumentProcessor(output_dir=tempfile.mkdtemp(), docx_engine="stream")
+heavy = [name for name in %r if name in sys.modules]
+print(json.dumps({"import_seconds": imported, "heavy_modules": heavy}))
+"""
+
+
+def run_probe() -> dict:
+    """Run the probe in a fresh interpreter and return its report"""
+    output = subprocess.run([sys.executable, "-c", PROBE % (HEAVY_MODULES,)], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to measure')
+    parser.add_argument('--budget-ms', type=float, default=300.0,
+                        help='Maximum median time to import the CLI, in milliseconds')
+    args = parser.parse_args()
+
+    reports = [run_probe() for _ in range(args.runs)]
+    median_ms = statistics.median(report["import_seconds"] for report in reports) * 1000
+    heavy = sorted({name for report in reports for name in report["heavy_modules"]})
+
+    print(f"CLI import time: median {median_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"Heavy modules loaded by a DOCX run: {', '.join(heavy) if heavy else 'none'}")
+
+    if median_ms > args.budget_ms or heavy:
+        print("FAILED: startup budget exceeded")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
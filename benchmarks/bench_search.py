@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measure indexing throughput and query latency of the full-text search index
+
+Builds an index of synthetic purchase orders (a final JSON with line items and a raw
+text output per document) and times queries for a rare part number, a common word,
+a prefix and a multi-word query. The check fails (exit code 1) when the slowest
+query exceeds the budget.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.search_index import SearchIndex  # noqa: E402
+
+# Documents indexed per transaction
+BATCH_SIZE = 1000
+
+WORDS = ("bracket", "bolt", "washer", "valve", "gasket", "bearing", "flange", "hinge", "spring", "clamp")
+
+
+def make_document(number: int, rng: random.Random):
+    """Return the final JSON and raw outputs of a synthetic purchase order"""
+    items = [{"part_number": f"P-{rng.randrange(10**6):06d}", "description": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+              "quantity": rng.randrange(1, 100), "unit_price": round(rng.uniform(1, 500), 2)}
+             for _ in range(rng.randrange(2, 8))]
+    final = {"purchase_order": {"number": f"PO-{number:08d}", "supplier": f"Supplier {number % 997}",
+                                "items": items, "total": round(sum(i["quantity"] * i["unit_price"] for i in items), 2)}}
+    raw = "\n".join(f"| {i['part_number']} | {i['description']} | {i['quantity']} | {i['unit_price']} |" for i in items)
+    return json.dumps(final), {"pymupdf": f"# Purchase order PO-{number:08d}\n\n{raw}\n"}
+
+
+def time_query(index: SearchIndex, query: str, runs: int) -> float:
+    """Return the median latency of a query in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        index.search(query, limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=100000, help='Number of documents to index')
+    parser.add_argument('--index', help='Existing index to reuse or build (defaults to a temporary file)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per query')
+    parser.add_argument('--budget-ms', type=float, default=1000.0, help='Maximum median latency of any query')
+    args = parser.parse_args()
+
+    db_path = args.index or os.path.join(tempfile.mkdtemp(), "search.db")
+    index = SearchIndex(db_path)
+    rng = random.Random(42)
+
+    existing = index.count()
+    if existing < args.documents:
+        start = time.perf_counter()
+        for batch_start in range(existing, args.documents, BATCH_SIZE):
+            batch_end = min(batch_start + BATCH_SIZE, args.documents)
+            index.index_documents((f"doc-{number:08d}",) + make_document(number, rng)
+                                  for number in range(batch_start, batch_end))
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {args.documents - existing} documents in {elapsed:.1f}s "
+              f"({(args.documents - existing) / elapsed:.0f} documents/s)")
+    print(f"Index: {index.count()} documents, {os.path.getsize(db_path) / 2**20:.0f} MB")
+
+    queries = {
+        "rare part number": "P-000123",
+        "purchase order number": f"PO-{args.documents // 2:08d}",
+        "common word": "bracket",
+        "prefix": "gask*",
+        "two words": "bracket washer",
+    }
+    slowest = 0.0
+    for name, query in queries.items():
+        latency = time_query(index, query, args.runs)
+        slowest = max(slowest, latency)
+        print(f"{name:>22} {query!r:>20}: {latency:8.1f} ms")
+
+    if slowest > args.budget_ms:
+        print(f"FAILED: slowest query took {slowest:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Compare format failures of labeled-text and structured-output Gemini responses
+
+A stand-in model answers both steps for synthetic purchase orders. In labeled-text mode
+its responses have the defects seen from free-text generation (prose around the JSON,
+code fences, missing labels, trailing commas, truncation, renamed fields in Step 2); in
+structured-output mode the API's JSON MIME type and response schema rule out everything
+but truncation at the output token limit. The defect rates are the stand-in's
+assumptions (see DEFECT_RATES) and can be changed on the command line.
+
+Each response is scored with the code the pipeline uses: the previous handling
+(clean_json_string, no repair), labeled text with local repair, and structured output.
+A format failure is a response that would have to be requested again, or a Step 2
+answer that does not match the structure of the Step 1 schema.
+"""
+
+import io
+import os
+import sys
+import json
+import random
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.json_utils import JSONExtractionStats, JSONRepairError, clean_json_string  # noqa: E402
+from src.processors.response_formats import (  # noqa: E402
+    SCHEMA_MARKER, CONFIDENCE_MARKER, SCHEMA_KEY, CONFIDENCE_KEY,
+    parse_labeled_response, parse_structured_response, response_schema
+)
+
+# Probability of each defect in a labeled-text response
+DEFECT_RATES = {
+    "prose": 0.25,          # Explanation before or after the JSON
+    "fence": 0.5,           # ```json code fences
+    "missing_label": 0.03,  # SCHEMA_JSON: or CONFIDENCE_JSON: left out (Step 1)
+    "trailing_comma": 0.03,
+    "python_literal": 0.02,  # True/None instead of true/null
+    "truncated": 0.02,      # Output stopped at the token limit
+    "renamed_field": 0.04,  # Step 2 key differs from the Step 1 schema
+}
+
+WORDS = ("bracket", "bolt", "washer", "valve", "gasket", "bearing", "flange", "hinge")
+
+
+def make_schema(rng: random.Random) -> dict:
+    """Return the Step 1 schema of a synthetic purchase order"""
+    items = [{"partNumber": f"P-{rng.randrange(10**6):06d}", "description": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+              "quantity": rng.randrange(1, 100), "unitPrice": round(rng.uniform(1, 500), 2), "hazardous": False}
+             for _ in range(rng.randrange(2, 8))]
+    return {"documentType": "Purchase Order", "poNumber": f"PO-{rng.randrange(10**8):08d}",
+            "supplier": {"name": f"Supplier {rng.randrange(1000)}", "country": "US"}, "items": items,
+            "total": round(sum(item["quantity"] * item["unitPrice"] for item in items), 2), "notes": None}
+
+
+def confidence_of(value):
+    """Return a confidence object with the structure of a value"""
+    if isinstance(value, dict):
+        return {key: confidence_of(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [confidence_of(child) for child in value]
+    return 0.8
+
+
+class StandInModel:
+    """Produces Step 1 and Step 2 responses with defects drawn from the configured rates"""
+
+    def __init__(self, rng: random.Random, rates: dict):
+        self.rng = rng
+        self.rates = rates
+
+    def _happens(self, defect: str) -> bool:
+        return self.rng.random() < self.rates[defect]
+
+    def _json(self, value) -> str:
+        text = json.dumps(value, indent=2)
+        if self._happens("trailing_comma"):
+            text = text.replace("\n  }", ",\n  }", 1) if "\n  }" in text else text.replace("\n}", ",\n}", 1)
+        if self._happens("python_literal"):
+            text = text.replace("false", "False").replace("null", "None")
+        return text
+
+    def _truncate(self, text: str) -> str:
+        if self._happens("truncated"):
+            return text[:self.rng.randrange(len(text) // 2, len(text) - 1)]
+        return text
+
+    def _wrap(self, text: str) -> str:
+        if self._happens("fence"):
+            text = f"```json\n{text}\n```"
+        if self._happens("prose"):
+            text = f"Here is the extracted data:\n{text}\nLet me know if you need anything else."
+        return text
+
+    def labeled_schema(self, schema: dict) -> str:
+        schema_label, confidence_label = SCHEMA_MARKER, CONFIDENCE_MARKER
+        if self._happens("missing_label"):
+            schema_label = ""
+        text = (f"{schema_label}\n{self._wrap(self._json(schema))}\n\n"
+                f"{confidence_label}\n{self._wrap(self._json(confidence_of(schema)))}")
+        return self._truncate(text)
+
+    def labeled_final(self, final: dict) -> str:
+        if self._happens("renamed_field"):
+            final = dict(final)
+            final["purchaseOrderNumber"] = final.pop("poNumber")
+        return self._truncate(self._wrap(self._json(final)))
+
+    def structured_schema(self, schema: dict) -> str:
+        value = {SCHEMA_KEY: json.dumps(schema), CONFIDENCE_KEY: json.dumps(confidence_of(schema))}
+        return self._truncate(json.dumps(value))
+
+    def structured_final(self, final: dict) -> str:
+        return self._truncate(json.dumps(final))
+
+
+def matches(value, schema: dict) -> bool:
+    """Return whether a value has the structure of a response schema"""
+    if value is None:
+        return bool(schema.get("nullable"))
+    kind = schema["type"]
+    if kind == "OBJECT":
+        return (isinstance(value, dict) and set(value) <= set(schema["properties"])
+                and all(key in value for key in schema["required"])
+                and all(matches(child, schema["properties"][key]) for key, child in value.items()))
+    if kind == "ARRAY":
+        return isinstance(value, list) and all(matches(child, schema["items"]) for child in value)
+    types = {"STRING": str, "NUMBER": (int, float), "BOOLEAN": bool}[kind]
+    return isinstance(value, types) and not (kind == "NUMBER" and isinstance(value, bool))
+
+
+def previous_schema(response_text: str):
+    """Previous Step 1 handling: split on the labels and save whatever follows"""
+    if SCHEMA_MARKER not in response_text or CONFIDENCE_MARKER not in response_text:
+        raise JSONRepairError("label missing")
+    schema_part, confidence_part = response_text.split(CONFIDENCE_MARKER)
+    return (json.loads(clean_json_string(schema_part.split(SCHEMA_MARKER)[1])),
+            json.loads(clean_json_string(confidence_part)))
+
+
+def score(model: StandInModel, rng: random.Random, documents: int, stats: dict, failures: dict) -> None:
+    """Generate the responses of each document in every mode and count the format failures"""
+    for _ in range(documents):
+        schema = make_schema(rng)
+        constraint = response_schema(json.dumps(schema))
+        final = dict(schema, notes="Deliver to dock 4")
+
+        labeled_schema, labeled_final = model.labeled_schema(schema), model.labeled_final(final)
+        structured_schema, structured_final = model.structured_schema(schema), model.structured_final(final)
+
+        try:
+            previous_schema(labeled_schema)
+        except ValueError:
+            failures["previous"]["schema"] += 1
+        try:
+            if not matches(json.loads(clean_json_string(labeled_final)), constraint):
+                failures["previous"]["final"] += 1
+        except ValueError:
+            failures["previous"]["final"] += 1
+
+        for mode, parse, schema_text, final_text in (
+                ("labeled", parse_labeled_response, labeled_schema, labeled_final),
+                ("structured", parse_structured_response, structured_schema, structured_final)):
+            try:
+                parse(schema_text, stats[mode])
+            except JSONRepairError:
+                failures[mode]["schema"] += 1
+            try:
+                if not matches(json.loads(stats[mode].extract(final_text, expect=(dict,))), constraint):
+                    failures[mode]["final"] += 1
+            except JSONRepairError:
+                failures[mode]["final"] += 1
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=10000, help='Number of documents')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    for defect, rate in DEFECT_RATES.items():
+        parser.add_argument(f'--{defect.replace("_", "-")}', type=float, default=rate,
+                            help=f'Rate of the {defect} defect (default {rate})')
+    args = parser.parse_args()
+    rates = {defect: getattr(args, defect) for defect in DEFECT_RATES}
+
+    rng = random.Random(args.seed)
+    model = StandInModel(rng, rates)
+    stats = {"previous": JSONExtractionStats(), "labeled": JSONExtractionStats(), "structured": JSONExtractionStats()}
+    failures = {mode: {"schema": 0, "final": 0} for mode in stats}
+
+    # The pipeline logs every repair; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        score(model, rng, args.documents, stats, failures)
+
+    print(f"{args.documents} documents, defect rates: {', '.join(f'{k}={v:g}' for k, v in rates.items())}")
+    print(f"{'':>34} {'Step 1':>8} {'Step 2':>8} {'repaired':>9}")
+    for mode, label in (("previous", "labeled text, no repair"), ("labeled", "labeled text, local repair"),
+                        ("structured", "structured output, local repair")):
+        repaired = stats[mode].stats()["repaired"] if mode != "previous" else 0
+        print(f"{label:>34} {failures[mode]['schema'] / args.documents:>8.2%} "
+              f"{failures[mode]['final'] / args.documents:>8.2%} {repaired:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
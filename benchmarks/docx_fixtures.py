@@ -0,0 +1,66 @@
+"""
+Synthetic DOCX fixtures for benchmarks
+"""
+
+import zipfile
+from xml.sax.saxutils import escape
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+
+RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_HEADER = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                   '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+DOCUMENT_FOOTER = '</w:body></w:document>'
+
+
+def _paragraph(text: str, style: str = None) -> str:
+    style_xml = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{style_xml}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _table(rows: int, columns: int) -> str:
+    parts = ['<w:tbl>']
+    for r in range(rows):
+        parts.append('<w:tr>')
+        for c in range(columns):
+            parts.append(f'<w:tc>{_paragraph(f"Item {r} column {c}")}</w:tc>')
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+    return ''.join(parts)
+
+
+def write_synthetic_docx(path: str, sections: int = 100, paragraphs: int = 20, table_rows: int = 50) -> str:
+    """
+    Write a synthetic DOCX document with headings, paragraphs and tables
+
+    Args:
+        path: Output path
+        sections: Number of heading sections
+        paragraphs: Paragraphs per section
+        table_rows: Table rows per section
+
+    Returns:
+        The output path
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        docx.writestr("_rels/.rels", RELS_XML)
+        with docx.open("word/document.xml", "w") as document:
+            document.write(DOCUMENT_HEADER.encode("utf-8"))
+            for s in range(sections):
+                body = [_paragraph(f"Section {s}", style="Heading1")]
+                for p in range(paragraphs):
+                    body.append(_paragraph(f"Paragraph {p} of section {s}: lorem ipsum dolor sit amet " * 3))
+                body.append(_table(table_rows, 4))
+                document.write("".join(body).encode("utf-8"))
+            document.write(DOCUMENT_FOOTER.encode("utf-8"))
+    return path
@@ -19,10 +19,15 @@ setup(
         "streamlit",
         "pillow",
     ],
+    extras_require={
+        # zstd compression for the sqlite output backend (zlib is used without it)
+        "zstd": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "document-parser=src.cli:main",
             "document-parser-ui=src.ui:run_app",
+            "document-parser-service=src.service.server:main",
         ],
     },
     python_requires=">=3.8",
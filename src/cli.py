@@ -4,12 +4,33 @@ Command-line interface for the document parser
 
 import os
 import sys
+import time
 import argparse
+import contextlib
+import multiprocessing
+import threading
 from typing import List
 
 from dotenv import load_dotenv
 
 from .document_processor import DocumentProcessor
+from .parsers.base import DEFAULT_PARSER_PROFILE, use_offline_models
+from .parsers.docx_parser import DOCX_ENGINES
+from .parsers.process_pool import DEFAULT_MAX_TASKS_PER_CHILD
+from .storage.export import export_outputs
+from .storage.factory import OUTPUT_BACKENDS, create_output_store
+from .utils.catalog import DocumentCatalog
+from .utils.cost_model import CostModel, order_longest_first
+from .utils.hedging import DEFAULT_HEDGE_BUDGET
+from .utils.profiling import DEFAULT_PROFILE_MODES, DEFAULT_SAMPLE_INTERVAL, DEFAULT_TOP, parse_profile_modes
+from .utils.search_index import SearchIndex
+from .utils.signals import drain_on_interrupt
+from .utils.usage import USAGE_REPORT_FORMATS
+from .workqueue.factory import WORK_QUEUE_BACKENDS, create_work_queue, is_shared_output_dir
+from .workqueue.worker import DEFAULT_LEASE_SECONDS, DEFAULT_POLL_INTERVAL, run_worker
+
+# Default directory of the Docling models downloaded by the warmup command
+DEFAULT_DOCLING_ARTIFACTS = os.path.join(os.path.expanduser("~"), ".cache", "document-parser", "docling")
 
 
 def parse_args(args: List[str]) -> argparse.Namespace:
@@ -24,6 +45,7 @@ def parse_args(args: List[str]) -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(
         description='Parse PDF and DOCX documents and convert to structured JSON',
+        epilog='Other commands: export, search, serve, warmup, queue, worker (run "document-parser <command> --help" for details)',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
 
@@ -44,6 +66,114 @@ def parse_args(args: List[str]) -> argparse.Namespace:
         help='Limit the number of files to process (useful for testing)'
     )
 
+    parser.add_argument(
+        '--docx-engine',
+        choices=DOCX_ENGINES,
+        default='mammoth',
+        help='DOCX extraction engine: mammoth (full HTML) or stream (low memory, for very large files)'
+    )
+
+    parser.add_argument(
+        '--output-backend',
+        choices=OUTPUT_BACKENDS,
+        default='files',
+        help='Where to store outputs: files (one file per output) or sqlite (a single compressed database file)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Restart each document from the last stage completed by a previous run, skipping finished documents'
+    )
+
+    parser.add_argument(
+        '--parsers',
+        default=DEFAULT_PARSER_PROFILE,
+        help='PDF parsers to run: a profile (fast: PyMuPDF only, local: Docling and PyMuPDF, full: all three) '
+             'or comma-separated parser names (mistral_ocr, docling, pymupdf)'
+    )
+
+    parser.add_argument(
+        '--docling-artifacts',
+        help='Directory of Docling models prepared by "document-parser warmup" (defaults to DOCLING_ARTIFACTS_PATH)'
+    )
+
+    parser.add_argument(
+        '--isolate-parsers',
+        action='store_true',
+        help='Run Docling, PyMuPDF and the DOCX parser in worker processes that are replaced regularly'
+    )
+
+    parser.add_argument(
+        '--max-tasks-per-child',
+        type=int,
+        default=DEFAULT_MAX_TASKS_PER_CHILD,
+        help='Documents a parser worker process handles before it is replaced (with --isolate-parsers)'
+    )
+
+    parser.add_argument(
+        '--max-parser-rss-mb',
+        type=float,
+        help='Stop a parser worker whose memory exceeds this many MB and route the document to the other '
+             'parsers (implies --isolate-parsers)'
+    )
+
+    parser.add_argument(
+        '--hedge-budget',
+        type=float,
+        default=DEFAULT_HEDGE_BUDGET,
+        help='Fraction of Mistral and Gemini calls that may be duplicated when slower than their usual latency (0 disables hedging)'
+    )
+
+    parser.add_argument(
+        '--call-deadline',
+        type=float,
+        help='Seconds after which a Mistral or Gemini call is abandoned and retried'
+    )
+
+    parser.add_argument(
+        '--usage-report',
+        help='Write the API usage (tokens, OCR pages, calls, time) of each processed document to this .csv or .json file'
+    )
+
+    parser.add_argument(
+        '--structured-output',
+        action='store_true',
+        help='Request JSON responses from Gemini, with the final JSON constrained to the generated schema'
+    )
+
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=list(DEFAULT_PROFILE_MODES),
+        type=parse_profile_modes,
+        metavar='MODES',
+        help='Profile documents into OUTPUT_DIR/profiles: comma-separated modes among sample (stack samples '
+             'for flame graphs, low overhead), cprofile (functions by CPU time) and memory (top allocation '
+             'sites); without MODES, sample'
+    )
+
+    parser.add_argument(
+        '--profile-rate',
+        type=float,
+        default=1.0,
+        help='Fraction of documents profiled (with --profile)'
+    )
+
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=DEFAULT_SAMPLE_INTERVAL,
+        help='Seconds between stack samples (with --profile)'
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=DEFAULT_TOP,
+        help='Functions and allocation sites listed per stage in the reports (with --profile)'
+    )
+
     parser.add_argument(
         '--mistral-api-key',
         help='Mistral API key (defaults to MISTRAL_API_KEY environment variable)'
@@ -54,7 +184,24 @@ def parse_args(args: List[str]) -> argparse.Namespace:
         help='Gemini API key (defaults to GEMINI_API_KEY environment variable)'
     )
 
-    return parser.parse_args(args)
+    args = parser.parse_args(args)
+    _check_profile_arguments(parser, args)
+    return args
+
+
+def _check_profile_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Exit with a usage error if the --profile-* arguments are out of range"""
+    if not 0 < args.profile_rate <= 1:
+        parser.error("--profile-rate must be greater than 0 and at most 1")
+    if args.profile_interval <= 0:
+        parser.error("--profile-interval must be positive")
+
+
+def _profiling(processor: DocumentProcessor, args: argparse.Namespace):
+    """Return a context that profiles the processor's documents if --profile was given"""
+    if not args.profile:
+        return contextlib.nullcontext()
+    return processor.profiling(args.profile, args.profile_rate, args.profile_interval, args.profile_top)
 
 
 def main() -> int:
@@ -67,35 +214,420 @@ def main() -> int:
     # Load environment variables from .env file if present
     load_dotenv()
 
+    # Dispatch to a subcommand if one was given
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
     # Parse command-line arguments
-    args = parse_args(sys.argv[1:])
+    args = parse_args(argv)
+    if args.usage_report and os.path.splitext(args.usage_report)[1].lower() not in USAGE_REPORT_FORMATS:
+        print(f"Error: The usage report must be a {' or '.join(USAGE_REPORT_FORMATS)} file: {args.usage_report}")
+        return 1
+
+    # Local Docling models: keep the model hub offline before Docling is imported
+    use_offline_models(args.docling_artifacts)
 
     # Create document processor
-    processor = DocumentProcessor(
-        mistral_api_key=args.mistral_api_key,
-        gemini_api_key=args.gemini_api_key,
-        output_dir=args.output_dir
-    )
+    try:
+        processor = DocumentProcessor(
+            mistral_api_key=args.mistral_api_key,
+            gemini_api_key=args.gemini_api_key,
+            output_dir=args.output_dir,
+            docx_engine=args.docx_engine,
+            output_backend=args.output_backend,
+            resume=args.resume,
+            hedge_budget=args.hedge_budget,
+            call_deadline=args.call_deadline,
+            structured_output=args.structured_output,
+            parsers=args.parsers,
+            docling_artifacts=args.docling_artifacts,
+            isolate_parsers=args.isolate_parsers,
+            max_tasks_per_child=args.max_tasks_per_child,
+            max_parser_rss_mb=args.max_parser_rss_mb
+        )
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return 1
 
     # Process file or directory
-    if os.path.isfile(args.path):
-        # Process a single file based on extension
-        file_extension = os.path.splitext(args.path)[1].lower()
-        if file_extension == '.pdf':
-            success = processor.process_pdf(args.path)
-        elif file_extension == '.docx':
-            success = processor.process_docx(args.path)
+    with _profiling(processor, args):
+        if os.path.isfile(args.path):
+            # Process a single file based on extension
+            file_extension = os.path.splitext(args.path)[1].lower()
+            if file_extension == '.pdf':
+                success = processor.process_pdf(args.path)
+            elif file_extension == '.docx':
+                success = processor.process_docx(args.path)
+            else:
+                print(f"Error: Unsupported file type: {file_extension}")
+                return 1
+        elif os.path.isdir(args.path):
+            # Process all PDF and DOCX files in the directory
+            successful, failed = processor.process_directory(args.path, args.limit)
+            success = failed == 0
         else:
-            print(f"Error: Unsupported file type: {file_extension}")
+            print(f"Error: Path does not exist: {args.path}")
             return 1
-        return 0 if success else 1
-    elif os.path.isdir(args.path):
-        # Process all PDF and DOCX files in the directory
-        successful, failed = processor.process_directory(args.path, args.limit)
-        return 0 if failed == 0 else 1
-    else:
-        print(f"Error: Path does not exist: {args.path}")
+
+    if args.usage_report:
+        processor.usage_report.export(args.usage_report)
+        print(f"API usage report written to {args.usage_report}")
+    return 0 if success else 1
+
+
+def export_command(args: List[str]) -> int:
+    """
+    Export outputs from a storage backend to the default file layout
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog='document-parser export',
+        description='Export stored outputs to the default file-per-output layout',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '--output-dir', '-o',
+        default="parsed_outputs",
+        help='Output directory of the runs to export'
+    )
+    parser.add_argument(
+        '--output-backend',
+        choices=[backend for backend in OUTPUT_BACKENDS if backend != 'files'],
+        default='sqlite',
+        help='Storage backend the outputs were written with'
+    )
+    parser.add_argument(
+        'target_dir',
+        help='Directory to write the exported file layout to'
+    )
+    args = parser.parse_args(args)
+
+    store = create_output_store(args.output_backend, args.output_dir)
+    exported = export_outputs(store, args.target_dir)
+    print(f"Exported {exported} documents from {store.describe()} to {args.target_dir}")
+    return 0
+
+
+def search_command(args: List[str]) -> int:
+    """
+    Search the final JSON and raw outputs of processed documents
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 when something was found, 1 otherwise)
+    """
+    parser = argparse.ArgumentParser(
+        prog='document-parser search',
+        description='Full-text search over the final JSON values and raw parser outputs of processed documents',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('query', nargs='?', help='Words that must all appear, e.g. "PO-1234 bracket"; end a word with * to match prefixes')
+    parser.add_argument('--output-dir', '-o', default="parsed_outputs", help='Output directory of the processed documents')
+    parser.add_argument('--output-backend', choices=OUTPUT_BACKENDS, default='files', help='Where the outputs are stored')
+    parser.add_argument('--limit', '-l', type=int, default=20, help='Maximum number of results')
+    parser.add_argument('--source', help='Only search "final" JSON values or the output of one parser (e.g. docling)')
+    parser.add_argument('--fts', action='store_true', help='Use FTS5 query syntax as-is (OR, NOT, NEAR, "phrases")')
+    parser.add_argument('--reindex', action='store_true',
+                        help='First index completed documents missing from the index (e.g. processed before it existed)')
+    args = parser.parse_args(args)
+    if not args.query and not args.reindex:
+        parser.error('a query or --reindex is required')
+
+    journal_mode = "DELETE" if is_shared_output_dir(args.output_dir) else "WAL"
+    catalog = DocumentCatalog(os.path.join(args.output_dir, "catalog.db"), journal_mode)
+    index = SearchIndex(os.path.join(args.output_dir, "search.db"), journal_mode)
+    if args.reindex:
+        processor = DocumentProcessor(output_dir=args.output_dir, output_backend=args.output_backend)
+        print(f"Indexed {processor.reindex()} document(s); {index.count()} in the index")
+        if not args.query:
+            return 0
+
+    start = time.perf_counter()
+    try:
+        hits = index.search(args.query, limit=args.limit, source=args.source, raw_query=args.fts)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
         return 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    names = {}
+    for hit in hits:
+        if hit["doc_id"] not in names:
+            document = catalog.get(hit["doc_id"]) or {}
+            names[hit["doc_id"]] = document.get("original_name") or hit["doc_id"]
+        location = hit["path"] or hit["source"]
+        print(f"{names[hit['doc_id']]} [{hit['doc_id']}] {location}: {' '.join(hit['snippet'].split())}")
+    print(f"{len(hits)} result(s) in {elapsed_ms:.0f} ms")
+    return 0 if hits else 1
+
+
+def serve_command(args: List[str]) -> int:
+    """
+    Run the HTTP job service
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    from .service.server import main as serve_main
+
+    return serve_main(args)
+
+
+def warmup_command(args: List[str]) -> int:
+    """
+    Download the Docling models into a local directory and load them once
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog='document-parser warmup',
+        description='Pre-fetch and pre-load the Docling models, so later runs and workers start offline',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        '--artifacts-dir',
+        default=os.getenv("DOCLING_ARTIFACTS_PATH", DEFAULT_DOCLING_ARTIFACTS),
+        help='Directory to store the Docling models in'
+    )
+    parser.add_argument(
+        '--no-download',
+        action='store_true',
+        help='Only load the models already in the directory (checks that it works offline)'
+    )
+    args = parser.parse_args(args)
+
+    if args.no_download:
+        # Check that the models load without the model hub
+        use_offline_models(args.artifacts_dir)
+
+    from .parsers.docling_parser import warmup_docling
+
+    timings = warmup_docling(args.artifacts_dir, download=not args.no_download)
+    for name, seconds in timings.items():
+        print(f"  - {name}: {seconds:.1f}")
+    print(f"Docling models ready in {args.artifacts_dir}. Use them with:\n"
+          f"  export DOCLING_ARTIFACTS_PATH={os.path.abspath(args.artifacts_dir)}")
+    return 0
+
+
+def queue_command(args: List[str]) -> int:
+    """
+    Add documents to a shared work queue or show its state
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog='document-parser queue',
+        description='Manage the work queue shared by "document-parser worker" processes',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        'action',
+        choices=('add', 'status', 'requeue'),
+        help='add: queue PDF/DOCX files and directories; status: show item counts and failures; '
+             'requeue: return items with expired leases to the queue'
+    )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='Files or directories to add (on storage every worker can read at the same path)'
+    )
+    parser.add_argument(
+        '--output-dir', '-o',
+        default="parsed_outputs",
+        help='Output directory shared by all workers; the queue is stored in it'
+    )
+    parser.add_argument(
+        '--queue-backend',
+        choices=WORK_QUEUE_BACKENDS,
+        default='sqlite',
+        help='Work queue backend'
+    )
+    args = parser.parse_args(args)
+
+    queue = create_work_queue(args.queue_backend, args.output_dir)
+
+    if args.action == 'add':
+        paths = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                paths.extend(sorted(os.path.join(path, f) for f in os.listdir(path)
+                                    if f.lower().endswith(('.pdf', '.docx'))))
+            elif os.path.isfile(path):
+                paths.append(path)
+            else:
+                print(f"Error: Path does not exist: {path}")
+                return 1
+        # Predict processing times so workers start with the longest documents
+        catalog = DocumentCatalog(os.path.join(args.output_dir, "catalog.db"), journal_mode="DELETE")
+        scheduled = order_longest_first(paths, CostModel(catalog).fit())
+        added = queue.enqueue([path for path, _, _ in scheduled], [predicted for _, _, predicted in scheduled])
+        print(f"Added {added} of {len(paths)} document(s) to {queue.describe()}")
+    elif args.action == 'requeue':
+        print(f"Requeued {queue.requeue_expired()} item(s) with expired leases")
+
+    counts = queue.counts()
+    print(", ".join(f"{status}: {count}" for status, count in counts.items()))
+    if args.action == 'status':
+        for item in queue.items("failed"):
+            print(f"  failed: {item.path} ({item.error})")
+    return 0
+
+
+def _create_worker_processor(args: argparse.Namespace) -> DocumentProcessor:
+    """Create the processor of a worker; workers always resume from checkpoints"""
+    stand_ins = {}
+    if args.stand_in:
+        from .service.stand_ins import stand_in_backends
+
+        stand_ins = stand_in_backends(args.stand_in_delay)
+
+    use_offline_models(args.docling_artifacts)
+    return DocumentProcessor(
+        mistral_api_key=args.mistral_api_key,
+        gemini_api_key=args.gemini_api_key,
+        output_dir=args.output_dir,
+        docx_engine=args.docx_engine,
+        output_backend=args.output_backend,
+        resume=True,
+        hedge_budget=args.hedge_budget,
+        call_deadline=args.call_deadline,
+        structured_output=args.structured_output,
+        parsers=args.parsers,
+        docling_artifacts=args.docling_artifacts,
+        isolate_parsers=args.isolate_parsers,
+        max_tasks_per_child=args.max_tasks_per_child,
+        max_parser_rss_mb=args.max_parser_rss_mb,
+        shared_storage=True,
+        **stand_ins
+    )
+
+
+def _worker_process(args: argparse.Namespace) -> int:
+    """Run one worker until the queue is empty or it is interrupted; returns the number of failures"""
+    processor = _create_worker_processor(args)
+    queue = create_work_queue(args.queue_backend, args.output_dir)
+
+    # Load models before claiming, so the cold start does not count against a lease
+    for name, seconds in processor.warmup().items():
+        print(f"Warmup: {name} {seconds:.1f}s")
+    with _profiling(processor, args):
+        _, failed = run_worker(
+            processor, queue,
+            lease_seconds=args.lease_seconds,
+            poll_interval=args.poll_interval,
+            exit_when_empty=not args.wait
+        )
+    return failed
+
+
+def _worker_process_main(args: argparse.Namespace) -> None:
+    sys.exit(1 if _worker_process(args) else 0)
+
+
+def worker_command(args: List[str]) -> int:
+    """
+    Process documents from the shared work queue
+
+    Args:
+        args: Command-line arguments after the command name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog='document-parser worker',
+        description='Claim and process documents from the work queue of a shared output directory. '
+                    'Run it on as many hosts as needed.',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--output-dir', '-o', default="parsed_outputs",
+                        help='Output directory shared by all workers')
+    parser.add_argument('--queue-backend', choices=WORK_QUEUE_BACKENDS, default='sqlite', help='Work queue backend')
+    parser.add_argument('--output-backend', choices=OUTPUT_BACKENDS, default='files', help='Where to store outputs')
+    parser.add_argument('--docx-engine', choices=DOCX_ENGINES, default='mammoth', help='DOCX extraction engine')
+    parser.add_argument('--processes', '-p', type=int, default=1, help='Number of worker processes on this host')
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help='Lease duration; a document whose worker stops heartbeating is retried after it')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help='Seconds an idle worker waits before looking for work again')
+    parser.add_argument('--wait', action='store_true',
+                        help='Keep waiting for new documents instead of exiting when the queue is empty')
+    parser.add_argument('--stand-in', action='store_true',
+                        help='Use stand-in parsers and model instead of Mistral, Docling, PyMuPDF and Gemini (for testing)')
+    parser.add_argument('--stand-in-delay', type=float, default=0.0,
+                        help='Seconds each stand-in call sleeps, to simulate latency')
+    parser.add_argument('--parsers', default=DEFAULT_PARSER_PROFILE,
+                        help='PDF parsers to run: a profile (fast, local, full) or comma-separated parser names')
+    parser.add_argument('--docling-artifacts', help='Directory of Docling models prepared by "document-parser warmup" (defaults to DOCLING_ARTIFACTS_PATH)')
+    parser.add_argument('--isolate-parsers', action='store_true',
+                        help='Run Docling, PyMuPDF and the DOCX parser in worker processes that are replaced regularly')
+    parser.add_argument('--max-tasks-per-child', type=int, default=DEFAULT_MAX_TASKS_PER_CHILD,
+                        help='Documents a parser worker process handles before it is replaced (with --isolate-parsers)')
+    parser.add_argument('--max-parser-rss-mb', type=float,
+                        help='Stop a parser worker whose memory exceeds this many MB and route the document to the other parsers')
+    parser.add_argument('--hedge-budget', type=float, default=DEFAULT_HEDGE_BUDGET,
+                        help='Fraction of Mistral and Gemini calls that may be duplicated when slower than their usual latency (0 disables hedging)')
+    parser.add_argument('--call-deadline', type=float, help='Seconds after which a Mistral or Gemini call is abandoned and retried')
+    parser.add_argument('--structured-output', action='store_true',
+                        help='Request JSON responses from Gemini, with the final JSON constrained to the generated schema')
+    parser.add_argument('--profile', nargs='?', const=list(DEFAULT_PROFILE_MODES), type=parse_profile_modes, metavar='MODES',
+                        help='Profile documents into OUTPUT_DIR/profiles: comma-separated modes among sample, cprofile and memory; '
+                             'without MODES, sample')
+    parser.add_argument('--profile-rate', type=float, default=1.0, help='Fraction of documents profiled (with --profile)')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL,
+                        help='Seconds between stack samples (with --profile)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                        help='Functions and allocation sites listed per stage in the reports (with --profile)')
+    parser.add_argument('--mistral-api-key', help='Mistral API key (defaults to MISTRAL_API_KEY environment variable)')
+    parser.add_argument('--gemini-api-key', help='Gemini API key (defaults to GEMINI_API_KEY environment variable)')
+    args = parser.parse_args(args)
+    _check_profile_arguments(parser, args)
+
+    if args.processes <= 1:
+        return 1 if _worker_process(args) else 0
+
+    processes = [multiprocessing.Process(target=_worker_process_main, args=(args,), name=f"worker-{i}")
+                 for i in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    # Ctrl+C reaches every worker process, which drains on its own; wait for all of them
+    with drain_on_interrupt(threading.Event(), "Interrupt received: waiting for the workers to finish their documents."):
+        for process in processes:
+            process.join()
+
+    return 0 if all(process.exitcode == 0 for process in processes) else 1
+
+
+# Subcommands, dispatched on the first command-line argument
+COMMANDS = {
+    "export": export_command,
+    "search": search_command,
+    "serve": serve_command,
+    "warmup": warmup_command,
+    "queue": queue_command,
+    "worker": worker_command,
+}
 
 
 if __name__ == "__main__":
@@ -9,12 +9,12 @@ schema_generation_prompt = """
 You are an expert document analyzer specializing in extracting structured data from business documents. You have received parsed text from multiple OCR and parsing methods applied to a PDF. Your task is to create a perfectly structured JSON schema and confidence scores for each field.
 
 ## IMPORTANT CONTEXT:
-1. You have been given outputs from three different parsing methods: Mistral OCR, Docling, and PyMuPDF
+1. You have been given outputs from one or more parsing methods (Mistral OCR, Docling and/or PyMuPDF); the methods used for this document are listed with the outputs
 2. Each method may capture different aspects of the document correctly
 3. You need to analyze the content to determine the document type and create an appropriate schema
 
 ## YOUR TASK:
-1. Analyze all three parsing outputs to understand the document's content and structure
+1. Analyze all parsing outputs to understand the document's content and structure
 2. Create a comprehensive JSON schema that:
    - Accurately represents the document's specific structure and content
    - Captures ALL information present in the document
@@ -34,8 +34,8 @@ You are an expert document analyzer specializing in extracting structured data f
 
 ## CONFIDENCE SCORE GUIDELINES:
 - Assign a confidence score from 0.0 to 1.0 for each field
-- 1.0: Field value appears consistently across all three parsing methods
-- 0.8: Field value appears in two parsing methods
+- 1.0: Field value appears consistently across all parsing methods (or, with a single method, is captured clearly and completely)
+- 0.8: Field value appears in most parsing methods
 - 0.6: Field value appears in only one parsing method but is clearly correct
 - 0.4: Field value is present but with potential inconsistencies
 - 0.2: Field value is uncertain or potentially incorrect
@@ -77,18 +77,18 @@ IMPORTANT:
 final_json_generation_prompt = """
 You are an expert document data extractor specializing in creating perfectly structured JSON from business documents. You have received:
 1. A JSON schema with extracted values from a document
-2. Raw parsed text from three different parsing methods
+2. Raw parsed text from one or more parsing methods
 
 Your task is to create the most accurate and complete JSON representation of the document.
 
 ## IMPORTANT CONTEXT:
 1. The schema JSON provides the basic structure and initial values
-2. The three parsing outputs (Mistral OCR, Docling, and PyMuPDF) contain the raw text
+2. The parsing outputs (Mistral OCR, Docling and/or PyMuPDF, as listed with them) contain the raw text
 3. You need to verify and improve the schema JSON using all available information
 4. The schema was specifically designed for this document, so maintain its structure
 
 ## YOUR TASK:
-1. Carefully analyze the schema JSON and all three parsing outputs
+1. Carefully analyze the schema JSON and all parsing outputs
 2. Create a final JSON that:
    - Follows the exact structure of the schema JSON
    - Contains the most accurate values from all available sources
@@ -225,3 +225,12 @@ Your task is to create the most accurate and complete JSON representation of the
 ## OUTPUT FORMAT:
 Return ONLY the final JSON object with no additional text or explanations. The JSON should be valid and properly formatted.
 """
+
+# Replaces the labeled output format of the schema prompts in structured output mode
+structured_schema_output_instructions = """
+
+## STRUCTURED OUTPUT FORMAT:
+Ignore the SCHEMA_JSON:/CONFIDENCE_JSON: response format above. Return a single JSON object with exactly two keys:
+- "schema": the schema JSON with all extracted values, serialized as a JSON string
+- "confidence": the confidence JSON with the same structure, serialized as a JSON string
+"""
@@ -2,26 +2,151 @@
 Main document processor module
 """
 
+import io
 import os
-from typing import Dict, List, Optional, Tuple
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from .parsers.mistral_parser import MistralParser
-from .parsers.docling_parser import DoclingParser
-from .parsers.pymupdf_parser import PyMuPDFParser
-from .parsers.docx_parser import DocxParser
-from .processors.gemini_processor import GeminiProcessor
-from .utils.file_utils import ensure_directory
+from .parsers.base import PARSER_LABELS, resolve_parsers
+from .parsers.process_pool import DEFAULT_MAX_TASKS_PER_CHILD, MemoryLimitExceeded, ParserProcessPool
+from .registry import LazyBackend, is_loaded
+from .storage.base import CHECKPOINT, CONFIDENCE, COPY, FINAL, RAW, OutputStore
+from .storage.blob_store import BlobStore
+from .storage.factory import create_output_store
+from .storage.file_store import FileOutputStore
+from .storage.memory_store import MemoryOutputStore
+from .utils.catalog import DocumentCatalog
+from .utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from .utils.cost_model import CostModel, FeatureCache
+from .utils.file_utils import FILE_SIGNATURES, detect_file_type, ensure_directory, file_sha256
+from .utils.hedging import DEFAULT_HEDGE_BUDGET
+from .utils.image_utils import ImageStore, externalize_images
+from .utils.memory import peak_rss_mb, reset_peak_rss
+from .utils.profiling import (
+    DEFAULT_PROFILE_MODES, DEFAULT_SAMPLE_INTERVAL, DEFAULT_TOP, NULL_PROFILE, Profiler
+)
+from .utils.search_index import SearchIndex
+from .utils.signals import drain_on_interrupt
+from .utils.usage import UsageReport, current_usage, merge_usage, reset_usage, usage_totals
+from .workqueue.factory import is_shared_output_dir
+
+if TYPE_CHECKING:
+    from .parsers.mistral_parser import MistralParser
+    from .parsers.docling_parser import DoclingParser
+    from .parsers.pymupdf_parser import PyMuPDFParser
+    from .processors.gemini_processor import GeminiProcessor
+
+# Processing stages, in order; a document's checkpoint records the last one it completed
+STAGE_PARSED = "parsed"
+STAGE_SCHEMA = "schema"
+STAGE_FINAL = "final"
+STAGES = (STAGE_PARSED, STAGE_SCHEMA, STAGE_FINAL)
+
+# Attribute of the processor holding each PDF parser
+PDF_PARSER_ATTRIBUTES = {
+    "mistral_ocr": "mistral_parser",
+    "docling": "docling_parser",
+    "pymupdf": "pymupdf_parser",
+}
+
+# Backends run in worker processes when parsers are isolated; Mistral only waits on the network
+ISOLATED_BACKENDS = ("docling", "pymupdf", "docx")
+
+# Longest time a directory run waits for parked documents' services to recover
+PARK_TIMEOUT_SECONDS = 3600
+
+# Shortest wait between retries of parked documents
+PARK_POLL_SECONDS = 5
+
+# Times a document can be parked before an open circuit fails it like any other error
+MAX_PARKS = 3
+
+# Input file types
+FILE_TYPES = tuple(FILE_SIGNATURES)
+
+# Inputs accepted by DocumentProcessor.process(): a path, the file contents, or a binary file object
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+@dataclass
+class ProcessingResult:
+    """
+    Outcome and outputs of processing one document
+
+    raw_outputs maps parser names to their outputs and timings maps stage names
+    ("parse_seconds", "schema_seconds", "final_seconds") to seconds. usage maps API
+    steps ("mistral_ocr", "gemini_schema", "gemini_final") to their token, page, call
+    and time counters (see utils.usage). locations holds where the outputs were stored,
+    keyed by parser name, "confidence" and "final"; it is empty when the document was
+    not persisted.
+    """
+    doc_id: str
+    file_type: str
+    success: bool
+    final_json: Optional[str] = None
+    confidence_json: Optional[str] = None
+    raw_outputs: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    parked: bool = False
+    peak_rss_mb: Optional[float] = None
+    usage: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    source_path: Optional[str] = None
+    locations: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def final(self) -> Any:
+        """The final structured JSON, parsed"""
+        return json.loads(self.final_json) if self.final_json is not None else None
+
+    @property
+    def confidence(self) -> Any:
+        """The confidence scores, parsed"""
+        return json.loads(self.confidence_json) if self.confidence_json is not None else None
 
 
 class DocumentProcessor:
     """
     Main document processor that orchestrates the parsing and processing of documents
+
+    Parsers and the Gemini processor are imported and created the first time they are
+    used, so a DOCX-only run never loads the PDF parsers. With isolate_parsers=True, the
+    local parsers run in recycled worker processes instead (see ParserProcessPool).
     """
 
+    mistral_parser = LazyBackend("mistral")
+    docling_parser = LazyBackend("docling")
+    pymupdf_parser = LazyBackend("pymupdf")
+    docx_parser = LazyBackend("docx")
+    gemini_processor = LazyBackend("gemini")
+
     def __init__(self,
                  mistral_api_key: Optional[str] = None,
                  gemini_api_key: Optional[str] = None,
-                 output_dir: str = "parsed_outputs"):
+                 output_dir: str = "parsed_outputs",
+                 docx_engine: str = "mammoth",
+                 output_backend: str = "files",
+                 resume: bool = False,
+                 hedge_budget: float = DEFAULT_HEDGE_BUDGET,
+                 call_deadline: Optional[float] = None,
+                 structured_output: bool = False,
+                 parsers: Optional[Sequence[str]] = None,
+                 docling_artifacts: Optional[str] = None,
+                 isolate_parsers: bool = False,
+                 max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+                 max_parser_rss_mb: Optional[float] = None,
+                 shared_storage: Optional[bool] = None,
+                 mistral_parser: Optional["MistralParser"] = None,
+                 docling_parser: Optional["DoclingParser"] = None,
+                 pymupdf_parser: Optional["PyMuPDFParser"] = None,
+                 gemini_processor: Optional["GeminiProcessor"] = None):
         """
         Initialize the document processor
 
@@ -29,184 +154,765 @@ class DocumentProcessor:
             mistral_api_key: Mistral API key (defaults to MISTRAL_API_KEY environment variable)
             gemini_api_key: Gemini API key (defaults to GEMINI_API_KEY environment variable)
             output_dir: Directory to save output files
+            docx_engine: DOCX extraction engine ("mammoth" or "stream" for very large files)
+            output_backend: Output storage backend ("files" for the default layout, "sqlite" for a single database file)
+            resume: Restart each document from the last stage completed by a previous run
+            hedge_budget: Fraction of Mistral and Gemini calls that may be duplicated when they are slow
+            call_deadline: Seconds after which a Mistral or Gemini call is abandoned (optional)
+            structured_output: Request JSON responses from Gemini, with Step 2 constrained to
+                the structure of the Step 1 schema
+            parsers: PDF parsers to run, as a profile ("fast", "local", "full") or parser names
+                ("mistral_ocr", "docling", "pymupdf"); defaults to the full profile
+            docling_artifacts: Directory of pre-downloaded Docling models (defaults to the
+                DOCLING_ARTIFACTS_PATH environment variable)
+            isolate_parsers: Run Docling, PyMuPDF and the DOCX parser in worker processes
+            max_tasks_per_child: Documents a parser worker process handles before it is replaced
+            max_parser_rss_mb: Resident memory in MB above which a parser worker is stopped and
+                the document is routed to the remaining parsers (implies isolate_parsers)
+            shared_storage: The output directory is shared by processes on several hosts
+                (distributed workers), so its databases use the rollback journal instead of
+                WAL; defaults to whether the directory holds a work queue
+            mistral_parser: Parser to use instead of creating a MistralParser (e.g. a stand-in)
+            docling_parser: Parser to use instead of creating a DoclingParser
+            pymupdf_parser: Parser to use instead of creating a PyMuPDFParser
+            gemini_processor: Processor to use instead of creating a GeminiProcessor
         """
-        self.mistral_parser = MistralParser(api_key=mistral_api_key)
-        self.docling_parser = DoclingParser()
-        self.pymupdf_parser = PyMuPDFParser()
-        self.docx_parser = DocxParser()
-        self.gemini_processor = GeminiProcessor(api_key=gemini_api_key)
+        # Constructor options of the backends, which are created on first use
+        self.backend_options = {
+            "mistral": {"api_key": mistral_api_key, "hedge_budget": hedge_budget, "call_deadline": call_deadline},
+            "gemini": {"api_key": gemini_api_key, "hedge_budget": hedge_budget, "call_deadline": call_deadline,
+                       "structured_output": structured_output},
+            "docx": {"engine": docx_engine},
+            "docling": {"artifacts_path": docling_artifacts},
+        }
+        # Injected backends always run in this process
+        self._injected = set()
+        for attribute, backend in (("mistral_parser", mistral_parser), ("docling_parser", docling_parser),
+                                   ("pymupdf_parser", pymupdf_parser), ("gemini_processor", gemini_processor)):
+            if backend is not None:
+                setattr(self, attribute, backend)
+                self._injected.add(attribute)
+        isolate_parsers = isolate_parsers or max_parser_rss_mb is not None
+        self.parser_pool = ParserProcessPool(max_tasks_per_child, max_parser_rss_mb) if isolate_parsers else None
+        # Peak memory of the document each thread is processing
+        self._memory = threading.local()
+        # Documents being processed, and how many have started while another was running;
+        # the process peak belongs to a document only if it ran alone
+        self._running_documents = 0
+        self._overlapping_starts = 0
+        self._running_lock = threading.Lock()
+        self.parsers = resolve_parsers(parsers)
         self.output_dir = output_dir
+        self.resume = resume
 
-        # Create output directories
-        self._create_output_directories()
-
-    def _create_output_directories(self) -> None:
-        """Create output directories"""
+        # Create the output directory and the backend that stores outputs
         ensure_directory(self.output_dir)
-        ensure_directory(os.path.join(self.output_dir, "raw_outputs"))
-        ensure_directory(os.path.join(self.output_dir, "json_outputs"))
-        ensure_directory(os.path.join(self.output_dir, "confidence_scores"))
-        ensure_directory(os.path.join(self.output_dir, "docx_copies"))
-        ensure_directory(os.path.join(self.output_dir, "pdf_copies"))
+        if shared_storage is None:
+            shared_storage = is_shared_output_dir(self.output_dir)
+        journal_mode = "DELETE" if shared_storage else "WAL"
+        self.store = create_output_store(output_backend, self.output_dir)
+
+        # Content-addressed store for images stripped out of DOCX HTML
+        self.image_store = ImageStore(os.path.join(self.output_dir, "images"))
+
+        # Catalog of processed documents, updated on every write
+        self.catalog = DocumentCatalog(os.path.join(self.output_dir, "catalog.db"), journal_mode)
 
-    def process_pdf(self, pdf_path: str) -> bool:
+        # Full-text index of the final JSON and raw outputs, updated as documents complete
+        self.search_index = SearchIndex(os.path.join(self.output_dir, "search.db"), journal_mode)
+
+        # API usage of the documents processed by this processor
+        self.usage_report = UsageReport()
+
+        # Profiler of the documents being processed, set by profiling()
+        self.profiler: Optional[Profiler] = None
+
+        # Processing time model, fitted to the catalog's history of completed documents
+        self.cost_model = CostModel(self.catalog).fit()
+        # Cost features of recent documents, shared by scheduling and processing
+        self.features = FeatureCache()
+
+        # Documents parked because a remote service was unavailable, with the circuit breaker that stopped them
+        self.parked: Dict[str, CircuitBreaker] = {}
+        # Number of times each unfinished document was parked
+        self.park_counts: Dict[str, int] = {}
+
+    def warmup(self) -> Dict[str, float]:
         """
-        Process a single PDF file
+        Create the selected PDF parsers and load their models before the first document
 
-        Args:
-            pdf_path: Path to the PDF file
+        Returns:
+            Dictionary of load times in seconds
+        """
+        timings = {}
+        for name in self.parsers:
+            timings.update(self._run_parser(PDF_PARSER_ATTRIBUTES[name], "warmup"))
+        return timings
+
+    def hedging_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the hedging counters of the remote services
 
         Returns:
-            True if processing was successful, False otherwise
+            Dictionary mapping the service name ("mistral", "gemini") to its counters;
+            services not used yet or without hedging (e.g. stand-ins) are left out
         """
-        # Check if file exists
-        if not os.path.exists(pdf_path):
-            print(f"Error: File {pdf_path} does not exist")
-            return False
+        stats = {}
+        for name, attribute in (("mistral", "mistral_parser"), ("gemini", "gemini_processor")):
+            # Backends that were never used have no counters; reading them would create them
+            if not is_loaded(self, attribute):
+                continue
+            hedger = getattr(getattr(self, attribute), "hedger", None)
+            if hedger is not None:
+                stats[name] = hedger.stats()
+        return stats
 
-        # Get base filename without extension
-        base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
+    def json_repair_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Return the counters of JSON extracted from Gemini responses
 
-        # Define output directories
-        raw_dir = os.path.join(self.output_dir, "raw_outputs")
-        json_dir = os.path.join(self.output_dir, "json_outputs")
-        confidence_dir = os.path.join(self.output_dir, "confidence_scores")
+        Returns:
+            Counters from JSONExtractionStats.stats(), or None if Gemini was not used
+            yet or the processor does not count (e.g. stand-ins)
+        """
+        if not is_loaded(self, "gemini_processor"):
+            return None
+        json_stats = getattr(self.gemini_processor, "json_stats", None)
+        return json_stats.stats() if json_stats is not None else None
 
-        # Parse PDF using multiple methods
-        print(f"\nProcessing file: {pdf_path}")
+    @contextmanager
+    def profiling(self, modes: Sequence[str] = DEFAULT_PROFILE_MODES,
+                  sample_rate: float = 1.0,
+                  interval: float = DEFAULT_SAMPLE_INTERVAL,
+                  top: int = DEFAULT_TOP) -> Iterator[Profiler]:
+        """
+        Profile the documents processed inside the with block
 
+        Reports are written to output_dir/profiles/<doc_id>/, split into the setup, parse,
+        schema and final stages, and the stacks of the whole run to
+        output_dir/profiles/run-<timestamp>.collapsed (see Profiler).
+
+        Args:
+            modes: Profiling modes, any of "sample", "cprofile" and "memory"
+            sample_rate: Fraction of documents profiled, between 0 and 1
+            interval: Seconds between stack samples
+            top: Entries in the cProfile and allocation reports
+
+        Yields:
+            The profiler
+        """
+        profiler = Profiler(os.path.join(self.output_dir, "profiles"), modes, sample_rate, interval, top)
+        previous, self.profiler = self.profiler, profiler
         try:
-            # Parse with Mistral OCR
-            mistral_output, _ = self.mistral_parser.parse(pdf_path)
+            yield profiler
+        finally:
+            self.profiler = previous
+            path = profiler.close()
+            if path:
+                print(f"Profiled {profiler.documents} document(s); stacks of the run saved to {path}")
+
+    def _run_parser(self, attribute: str, method: str, *args, options: Optional[Dict] = None):
+        """
+        Call a method of a parser, in a worker process when parsers are isolated
 
-            # Parse with Docling
-            docling_output = self.docling_parser.parse(pdf_path)
+        Args:
+            attribute: Attribute of the processor holding the parser
+            method: Name of the method to call
+            *args: Arguments of the method
+            options: Constructor options to use instead of the processor's (isolated parsers only)
 
-            # Parse with PyMuPDF
-            pymupdf_output = self.pymupdf_parser.parse(pdf_path)
+        Returns:
+            The method's return value
+        """
+        backend = getattr(type(self), attribute).backend
+        if self.parser_pool is None or backend not in ISOLATED_BACKENDS or attribute in self._injected:
+            return getattr(getattr(self, attribute), method)(*args)
 
-            # Save raw parsed outputs
-            with open(f"{raw_dir}/{base_filename}_mistral_ocr.md", "w", encoding="utf-8") as f:
-                f.write(mistral_output)
+        if options is None:
+            options = self.backend_options.get(backend, {})
+        try:
+            value, peak = self.parser_pool.run(backend, options, method, *args)
+        except MemoryLimitExceeded as e:
+            self._record_peak(e.rss_mb)
+            raise
+        self._record_peak(peak)
+        return value
 
-            with open(f"{raw_dir}/{base_filename}_docling.md", "w", encoding="utf-8") as f:
-                f.write(docling_output)
+    def _record_peak(self, peak: Optional[float]) -> None:
+        """Keep the highest memory use seen while processing the current document"""
+        if peak is not None:
+            self._memory.peak = max(getattr(self._memory, "peak", None) or 0.0, peak)
 
-            with open(f"{raw_dir}/{base_filename}_pymupdf.md", "w", encoding="utf-8") as f:
-                f.write(pymupdf_output)
+    def _start_document_peak(self) -> None:
+        """
+        Start tracking the peak memory of a document processed in this thread
 
-            # Combine parsed outputs
-            parsed_outputs = {
-                "mistral_ocr": mistral_output,
-                "docling": docling_output,
-                "pymupdf": pymupdf_output
-            }
+        The process peak can only be reset when no other document is running, since
+        resetting it erases theirs.
+        """
+        self._memory.peak = None
+        with self._running_lock:
+            self._running_documents += 1
+            alone = self._running_documents == 1
+            if not alone:
+                self._overlapping_starts += 1
+            self._memory.overlapping_starts = None if not alone else self._overlapping_starts
+        if alone:
+            reset_peak_rss()
 
-            # Step 1: Generate JSON schema and confidence scores
-            print(f"Step 1: Generating JSON schema and confidence scores for {base_filename}...")
-            schema_json, confidence_json = self.gemini_processor.generate_schema_and_confidence(parsed_outputs)
+    def _finish_document_peak(self) -> None:
+        """Stop counting the document processed in this thread as running"""
+        with self._running_lock:
+            self._running_documents -= 1
 
-            # Save confidence scores
-            with open(f"{confidence_dir}/{base_filename}_confidence.json", "w", encoding="utf-8") as f:
-                f.write(confidence_json)
+    def _document_peak(self) -> Optional[float]:
+        """
+        Return the peak memory in MB of the current document
 
-            # Step 2: Generate final structured JSON
-            print(f"Step 2: Generating final structured JSON for {base_filename}...")
-            final_json = self.gemini_processor.generate_final_json(schema_json, parsed_outputs)
+        The process peak is included only if the document ran alone; otherwise only the
+        per-task peaks of parser worker processes (isolate_parsers) are known, or None.
+        """
+        with self._running_lock:
+            alone = getattr(self._memory, "overlapping_starts", None) == self._overlapping_starts
+        if alone:
+            self._record_peak(peak_rss_mb())
+        return getattr(self._memory, "peak", None)
 
-            # Save final JSON output
-            with open(f"{json_dir}/{base_filename}.json", "w", encoding="utf-8") as f:
-                f.write(final_json)
+    @staticmethod
+    def _usage_columns(usage: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """Return the catalog columns of a document's API usage: the totals and the usage by step"""
+        return dict(usage_totals(usage), usage=usage)
 
-            print(f"✓ Successfully processed: {base_filename}")
-            print(f"  - Raw outputs saved to {raw_dir}/{base_filename}_*.md")
-            print(f"  - Confidence scores saved to {confidence_dir}/{base_filename}_confidence.json")
-            print(f"  - Final JSON output saved to {json_dir}/{base_filename}.json")
-            return True
+    @staticmethod
+    def _report_progress(progress_callback: Optional[Callable[[str, float], None]], stage: str, fraction: float) -> None:
+        """Report the current stage to the progress callback, if one was given"""
+        if progress_callback is not None:
+            progress_callback(stage, fraction)
 
-        except Exception as e:
-            print(f"✗ Error processing {pdf_path}: {str(e)}")
-            return False
+    def _update_catalog(self, doc_id: str, **fields) -> None:
+        """Record document fields in the catalog without letting catalog errors fail processing"""
+        try:
+            self.catalog.upsert(doc_id, **fields)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update the document catalog for {doc_id}: {str(e)}")
 
-    def process_docx(self, docx_path: str) -> bool:
+    def _update_search_index(self, doc_id: str, final_json: Optional[str], raw_outputs: Dict[str, str]) -> None:
+        """Index a completed document without letting index errors fail processing"""
+        try:
+            self.search_index.index_document(doc_id, final_json, raw_outputs)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update the search index for {doc_id}: {str(e)}")
+
+    def reindex(self, missing_only: bool = True, batch_size: int = 500) -> int:
         """
-        Process a single DOCX file
+        Add the stored outputs of completed documents to the search index
 
         Args:
-            docx_path: Path to the DOCX file
+            missing_only: Only index documents that are not in the index yet
+            batch_size: Documents written to the index per transaction
 
         Returns:
-            True if processing was successful, False otherwise
+            Number of documents indexed
         """
-        # Check if file exists
-        if not os.path.exists(docx_path):
-            print(f"Error: File {docx_path} does not exist")
+        batch = []
+        indexed = 0
+        for doc_id in self.catalog.doc_ids("completed"):
+            if missing_only and self.search_index.is_indexed(doc_id):
+                continue
+            final_json = self.store.get(doc_id, FINAL, "json")
+            if final_json is None:
+                continue
+            raw_names = list((self.catalog.get(doc_id) or {}).get("raw_paths") or {})
+            raw_outputs = {name: data.decode("utf-8") for name in raw_names
+                           for data in [self.store.get(doc_id, RAW, name)] if data is not None}
+            batch.append((doc_id, final_json.decode("utf-8"), raw_outputs))
+            if len(batch) >= batch_size:
+                self.search_index.index_documents(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            self.search_index.index_documents(batch)
+            indexed += len(batch)
+        return indexed
+
+    def _load_checkpoint(self, store: OutputStore, doc_id: str, source_sha256: str) -> Optional[Dict]:
+        """
+        Load the checkpoint of a document if it was written for the same input file
+
+        Args:
+            store: Output store of the document
+            doc_id: Document ID
+            source_sha256: SHA-256 digest of the input file
+
+        Returns:
+            Checkpoint dictionary, or None if there is no usable checkpoint
+        """
+        data = store.get(doc_id, CHECKPOINT, "state")
+        if data is None:
+            return None
+        try:
+            checkpoint = json.loads(data)
+        except ValueError:
+            print(f"Warning: Ignoring unreadable checkpoint for {doc_id}")
+            return None
+        if checkpoint.get("source_sha256") != source_sha256 or checkpoint.get("stage") not in STAGES:
+            print(f"Input file changed since the last run, not resuming {doc_id}")
+            return None
+        if any(store.get(doc_id, RAW, name) is None for name in checkpoint.get("parsers", [])):
+            print(f"Warning: Raw outputs of {doc_id} are missing, not resuming it")
+            return None
+        if checkpoint["stage"] == STAGE_SCHEMA and not self._is_usable_schema(checkpoint.get("schema_json")):
+            # Written by earlier versions, which checkpointed a failed Step 1 as "{}"
+            print(f"Warning: Checkpointed schema of {doc_id} is empty, generating it again")
+            checkpoint["stage"] = STAGE_PARSED
+        return checkpoint
+
+    @staticmethod
+    def _is_usable_schema(schema_json: Optional[str]) -> bool:
+        """Return whether a Step 1 schema is a non-empty JSON object"""
+        try:
+            schema = json.loads(schema_json or "")
+        except ValueError:
             return False
+        return isinstance(schema, dict) and bool(schema)
+
+    @staticmethod
+    def _save_checkpoint(store: OutputStore, doc_id: str, checkpoint: Dict, stage: str) -> None:
+        """
+        Record that a document completed a stage and commit everything written so far
 
+        Args:
+            store: Output store of the document
+            doc_id: Document ID
+            checkpoint: Checkpoint dictionary, updated in place
+            stage: Stage that was completed (one of STAGES)
+        """
+        checkpoint["stage"] = stage
+        store.put(doc_id, CHECKPOINT, "state", json.dumps(checkpoint, indent=2))
+        store.commit(doc_id)
+
+    def _process_document(self, path: str, file_type: str,
+                          parse: Callable[[str, Optional[Callable[[str, float], None]]], Dict[str, str]],
+                          generate_schema: Callable[[Dict[str, str]], Tuple[str, str]],
+                          generate_final: Callable[[str, Dict[str, str]], str],
+                          progress_callback: Optional[Callable[[str, float], None]],
+                          original_name: Optional[str],
+                          doc_id: Optional[str] = None,
+                          persist: bool = True) -> ProcessingResult:
+        """
+        Run the parse, schema and final stages for one document, checkpointing after each
+
+        When the processor was created with resume=True, stages recorded in the document's
+        checkpoint are loaded from the store instead of being run again. The peak memory of
+        the document is recorded in the catalog; when documents are processed concurrently
+        in one process, only the peaks of their parser worker processes are known.
+
+        Args:
+            path: Path to the input file
+            file_type: Input file type ("pdf" or "docx")
+            parse: Function returning the parsed outputs of the file by parser name
+            generate_schema: Step 1 function returning (schema JSON, confidence JSON)
+            generate_final: Step 2 function returning the final JSON
+            progress_callback: Optional callback receiving (stage description, fraction complete)
+            original_name: Name to record in the catalog (defaults to the file name)
+            doc_id: Document ID of the outputs (defaults to the file name without extension)
+            persist: Store the outputs and record the document in the catalog; otherwise the
+                outputs are only returned
+
+        Returns:
+            The processing result
+        """
         # Get base filename without extension
-        base_filename = os.path.splitext(os.path.basename(docx_path))[0]
+        base_filename = doc_id or os.path.splitext(os.path.basename(path))[0]
+        result = ProcessingResult(doc_id=base_filename, file_type=file_type, success=False, source_path=path)
 
-        # Define output directories
-        raw_dir = os.path.join(self.output_dir, "raw_outputs")
-        json_dir = os.path.join(self.output_dir, "json_outputs")
-        confidence_dir = os.path.join(self.output_dir, "confidence_scores")
-        docx_copy_dir = os.path.join(self.output_dir, "docx_copies")
+        # Check if file exists
+        if not os.path.exists(path):
+            print(f"Error: File {path} does not exist")
+            result.error = f"File {path} does not exist"
+            return result
 
-        # Parse DOCX using mammoth
-        print(f"\nProcessing file: {docx_path}")
+        print(f"\nProcessing file: {path}")
+        start_time = time.perf_counter()
+        self._start_document_peak()
+        reset_usage()
+        store = self.store if persist else MemoryOutputStore()
+        # Usage recorded by earlier runs of a resumed document
+        previous_usage = {}
+        profile = self.profiler.document(base_filename) if self.profiler is not None else NULL_PROFILE
 
         try:
-            # Save a copy of the DOCX for future reference
-            docx_copy_path = os.path.join(docx_copy_dir, f"{base_filename}.docx")
-            with open(docx_path, 'rb') as src_file, open(docx_copy_path, 'wb') as dst_file:
-                dst_file.write(src_file.read())
+            source_sha256 = file_sha256(path)
+            # Parked documents always resume: their checkpoint was written by this processor
+            resume = persist and (self.resume or base_filename in self.parked)
+            checkpoint = self._load_checkpoint(store, base_filename, source_sha256) if resume else None
+            completed = STAGES.index(checkpoint["stage"]) + 1 if checkpoint else 0
+            if checkpoint is None:
+                checkpoint = {"source_sha256": source_sha256, "file_type": file_type, "timings": {}}
+            timings = result.timings = checkpoint["timings"]
+            previous_usage = checkpoint.get("usage") or {}
+
+            if completed == len(STAGES):
+                print(f"✓ Already processed, skipping: {base_filename}")
+                result.raw_outputs = {name: store.get(base_filename, RAW, name).decode("utf-8")
+                                      for name in checkpoint["parsers"]}
+                result.confidence_json = (store.get(base_filename, CONFIDENCE, "json") or b"").decode("utf-8") or None
+                result.final_json = (store.get(base_filename, FINAL, "json") or b"").decode("utf-8") or None
+                result.usage = previous_usage
+                result.locations = {name: store.location(base_filename, RAW, name) for name in checkpoint["parsers"]}
+                result.locations.update(confidence=store.location(base_filename, CONFIDENCE, "json"),
+                                        final=store.location(base_filename, FINAL, "json"))
+                if persist and not self.search_index.is_indexed(base_filename):
+                    self._update_search_index(base_filename, result.final_json, result.raw_outputs)
+                result.success = True
+                return result
+            if completed:
+                print(f"Resuming {base_filename} after the {STAGES[completed - 1]} stage")
 
-            # Parse with Mammoth
-            html_output, text_output = self.docx_parser.parse(docx_path)
+            predicted_seconds = None
+            if persist:
+                # Save a copy of the input file for future reference
+                copy_path = store.put_file(base_filename, COPY, file_type, path, digest=source_sha256)
 
-            # Save raw parsed outputs
-            with open(f"{raw_dir}/{base_filename}_html.html", "w", encoding="utf-8") as f:
-                f.write(html_output)
+                # Record the predicted processing time next to the actual one to improve the cost model
+                features = self.features.get(path)
+                predicted_seconds = self.cost_model.predict(features)
+                self._update_catalog(
+                    base_filename,
+                    original_name=original_name or os.path.basename(path),
+                    file_type=file_type,
+                    page_count=features.page_count,
+                    size_bytes=features.size_bytes,
+                    text_coverage=features.text_coverage,
+                    predicted_seconds=predicted_seconds,
+                    status="processing",
+                    source_path=os.path.abspath(path),
+                    copy_path=copy_path
+                )
 
-            with open(f"{raw_dir}/{base_filename}_text.md", "w", encoding="utf-8") as f:
-                f.write(text_output)
+            # Parse the document, or reload the parsed outputs of a previous run
+            if completed >= 1:
+                parsed_outputs = {name: store.get(base_filename, RAW, name).decode("utf-8")
+                                  for name in checkpoint["parsers"]}
+            else:
+                profile.stage("parse")
+                stage_start = time.perf_counter()
+                parsed_outputs = parse(path, progress_callback)
+                for name, output in parsed_outputs.items():
+                    store.put(base_filename, RAW, name, output)
+                timings["parse_seconds"] = time.perf_counter() - stage_start
+                checkpoint["parsers"] = list(parsed_outputs)
+                checkpoint["usage"] = merge_usage(previous_usage, current_usage())
+                self._save_checkpoint(store, base_filename, checkpoint, STAGE_PARSED)
+            result.raw_outputs = parsed_outputs
 
-            # Combine parsed outputs - for DOCX we only have HTML and text
-            parsed_outputs = {
-                "html": html_output,
-                "text": text_output
-            }
+            raw_paths = {name: store.location(base_filename, RAW, name) for name in parsed_outputs}
+            if persist:
+                self._update_catalog(base_filename, raw_paths=raw_paths, parse_seconds=timings["parse_seconds"])
 
-            # Step 1: Generate JSON schema and confidence scores using HTML-specific prompt
-            print(f"Step 1: Generating JSON schema and confidence scores for {base_filename}...")
-            schema_json, confidence_json = self.gemini_processor.generate_schema_and_confidence_for_html(parsed_outputs)
+            # Step 1: Generate JSON schema and confidence scores
+            if completed >= 2:
+                schema_json = checkpoint["schema_json"]
+                result.confidence_json = (store.get(base_filename, CONFIDENCE, "json") or b"").decode("utf-8") or None
+            else:
+                print(f"Step 1: Generating JSON schema and confidence scores for {base_filename}...")
+                self._report_progress(progress_callback, "Generating JSON schema and confidence scores", 0.5)
+                profile.stage("schema")
+                stage_start = time.perf_counter()
+                schema_json, confidence_json = generate_schema(parsed_outputs)
+                if not self._is_usable_schema(schema_json):
+                    raise RuntimeError("Failed to generate a schema: Step 1 returned no JSON object")
+
+                # Save confidence scores; the schema is only kept in the checkpoint
+                store.put(base_filename, CONFIDENCE, "json", confidence_json)
+                timings["schema_seconds"] = time.perf_counter() - stage_start
+                checkpoint["schema_json"] = schema_json
+                checkpoint["usage"] = merge_usage(previous_usage, current_usage())
+                self._save_checkpoint(store, base_filename, checkpoint, STAGE_SCHEMA)
+                result.confidence_json = confidence_json
 
-            # Save confidence scores
-            with open(f"{confidence_dir}/{base_filename}_confidence.json", "w", encoding="utf-8") as f:
-                f.write(confidence_json)
+            confidence_path = store.location(base_filename, CONFIDENCE, "json")
+            if persist:
+                self._update_catalog(base_filename, confidence_path=confidence_path,
+                                     schema_seconds=timings["schema_seconds"])
 
             # Step 2: Generate final structured JSON
             print(f"Step 2: Generating final structured JSON for {base_filename}...")
-            final_json = self.gemini_processor.generate_final_json_for_html(schema_json, parsed_outputs)
+            self._report_progress(progress_callback, "Generating final structured JSON", 0.75)
+            profile.stage("final")
+            stage_start = time.perf_counter()
+            final_json = generate_final(schema_json, parsed_outputs)
+            if final_json.startswith("Error:"):
+                raise RuntimeError(final_json)
+
+            # Save final JSON output and make the document's outputs visible
+            json_path = store.put(base_filename, FINAL, "json", final_json)
+            timings["final_seconds"] = time.perf_counter() - stage_start
+            result.usage = checkpoint["usage"] = merge_usage(previous_usage, current_usage())
+            self._save_checkpoint(store, base_filename, checkpoint, STAGE_FINAL)
+            result.final_json = final_json
+            result.peak_rss_mb = self._document_peak()
+            self.usage_report.add(base_filename, "completed", current_usage())
+
+            if persist:
+                self._update_catalog(
+                    base_filename,
+                    status="completed",
+                    json_path=json_path,
+                    final_seconds=timings["final_seconds"],
+                    total_seconds=sum(timings.values()),
+                    peak_rss_mb=result.peak_rss_mb,
+                    **self._usage_columns(result.usage)
+                )
+                result.locations = dict(raw_paths, confidence=confidence_path, final=json_path)
+                self._update_search_index(base_filename, final_json, parsed_outputs)
+
+            predicted = f" (predicted {predicted_seconds:.0f}s)" if predicted_seconds is not None else ""
+            print(f"✓ Successfully processed: {base_filename} in {time.perf_counter() - start_time:.1f}s{predicted}")
+            if persist:
+                print(f"  - Raw outputs saved to {', '.join(raw_paths.values())}")
+                print(f"  - Confidence scores saved to {confidence_path}")
+                print(f"  - Final JSON output saved to {json_path}")
+            if persist:
+                self.parked.pop(base_filename, None)
+                self.park_counts.pop(base_filename, None)
+            result.success = True
+            return result
 
-            # Save final JSON output
-            with open(f"{json_dir}/{base_filename}.json", "w", encoding="utf-8") as f:
-                f.write(final_json)
+        except CircuitOpenError as e:
+            if persist and self.park_counts.get(base_filename, 0) >= MAX_PARKS:
+                # The service keeps failing on this document: stop waiting for it
+                return self._fail_document(result, store, path, base_filename, e, previous_usage, persist)
 
-            print(f"✓ Successfully processed: {base_filename}")
-            print(f"  - Raw outputs saved to {raw_dir}/{base_filename}_*.html/md")
-            print(f"  - Confidence scores saved to {confidence_dir}/{base_filename}_confidence.json")
-            print(f"  - Final JSON output saved to {json_dir}/{base_filename}.json")
-            return True
+            # Keep the completed stages and retry the document once the service recovers
+            print(f"⏸ Parked {base_filename}: {str(e)}")
+            store.discard(base_filename)
+            result.error = str(e)
+            result.parked = True
+            result.peak_rss_mb = self._document_peak()
+            result.usage = merge_usage(previous_usage, current_usage())
+            self.usage_report.add(base_filename, "parked", current_usage())
+            if persist:
+                self.parked[base_filename] = e.breaker
+                self.park_counts[base_filename] = self.park_counts.get(base_filename, 0) + 1
+                self._update_catalog(base_filename, status="parked", peak_rss_mb=result.peak_rss_mb,
+                                     **self._usage_columns(result.usage))
+            return result
 
         except Exception as e:
-            print(f"✗ Error processing {docx_path}: {str(e)}")
-            return False
+            return self._fail_document(result, store, path, base_filename, e, previous_usage, persist)
+
+        finally:
+            self._finish_document_peak()
+            profile.close()
+
+    def _fail_document(self, result: ProcessingResult, store: OutputStore, path: str, base_filename: str,
+                       error: Exception, previous_usage: Dict[str, Any], persist: bool) -> ProcessingResult:
+        """Discard the uncommitted outputs of a failed document and record the failure"""
+        print(f"✗ Error processing {path}: {str(error)}")
+        store.discard(base_filename)
+        result.error = str(error)
+        result.peak_rss_mb = self._document_peak()
+        result.usage = merge_usage(previous_usage, current_usage())
+        self.usage_report.add(base_filename, "failed", current_usage())
+        if persist:
+            self.parked.pop(base_filename, None)
+            self.park_counts.pop(base_filename, None)
+            self._update_catalog(base_filename, status="failed", peak_rss_mb=result.peak_rss_mb,
+                                 **self._usage_columns(result.usage))
+        return result
+
+    def _parse_pdf(self, pdf_path: str, progress_callback: Optional[Callable[[str, float], None]],
+                   parsers: Sequence[str]) -> Dict[str, str]:
+        """
+        Parse a PDF with the selected parsers, skipping parsers that fail
+
+        Args:
+            pdf_path: Path to the PDF file
+            progress_callback: Optional callback receiving (stage description, fraction complete)
+            parsers: Names of the parsers to run
+
+        Returns:
+            Dictionary mapping parser names to their markdown outputs
+        """
+        parsed_outputs = {}
+        for index, name in enumerate(parsers):
+            self._report_progress(progress_callback, f"Parsing with {PARSER_LABELS[name]}",
+                                  0.05 + 0.4 * index / len(parsers))
+            try:
+                parsed_outputs[name] = self._run_parser(PDF_PARSER_ATTRIBUTES[name], "extract", pdf_path)
+            except MemoryLimitExceeded as e:
+                # The parser's worker was stopped; the remaining parsers handle the document
+                print(f"Warning: Skipping {PARSER_LABELS[name]}: {str(e)}")
+            except Exception as e:
+                # A failing parser, e.g. Mistral during an outage, leaves the others to do the work
+                print(f"Warning: Skipping {PARSER_LABELS[name]}: {str(e)}")
+
+        if not parsed_outputs:
+            raise RuntimeError(f"No parser could parse {pdf_path}")
+        return parsed_outputs
+
+    def _parse_docx(self, docx_path: str, progress_callback: Optional[Callable[[str, float], None]]) -> Dict[str, str]:
+        """Parse a DOCX into HTML and text, moving embedded images to the image store"""
+        # Parse with the configured DOCX engine
+        self._report_progress(progress_callback, "Parsing DOCX", 0.05)
+        try:
+            html_output, text_output = self._run_parser("docx_parser", "parse", docx_path)
+        except MemoryLimitExceeded as e:
+            if self.backend_options["docx"]["engine"] == "stream":
+                raise
+            # The streaming engine extracts the same document in bounded memory
+            print(f"Warning: {str(e)}, retrying with the stream DOCX engine")
+            html_output, text_output = self._run_parser("docx_parser", "parse", docx_path,
+                                                        options={"engine": "stream"})
+
+        # Replace inline base64 images with short placeholders before prompting
+        html_output, image_stats = externalize_images(html_output, self.image_store)
+        if image_stats["images"]:
+            print(f"  - {image_stats['images']} embedded image(s) moved to {self.image_store.directory} "
+                  f"({image_stats['bytes_saved']:,} bytes removed from the prompt HTML)")
+
+        # For DOCX we only have HTML and text
+        return {
+            "html": html_output,
+            "text": text_output
+        }
+
+    def _stages(self, file_type: str, parsers: Optional[Sequence[str]] = None) -> Tuple[Callable, Callable, Callable]:
+        """
+        Return the parse, schema and final stage functions of a file type
+
+        Args:
+            file_type: Input file type ("pdf" or "docx")
+            parsers: PDF parsers or profile to use instead of the processor's (see resolve_parsers)
+
+        Returns:
+            Tuple of the parse, Step 1 and Step 2 functions passed to _process_document()
+        """
+        if file_type == "pdf":
+            parsers = self.parsers if parsers is None else resolve_parsers(parsers)
+            return (
+                lambda path, callback: self._parse_pdf(path, callback, parsers),
+                lambda outputs: self.gemini_processor.generate_schema_and_confidence(outputs),
+                lambda schema_json, outputs: self.gemini_processor.generate_final_json(schema_json, outputs),
+            )
+        if file_type == "docx":
+            return (
+                self._parse_docx,
+                lambda outputs: self.gemini_processor.generate_schema_and_confidence_for_html(outputs),
+                lambda schema_json, outputs: self.gemini_processor.generate_final_json_for_html(schema_json, outputs),
+            )
+        raise ValueError(f"Unsupported file type: {file_type}. Choose one of: {', '.join(FILE_TYPES)}")
+
+    def process(self, source: Source,
+                name: Optional[str] = None,
+                persist: bool = True,
+                progress_callback: Optional[Callable[[str, float], None]] = None,
+                doc_id: Optional[str] = None,
+                parsers: Optional[Sequence[str]] = None) -> ProcessingResult:
+        """
+        Process a PDF or DOCX given as a path, bytes or a binary file object
+
+        Documents given as bytes or a file object are stored in the content-addressed blob
+        store of the output directory and named after their SHA-256 digest. With
+        persist=False, nothing is written to the output directory or the catalog: the
+        outputs are only returned, and bytes or file objects are spooled to a temporary
+        file (the parsers read from a path) that is removed afterwards.
+
+        Args:
+            source: Path of the file, its contents, or a readable binary file object
+            name: Original file name, recorded in the catalog and used to detect the file
+                type (defaults to the file name of the path or file object; without one,
+                the type is detected from the contents)
+            persist: Store the outputs and record the document in the catalog
+            progress_callback: Optional callback receiving (stage description, fraction complete)
+            doc_id: Document ID of the outputs (defaults to the file name without extension,
+                or the content digest for bytes and file objects)
+            parsers: PDF parsers or profile to use instead of the processor's (see resolve_parsers)
+
+        Returns:
+            The processing result; check its success attribute
+        """
+        if isinstance(source, (str, os.PathLike)):
+            path = os.fspath(source)
+            name = name or os.path.basename(path)
+            file_type = detect_file_type(name, path=path)
+            return self._process_document(path, file_type, *self._stages(file_type, parsers),
+                                          progress_callback, name, doc_id, persist=persist)
+
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+        name = name or os.path.basename(getattr(stream, "name", "") or "") or None
+        file_type = detect_file_type(name, stream=stream)
+        if persist:
+            digest, path = BlobStore(os.path.join(self.output_dir, "blobs")).put_stream(stream, suffix=f".{file_type}")
+            return self._process_document(path, file_type, *self._stages(file_type, parsers),
+                                          progress_callback, name, doc_id or digest, persist=True)
+
+        with tempfile.NamedTemporaryFile(suffix=f".{file_type}", delete=False) as spooled:
+            shutil.copyfileobj(stream, spooled)
+        try:
+            doc_id = doc_id or (os.path.splitext(name)[0] if name else "document")
+            result = self._process_document(spooled.name, file_type, *self._stages(file_type, parsers),
+                                            progress_callback, name, doc_id, persist=False)
+        finally:
+            os.remove(spooled.name)
+        result.source_path = None
+        return result
+
+    def process_pdf(self, pdf_path: str,
+                    progress_callback: Optional[Callable[[str, float], None]] = None,
+                    original_name: Optional[str] = None,
+                    doc_id: Optional[str] = None,
+                    parsers: Optional[Sequence[str]] = None) -> bool:
+        """
+        Process a single PDF file
+
+        Args:
+            pdf_path: Path to the PDF file
+            progress_callback: Optional callback receiving (stage description, fraction complete)
+            original_name: Name to record in the catalog (defaults to the file name)
+            doc_id: Document ID of the outputs (defaults to the file name without extension)
+            parsers: PDF parsers or profile to use instead of the processor's (see resolve_parsers)
+
+        Returns:
+            True if processing was successful, False otherwise
+        """
+        return self._process_document(pdf_path, "pdf", *self._stages("pdf", parsers),
+                                      progress_callback, original_name, doc_id).success
+
+    def process_docx(self, docx_path: str,
+                     progress_callback: Optional[Callable[[str, float], None]] = None,
+                     original_name: Optional[str] = None,
+                     doc_id: Optional[str] = None) -> bool:
+        """
+        Process a single DOCX file
+
+        Args:
+            docx_path: Path to the DOCX file
+            progress_callback: Optional callback receiving (stage description, fraction complete)
+            original_name: Name to record in the catalog (defaults to the file name)
+            doc_id: Document ID of the outputs (defaults to the file name without extension)
+
+        Returns:
+            True if processing was successful, False otherwise
+        """
+        return self._process_document(docx_path, "docx", *self._stages("docx"),
+                                      progress_callback, original_name, doc_id).success
 
     def process_directory(self, directory: str, limit: Optional[int] = None) -> Tuple[int, int]:
         """
         Process all PDF and DOCX files in a directory
 
+        The cost model's predicted processing time of the batch is printed first when the
+        features of every file fit in the feature cache, so extracting them up front is not
+        repeated during processing; for larger directories an estimate of the remaining time
+        is printed after each document instead, from the features it was processed with.
+        Documents parked
+        because Gemini was unavailable are retried at the end, once its circuit breaker lets
+        calls through again, for up to PARK_TIMEOUT_SECONDS. The first Ctrl+C lets the
+        current document finish and then stops; a second one aborts immediately. Documents
+        that were not processed can be picked up with resume=True.
+
         Args:
             directory: Directory containing PDF and DOCX files
             limit: Maximum number of files to process
@@ -230,25 +936,52 @@ class DocumentProcessor:
         else:
             print(f"Processing {len(all_files)} files from directory: {directory}")
 
+        # Documents are processed one at a time, so their order does not change the total time.
+        # Features extracted here are reused by processing as long as they stay in the cache.
+        estimate_upfront = len(all_files) <= self.features.max_entries
+        if estimate_upfront:
+            predicted = sum(self.cost_model.predict(self.features.get(os.path.join(directory, f))) for f in all_files)
+            print(f"Predicted processing time: {predicted / 60:.1f} minutes")
+        predicted_done = 0.0
+
         # Process each file
         successful = 0
         failed = 0
+        stop_requested = threading.Event()
+        remaining = 0
 
-        for i, file in enumerate(all_files):
-            file_path = os.path.join(directory, file)
-            print(f"\n[{i+1}/{len(all_files)}] Processing: {file}")
-
-            # Process based on file extension
-            if file.lower().endswith('.pdf'):
-                if self.process_pdf(file_path):
-                    successful += 1
-                else:
-                    failed += 1
-            elif file.lower().endswith('.docx'):
-                if self.process_docx(file_path):
+        with drain_on_interrupt(stop_requested, "Interrupt received: finishing the current document, then stopping."):
+            for i, file in enumerate(all_files):
+                if stop_requested.is_set():
+                    remaining = len(all_files) - i
+                    break
+                if self._process_directory_file(directory, file, i, len(all_files)):
                     successful += 1
                 else:
                     failed += 1
+                if not estimate_upfront and i + 1 < len(all_files):
+                    # Processing has just extracted the document's features, so this reads the cache
+                    with suppress(OSError):
+                        predicted_done += self.cost_model.predict(self.features.get(os.path.join(directory, file)))
+                    remaining_seconds = predicted_done / (i + 1) * (len(all_files) - i - 1)
+                    print(f"Predicted time remaining: {remaining_seconds / 60:.1f} minutes")
+
+            # Retry parked documents once the service that stopped them lets calls through again
+            park_deadline = time.monotonic() + PARK_TIMEOUT_SECONDS
+            while not stop_requested.is_set() and time.monotonic() < park_deadline:
+                parked = [file for file in all_files if os.path.splitext(file)[0] in self.parked]
+                if not parked:
+                    break
+                wait = max([PARK_POLL_SECONDS] + [self.parked[os.path.splitext(file)[0]].retry_in() for file in parked])
+                print(f"\n{len(parked)} document(s) parked while a service is unavailable, retrying in {wait:.0f}s")
+                if stop_requested.wait(wait):
+                    break
+                for i, file in enumerate(parked):
+                    if stop_requested.is_set():
+                        break
+                    if self._process_directory_file(directory, file, i, len(parked)):
+                        successful += 1
+                        failed -= 1
 
         # Print summary
         print("\n" + "="*50)
@@ -256,10 +989,53 @@ class DocumentProcessor:
         print(f"  - Total files: {len(all_files)}")
         print(f"  - Successfully processed: {successful}")
         print(f"  - Failed: {failed}")
-        print("\nOutput Directories:")
-        print(f"  - Raw parser outputs: {os.path.join(self.output_dir, 'raw_outputs')}")
-        print(f"  - Confidence scores: {os.path.join(self.output_dir, 'confidence_scores')}")
-        print(f"  - Final JSON outputs: {os.path.join(self.output_dir, 'json_outputs')}")
+        if remaining:
+            print(f"  - Not processed (interrupted): {remaining}, rerun with --resume to continue")
+        still_parked = sum(1 for file in all_files if os.path.splitext(file)[0] in self.parked)
+        if still_parked:
+            print(f"  - Failed because a service was unavailable: {still_parked}, rerun with --resume to continue")
+        for name, stats in self.hedging_stats().items():
+            if stats["hedged"] or stats["deadlines_exceeded"]:
+                print(f"  - {name} calls: {stats['calls']}, hedged: {stats['hedged']} ({stats['hedge_rate']:.0%}), "
+                      f"won by the hedge: {stats['hedge_wins']}, past the deadline: {stats['deadlines_exceeded']}")
+        self._print_usage_summary()
+        json_repair = self.json_repair_stats()
+        if json_repair and (json_repair["repaired"] or json_repair["invalid"]):
+            print(f"  - Gemini responses: {json_repair['responses']}, JSON repaired locally: {json_repair['repaired']} "
+                  f"(retries saved), unusable and retried: {json_repair['invalid']}")
+        if isinstance(self.store, FileOutputStore):
+            print("\nOutput Directories:")
+            print(f"  - Raw parser outputs: {os.path.join(self.output_dir, 'raw_outputs')}")
+            print(f"  - Confidence scores: {os.path.join(self.output_dir, 'confidence_scores')}")
+            print(f"  - Final JSON outputs: {os.path.join(self.output_dir, 'json_outputs')}")
+        else:
+            print(f"\nOutputs stored in: {self.store.describe()}")
         print("="*50)
 
         return successful, failed
+
+    def _print_usage_summary(self, top: int = 3) -> None:
+        """Print the API usage of the run by step, and the documents that used the most tokens"""
+        totals = self.usage_report.totals()
+        if not totals["api_calls"]:
+            return
+        print(f"  - API usage: {totals['prompt_tokens']:,} prompt tokens ({totals['cached_tokens']:,} cached), "
+              f"{totals['output_tokens']:,} output tokens, {totals['ocr_pages']:,} OCR pages, "
+              f"{totals['api_calls']:,} calls, {totals['api_seconds']:.0f}s")
+        for step, counters in sorted(self.usage_report.steps().items()):
+            pages = f", {counters['ocr_pages']:,} pages" if counters["ocr_pages"] else ""
+            print(f"      {step}: {counters['prompt_tokens']:,} prompt / {counters['output_tokens']:,} output tokens"
+                  f"{pages}, {counters['api_calls']:,} calls, {counters['api_seconds']:.0f}s")
+        documents = [row for row in self.usage_report.top_documents(top) if row["prompt_tokens"] + row["output_tokens"]]
+        if documents:
+            print("  - Most tokens: " + ", ".join(f"{row['doc_id']} ({row['prompt_tokens'] + row['output_tokens']:,})"
+                                                 for row in documents))
+
+    def _process_directory_file(self, directory: str, file: str, index: int, total: int) -> bool:
+        """Process one file of a directory run based on its extension"""
+        file_path = os.path.join(directory, file)
+        print(f"\n[{index+1}/{total}] Processing: {file}")
+
+        if file.lower().endswith('.pdf'):
+            return self.process_pdf(file_path)
+        return self.process_docx(file_path)
@@ -0,0 +1,114 @@
+"""
+Base class for PDF parsers and the parser sets a run can choose from
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+# PDF parsers by output name, in the order they run
+PDF_PARSERS = ("mistral_ocr", "docling", "pymupdf")
+
+# Section headers of each parser's output in the prompts
+PARSER_LABELS = {
+    "mistral_ocr": "Mistral OCR",
+    "docling": "Docling",
+    "pymupdf": "PyMuPDF",
+    "html": "HTML",
+    "text": "Plain Text",
+}
+
+# Named parser sets, from fastest and cheapest to most thorough
+PARSER_PROFILES: Dict[str, Tuple[str, ...]] = {
+    "fast": ("pymupdf",),
+    "local": ("docling", "pymupdf"),
+    "full": PDF_PARSERS,
+}
+
+DEFAULT_PARSER_PROFILE = "full"
+
+
+def use_offline_models(artifacts_path: Optional[str] = None) -> Optional[str]:
+    """
+    Turn off Hugging Face Hub lookups for a run whose Docling models are local
+
+    huggingface_hub reads HF_HUB_OFFLINE once, when Docling first imports it, so entry
+    points call this before anything imports Docling. Parser worker processes inherit
+    the setting. An HF_HUB_OFFLINE already set in the environment is kept.
+
+    Args:
+        artifacts_path: Directory of pre-downloaded Docling models (defaults to the
+            DOCLING_ARTIFACTS_PATH environment variable)
+
+    Returns:
+        The artifacts directory, or None if the models are not local
+    """
+    artifacts_path = artifacts_path or os.getenv("DOCLING_ARTIFACTS_PATH")
+    if artifacts_path:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    return artifacts_path
+
+
+class BaseParser:
+    """
+    Interface of the PDF parsers
+
+    A parser turns a PDF into markdown text. Its output is stored and sent to Gemini
+    under `name`.
+    """
+
+    # Output name of the parser (a key of PARSER_LABELS)
+    name: str = ""
+
+    def parse(self, pdf_path: str):
+        """Parse a PDF with the parser's own return type"""
+        raise NotImplementedError
+
+    def warmup(self) -> Dict[str, float]:
+        """
+        Load models or clients ahead of the first document
+
+        Returns:
+            Dictionary of load times in seconds, empty if the parser has nothing to load
+        """
+        return {}
+
+    def extract(self, pdf_path: str) -> str:
+        """
+        Extract the markdown text of a PDF
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Extracted text in markdown format
+        """
+        return self.parse(pdf_path)
+
+
+def resolve_parsers(parsers: Optional[Sequence[str]] = None) -> Tuple[str, ...]:
+    """
+    Resolve a profile name or a list of parser names to the PDF parsers to run
+
+    Args:
+        parsers: A profile name ("fast", "local", "full"), parser names, or a single
+            comma-separated string of them (defaults to the full profile)
+
+    Returns:
+        Parser names in run order
+    """
+    if parsers is None:
+        parsers = DEFAULT_PARSER_PROFILE
+    if isinstance(parsers, str):
+        parsers = [name.strip() for name in parsers.split(",") if name.strip()]
+
+    names = []
+    for name in parsers:
+        for parser in PARSER_PROFILES.get(name, (name,)):
+            if parser not in PDF_PARSERS:
+                raise ValueError(f"Unknown parser or profile: {name}. Choose from: "
+                                 f"{', '.join(list(PARSER_PROFILES) + list(PDF_PARSERS))}")
+            if parser not in names:
+                names.append(parser)
+    if not names:
+        raise ValueError("At least one parser is required")
+    return tuple(parser for parser in PDF_PARSERS if parser in names)
@@ -2,46 +2,94 @@
 DOCX parser module for extracting text from DOCX documents
 """
 
-import mammoth
+import io
 import os
-from typing import Tuple
+from typing import BinaryIO, Tuple, Union
+
+from ..utils.file_utils import open_mapped
+from ..utils.html_utils import html_to_text
+from .docx_stream_parser import DocxStreamParser
+
+# Available DOCX extraction engines
+DOCX_ENGINES = ("mammoth", "stream")
 
 
 class DocxParser:
     """
     Parser that uses mammoth to extract HTML from DOCX documents
     """
-    
+
+    def __init__(self, engine: str = "mammoth"):
+        """
+        Initialize the DOCX parser
+
+        Args:
+            engine: Extraction engine, "mammoth" for full-fidelity HTML or "stream" for
+                low-memory streaming extraction of very large documents
+        """
+        if engine not in DOCX_ENGINES:
+            raise ValueError(f"Unknown DOCX engine: {engine}. Choose one of: {', '.join(DOCX_ENGINES)}")
+
+        self.engine = engine
+        self.stream_parser = DocxStreamParser() if engine == "stream" else None
+
     def parse(self, docx_path: str) -> Tuple[str, str]:
         """
-        Parse a DOCX document using mammoth
-        
+        Parse a DOCX document using the configured engine
+
+        With mammoth, the file is memory-mapped and converted in a single pass; the
+        plain text is derived from the resulting HTML.
+
         Args:
             docx_path: Path to the DOCX file
-            
+
         Returns:
             Tuple containing:
                 - Extracted HTML content
                 - Plain text content (as a fallback)
         """
+        if self.stream_parser is not None:
+            return self.stream_parser.parse(docx_path)
+
         print(f"Parsing with Mammoth: {docx_path}")
-        
+
         try:
             # Check if file exists
             if not os.path.exists(docx_path):
                 raise FileNotFoundError(f"File not found: {docx_path}")
-            
-            # Convert DOCX to HTML
-            with open(docx_path, 'rb') as docx_file:
-                result = mammoth.convert_to_html(docx_file)
-                html = result.value
-                
-                # Also extract plain text as a fallback
-                text_result = mammoth.extract_raw_text(docx_file)
-                text = text_result.value
-                
-                return html, text
-                
+
+            # Map the document so the zip is parsed once without copying the file into memory
+            with open_mapped(docx_path) as docx_file:
+                return self.parse_bytes(docx_file)
+
         except Exception as e:
             print(f"Error parsing with Mammoth: {e}")
             return f"<p>Error parsing with Mammoth: {str(e)}</p>", f"Error parsing with Mammoth: {str(e)}"
+
+    def parse_bytes(self, docx_bytes: Union[bytes, BinaryIO]) -> Tuple[str, str]:
+        """
+        Parse an in-memory DOCX document using the configured engine
+
+        Args:
+            docx_bytes: Contents of the DOCX file, or a seekable binary file object
+
+        Returns:
+            Tuple containing:
+                - Extracted HTML content
+                - Plain text content (as a fallback)
+        """
+        docx_file = io.BytesIO(docx_bytes) if isinstance(docx_bytes, bytes) else docx_bytes
+
+        if self.stream_parser is not None:
+            return self.stream_parser.parse_bytes(docx_file)
+
+        # Convert DOCX to HTML; mammoth is only imported by runs that use it
+        import mammoth
+
+        result = mammoth.convert_to_html(docx_file)
+        html = result.value
+
+        # Derive the plain text fallback from the same conversion
+        text = html_to_text(html)
+
+        return html, text
@@ -0,0 +1,250 @@
+"""
+Streaming DOCX parser module for extracting text from very large DOCX documents
+"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from html import escape
+from typing import IO, Dict, Iterator, List, NamedTuple, Tuple, Union
+
+# WordprocessingML namespace
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+HEADING_STYLE_PATTERN = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+
+class DocxBlock(NamedTuple):
+    """
+    A block-level element of a DOCX document
+    """
+    kind: str                   # "heading", "paragraph", "list_item" or "table_row"
+    text: str                   # Block text (cells joined by tabs for table rows)
+    level: int = 0              # Heading level, 0 for non-headings
+    cells: Tuple[str, ...] = () # Cell texts for table rows
+    table: int = -1             # Index of the table a row belongs to, -1 outside tables
+
+
+class DocxStreamParser:
+    """
+    Parser that streams word/document.xml with incremental XML parsing
+
+    Unlike mammoth, the document model is never built in memory: each block is emitted as
+    soon as it has been read and the parsed XML elements are discarded, so memory stays
+    bounded regardless of the document size. Formatting, images and footnotes are ignored.
+    """
+
+    def iter_blocks(self, docx_source: Union[str, IO[bytes]]) -> Iterator[DocxBlock]:
+        """
+        Iterate over the headings, paragraphs, list items and table rows of a DOCX document
+
+        Args:
+            docx_source: Path to the DOCX file or a binary file-like object
+
+        Yields:
+            Document blocks in reading order
+        """
+        with zipfile.ZipFile(docx_source) as docx:
+            heading_levels = self._read_heading_levels(docx)
+
+            with docx.open("word/document.xml") as document_xml:
+                yield from self._iter_document(document_xml, heading_levels)
+
+    def parse(self, docx_path: str) -> Tuple[str, str]:
+        """
+        Parse a DOCX document by streaming its XML
+
+        Args:
+            docx_path: Path to the DOCX file
+
+        Returns:
+            Tuple containing:
+                - Extracted HTML content
+                - Plain text content (as a fallback)
+        """
+        print(f"Parsing with streaming DOCX parser: {docx_path}")
+
+        try:
+            return self.render(self.iter_blocks(docx_path))
+        except Exception as e:
+            print(f"Error parsing with streaming DOCX parser: {e}")
+            return f"<p>Error parsing with streaming DOCX parser: {str(e)}</p>", f"Error parsing with streaming DOCX parser: {str(e)}"
+
+    def parse_bytes(self, docx_file: IO[bytes]) -> Tuple[str, str]:
+        """
+        Parse a DOCX document from a binary file-like object
+
+        Args:
+            docx_file: Binary file-like object containing the DOCX file
+
+        Returns:
+            Tuple containing:
+                - Extracted HTML content
+                - Plain text content (as a fallback)
+        """
+        return self.render(self.iter_blocks(docx_file))
+
+    @staticmethod
+    def render(blocks: Iterator[DocxBlock]) -> Tuple[str, str]:
+        """
+        Render document blocks to the HTML and plain text shape produced by DocxParser
+
+        Args:
+            blocks: Document blocks
+
+        Returns:
+            Tuple containing:
+                - HTML content
+                - Plain text content
+        """
+        html_parts: List[str] = []
+        text_parts: List[str] = []
+        open_container = None  # "ul" or "table"
+        current_table = -1
+
+        for block in blocks:
+            # Close the open list or table when the block does not continue it
+            if open_container == "ul" and block.kind != "list_item":
+                html_parts.append("</ul>")
+                open_container = None
+            elif open_container == "table" and (block.kind != "table_row" or block.table != current_table):
+                html_parts.append("</table>")
+                open_container = None
+
+            if block.kind == "heading":
+                html_parts.append(f"<h{block.level}>{escape(block.text)}</h{block.level}>")
+                text_parts.append(block.text + "\n\n")
+            elif block.kind == "list_item":
+                if open_container != "ul":
+                    html_parts.append("<ul>")
+                    open_container = "ul"
+                html_parts.append(f"<li>{escape(block.text)}</li>")
+                text_parts.append(block.text + "\n\n")
+            elif block.kind == "table_row":
+                if open_container != "table":
+                    html_parts.append("<table>")
+                    open_container = "table"
+                    current_table = block.table
+                cells = "".join(f"<td><p>{escape(cell)}</p></td>" for cell in block.cells)
+                html_parts.append(f"<tr>{cells}</tr>")
+                text_parts.extend(cell + "\n\n" for cell in block.cells)
+            else:
+                html_parts.append(f"<p>{escape(block.text)}</p>")
+                text_parts.append(block.text + "\n\n")
+
+        if open_container is not None:
+            html_parts.append(f"</{open_container}>")
+
+        return "".join(html_parts), "".join(text_parts)
+
+    @staticmethod
+    def _read_heading_levels(docx: zipfile.ZipFile) -> Dict[str, int]:
+        """
+        Map paragraph style IDs to heading levels using word/styles.xml
+
+        Args:
+            docx: Open DOCX archive
+
+        Returns:
+            Dictionary of style ID to heading level
+        """
+        heading_levels = {}
+        if "word/styles.xml" in docx.namelist():
+            with docx.open("word/styles.xml") as styles_xml:
+                for style in ET.parse(styles_xml).getroot().iter(f"{W_NS}style"):
+                    style_id = style.get(f"{W_NS}styleId", "")
+                    name_element = style.find(f"{W_NS}name")
+                    name = name_element.get(f"{W_NS}val", "") if name_element is not None else ""
+                    match = HEADING_STYLE_PATTERN.match(name)
+                    if match:
+                        heading_levels[style_id] = int(match.group(1))
+                    elif name.lower() == "title":
+                        heading_levels[style_id] = 1
+        return heading_levels
+
+    @staticmethod
+    def _heading_level(style_id: str, heading_levels: Dict[str, int]) -> int:
+        """Return the heading level of a paragraph style, or 0 if it is not a heading"""
+        if style_id in heading_levels:
+            return heading_levels[style_id]
+        # Fall back to the built-in English style IDs (Heading1, Heading2, ...)
+        match = re.match(r"^Heading(\d)$", style_id)
+        return int(match.group(1)) if match else 0
+
+    def _iter_document(self, document_xml: IO[bytes], heading_levels: Dict[str, int]) -> Iterator[DocxBlock]:
+        """
+        Incrementally parse word/document.xml into blocks
+
+        Args:
+            document_xml: Binary stream of word/document.xml
+            heading_levels: Mapping of style ID to heading level
+
+        Yields:
+            Document blocks in reading order
+        """
+        body = None
+        table_depth = 0
+        table_index = -1
+        cell_paragraphs: List[str] = []
+        row_cells: List[str] = []
+
+        for event, elem in ET.iterparse(document_xml, events=("start", "end")):
+            tag = elem.tag
+
+            if event == "start":
+                if tag == f"{W_NS}body":
+                    body = elem
+                elif tag == f"{W_NS}tbl":
+                    table_depth += 1
+                    if table_depth == 1:
+                        table_index += 1
+                continue
+
+            if tag == f"{W_NS}p":
+                text = self._paragraph_text(elem)
+                if table_depth:
+                    cell_paragraphs.append(text)
+                else:
+                    yield self._paragraph_block(elem, text, heading_levels)
+                elem.clear()
+            elif tag == f"{W_NS}tc" and table_depth == 1:
+                row_cells.append("\n".join(cell_paragraphs))
+                cell_paragraphs = []
+                elem.clear()
+            elif tag == f"{W_NS}tr" and table_depth == 1:
+                yield DocxBlock("table_row", "\t".join(row_cells), cells=tuple(row_cells), table=table_index)
+                row_cells = []
+                elem.clear()
+            elif tag == f"{W_NS}tbl":
+                table_depth -= 1
+                elem.clear()
+
+            # Drop processed top-level elements so memory does not grow with the document
+            if body is not None and table_depth == 0 and tag in (f"{W_NS}p", f"{W_NS}tbl", f"{W_NS}sdt"):
+                body.clear()
+
+    def _paragraph_block(self, paragraph: ET.Element, text: str, heading_levels: Dict[str, int]) -> DocxBlock:
+        """Classify a top-level paragraph as a heading, list item or plain paragraph"""
+        properties = paragraph.find(f"{W_NS}pPr")
+        if properties is not None:
+            style = properties.find(f"{W_NS}pStyle")
+            if style is not None:
+                level = self._heading_level(style.get(f"{W_NS}val", ""), heading_levels)
+                if level:
+                    return DocxBlock("heading", text, level=level)
+            if properties.find(f"{W_NS}numPr") is not None:
+                return DocxBlock("list_item", text)
+        return DocxBlock("paragraph", text)
+
+    @staticmethod
+    def _paragraph_text(paragraph: ET.Element) -> str:
+        """Concatenate the text runs, tabs and breaks of a paragraph"""
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{W_NS}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{W_NS}tab":
+                parts.append("\t")
+            elif node.tag in (f"{W_NS}br", f"{W_NS}cr"):
+                parts.append("\n")
+        return "".join(parts)
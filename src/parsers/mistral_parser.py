@@ -3,31 +3,64 @@ Mistral OCR parser module for extracting text from PDF documents
 """
 
 import os
-from typing import Tuple
+import time
+import random
+from typing import Optional, Tuple
 from mistralai import Mistral
 
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from ..utils.hedging import DEFAULT_HEDGE_BUDGET, Hedger
+from ..utils.usage import record_usage
+from .base import BaseParser
 
-class MistralParser:
+# Seconds before an OCR call is hedged, until its latency percentile is known
+MISTRAL_INITIAL_HEDGE_DELAY = 60.0
+
+# Timeout of each Mistral request when no call deadline is given
+MISTRAL_DEFAULT_TIMEOUT = 300.0
+
+
+class MistralParser(BaseParser):
     """
     Parser that uses Mistral OCR to extract text from PDF documents
     """
+
+    name = "mistral_ocr"
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, hedge_api_key: str = None,
+                 hedge_budget: float = DEFAULT_HEDGE_BUDGET, call_deadline: Optional[float] = None):
         """
         Initialize the Mistral parser
         
         Args:
             api_key: Mistral API key (defaults to MISTRAL_API_KEY environment variable)
+            hedge_api_key: API key for hedged requests (defaults to MISTRAL_HEDGE_API_KEY
+                environment variable, then to api_key)
+            hedge_budget: Fraction of calls that may be duplicated when they are slow (0 disables hedging)
+            call_deadline: Seconds after which a call is abandoned (defaults to a 300 second
+                timeout per request)
         """
         self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
         if not self.api_key:
             raise ValueError("Mistral API key is required. Set MISTRAL_API_KEY environment variable or pass it directly.")
         
-        self.client = Mistral(api_key=self.api_key)
+        timeout_ms = int((call_deadline or MISTRAL_DEFAULT_TIMEOUT) * 1000)
+        self.client = Mistral(api_key=self.api_key, timeout_ms=timeout_ms)
+
+        # Hedged requests go to a second account when one is configured, so they draw on its rate limits
+        hedge_api_key = hedge_api_key or os.getenv("MISTRAL_HEDGE_API_KEY")
+        self.hedge_client = Mistral(api_key=hedge_api_key, timeout_ms=timeout_ms) if hedge_api_key else self.client
+        self.hedger = Hedger("Mistral", MISTRAL_INITIAL_HEDGE_DELAY, budget=hedge_budget, deadline=call_deadline)
+        self.breaker = get_circuit_breaker("Mistral", "ocr")
     
     def parse(self, pdf_path: str) -> Tuple[str, str]:
         """
-        Parse a PDF document using Mistral OCR
+        Parse a PDF document using Mistral OCR, hedging the request if it is slow
+
+        Failed calls are retried with exponential backoff. While Mistral is failing for
+        every document, its circuit breaker raises CircuitOpenError without calling it.
+        Attempts, their time and the pages billed are recorded as the usage of the
+        "mistral_ocr" step.
         
         Args:
             pdf_path: Path to the PDF file
@@ -38,19 +71,52 @@ class MistralParser:
                 - Signed URL for the document
         """
         print(f"Parsing with Mistral OCR: {pdf_path}")
-        
+
+        # Implement retry logic with exponential backoff
+        max_retries = 3
+        base_delay = 2  # seconds
+
+        for attempt in range(1, max_retries + 1):
+            attempt_start = time.perf_counter()
+            try:
+                markdown, url, pages = self.breaker.call(lambda: self.hedger.call(
+                    "ocr",
+                    lambda: self._parse_with(self.client, pdf_path),
+                    lambda: self._parse_with(self.hedge_client, pdf_path)
+                ))
+                record_usage(self.name, ocr_pages=pages, api_calls=1, api_seconds=time.perf_counter() - attempt_start)
+                return markdown, url
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                record_usage(self.name, api_calls=1, api_seconds=time.perf_counter() - attempt_start)
+                print(f"Mistral API error (attempt {attempt}/{max_retries}): {str(e)}")
+                if attempt == max_retries:
+                    raise
+
+                # Calculate delay with exponential backoff and jitter
+                delay = base_delay * (2 ** (attempt - 1)) * (1 + random.uniform(-0.2, 0.2))
+                print(f"Retrying in {delay:.2f} seconds...")
+                time.sleep(delay)
+
+    def extract(self, pdf_path: str) -> str:
+        return self.parse(pdf_path)[0]
+
+    @staticmethod
+    def _parse_with(client: Mistral, pdf_path: str) -> Tuple[str, str, int]:
+        """Upload a PDF and run OCR on it with the given client, returning the markdown, URL and pages billed"""
         # Upload the file to Mistral for OCR processing
         with open(pdf_path, "rb") as file:
-            uploaded_pdf = self.client.files.upload(
+            uploaded_pdf = client.files.upload(
                 file={"file_name": os.path.basename(pdf_path), "content": file},
                 purpose="ocr"
             )
 
         # Get the signed URL to allow secure processing
-        signed_url = self.client.files.get_signed_url(file_id=uploaded_pdf.id)
+        signed_url = client.files.get_signed_url(file_id=uploaded_pdf.id)
 
         # Process OCR on the document using the signed URL
-        ocr_response = self.client.ocr.process(
+        ocr_response = client.ocr.process(
             model="mistral-ocr-latest",
             document={"type": "document_url", "document_url": signed_url.url},
         )
@@ -60,4 +126,6 @@ class MistralParser:
         for page in ocr_response.pages:
             mistral_md += page.markdown + "\n\n"
         
-        return mistral_md, signed_url.url
+        usage_info = getattr(ocr_response, "usage_info", None)
+        pages = getattr(usage_info, "pages_processed", None) or len(ocr_response.pages)
+        return mistral_md, signed_url.url, pages
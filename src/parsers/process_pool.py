@@ -0,0 +1,207 @@
+"""
+Pool of worker processes that run parsers with bounded memory
+"""
+
+import atexit
+import signal
+import threading
+import multiprocessing
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..registry import create_backend
+from ..utils.memory import current_rss_mb, peak_rss_mb, reset_peak_rss
+
+# Documents a worker process parses before it is replaced, releasing memory the parsers never give back
+DEFAULT_MAX_TASKS_PER_CHILD = 20
+
+# Seconds between memory checks of a busy worker process
+DEFAULT_MEMORY_POLL_INTERVAL = 0.5
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """Raised when a parser's worker process goes over the memory limit and is stopped"""
+
+    def __init__(self, backend: str, rss_mb: float, limit_mb: Optional[float]):
+        self.backend = backend
+        self.rss_mb = rss_mb
+        self.limit_mb = limit_mb
+        if limit_mb is None:
+            message = f"{backend} parser process was killed by the system at {rss_mb:.0f} MB"
+        else:
+            message = f"{backend} parser process reached {rss_mb:.0f} MB, over the {limit_mb:.0f} MB limit"
+        super().__init__(message)
+
+
+def _serve(conn) -> None:
+    """
+    Run parser tasks received over a pipe until the pipe is closed
+
+    Each task is (backend, options, method, args). Backends are created once per
+    process and options; the reply is (status, value, peak RSS in MB of the task).
+    """
+    backends: Dict[Tuple[str, str], Any] = {}
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        backend, options, method, args = task
+        reset_peak_rss()
+        try:
+            key = (backend, repr(sorted(options.items())))
+            if key not in backends:
+                backends[key] = create_backend(backend, **options)
+            reply = ("ok", getattr(backends[key], method)(*args))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        conn.send(reply + (peak_rss_mb(),))
+    conn.close()
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # Not a daemon, so parsers can start processes of their own
+        self.process = context.Process(target=_serve, args=(child_conn,), name="parser-worker")
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the process to exit, killing it if it does not"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self) -> None:
+        """Kill the process immediately"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParserProcessPool:
+    """
+    Runs parsers in worker processes that are recycled and stopped when they use too much memory
+
+    Memory a parser allocates for one document (e.g. Docling on a large scan) stays in
+    its worker process, which is replaced after max_tasks_per_child documents, so a long
+    run does not keep growing. A worker whose resident memory goes over max_rss_mb is
+    killed and the call raises MemoryLimitExceeded, leaving the caller to route the
+    document elsewhere.
+
+    Workers are started with the "spawn" method: forking a process that runs threads
+    (hedged calls, the HTTP service) is not safe. Idle workers are reused, and a new one
+    is started when every worker is busy, so each thread of the caller has at most one.
+    """
+
+    def __init__(self,
+                 max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+                 max_rss_mb: Optional[float] = None,
+                 poll_interval: float = DEFAULT_MEMORY_POLL_INTERVAL):
+        """
+        Initialize the pool
+
+        Args:
+            max_tasks_per_child: Tasks a worker process runs before it is replaced
+            max_rss_mb: Resident memory in MB above which a worker is killed (optional)
+            poll_interval: Seconds between memory checks of a busy worker
+        """
+        if max_tasks_per_child < 1:
+            raise ValueError("max_tasks_per_child must be at least 1")
+        if max_rss_mb is not None and max_rss_mb <= 0:
+            raise ValueError("max_rss_mb must be positive")
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_rss_mb = max_rss_mb
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, or start one"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Parser process pool is closed")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.kill()
+        return _Worker(self._context)
+
+    def _release(self, worker: _Worker) -> None:
+        """Return a worker to the pool, or replace it once it has run its share of tasks"""
+        worker.tasks += 1
+        with self._lock:
+            if not self._closed and worker.tasks < self.max_tasks_per_child:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def run(self, backend: str, options: Dict[str, Any], method: str, *args) -> Tuple[Any, Optional[float]]:
+        """
+        Call a method of a backend in a worker process
+
+        Args:
+            backend: Backend name (a key of registry.BACKENDS)
+            options: Keyword arguments of the backend's constructor
+            method: Name of the method to call
+            *args: Arguments of the method, which must be picklable
+
+        Returns:
+            Tuple containing:
+                - The method's return value
+                - Peak resident memory in MB of the worker during the call, if known
+
+        Raises:
+            MemoryLimitExceeded: If the worker went over max_rss_mb or was killed by the system
+            RuntimeError: If the method raised or the worker died
+        """
+        worker = self._acquire()
+        sampled_peak = 0.0
+        try:
+            worker.conn.send((backend, options, method, args))
+            while not worker.conn.poll(self.poll_interval):
+                rss = current_rss_mb(worker.process.pid)
+                if rss is not None:
+                    sampled_peak = max(sampled_peak, rss)
+                    if self.max_rss_mb is not None and rss > self.max_rss_mb:
+                        raise MemoryLimitExceeded(backend, rss, self.max_rss_mb)
+                if not worker.process.is_alive():
+                    break
+            try:
+                status, value, peak = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join()
+                # SIGKILL from outside the pool is almost always the kernel's OOM killer
+                if worker.process.exitcode == -signal.SIGKILL:
+                    raise MemoryLimitExceeded(backend, sampled_peak, None)
+                raise RuntimeError(f"{backend} parser process exited with code {worker.process.exitcode}")
+        except BaseException:
+            worker.kill()
+            raise
+
+        self._release(worker)
+        peak = max(peak or 0.0, sampled_peak) or None
+        if status == "error":
+            raise RuntimeError(value)
+        return value, peak
+
+    def close(self) -> None:
+        """Stop all idle workers; busy workers are stopped when their task returns"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
@@ -4,11 +4,15 @@ PyMuPDF parser module for extracting text from PDF documents
 
 import pymupdf4llm
 
+from .base import BaseParser
 
-class PyMuPDFParser:
+
+class PyMuPDFParser(BaseParser):
     """
     Parser that uses PyMuPDF to extract text from PDF documents
     """
+
+    name = "pymupdf"
     
     def parse(self, pdf_path: str) -> str:
         """
@@ -19,12 +23,9 @@ class PyMuPDFParser:
             
         Returns:
             Extracted text in markdown format
+
+        Raises:
+            Exception: If PyMuPDF cannot read the PDF; the error is not turned into output text
         """
         print(f"Parsing with PyMuPDF: {pdf_path}")
-        
-        try:
-            md_text = pymupdf4llm.to_markdown(pdf_path)
-            return md_text
-        except Exception as e:
-            print(f"Error parsing with PyMuPDF: {e}")
-            return "Error parsing with PyMuPDF"
+        return pymupdf4llm.to_markdown(pdf_path)
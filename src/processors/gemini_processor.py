@@ -5,15 +5,33 @@ Gemini processor module for generating structured JSON from parsed document text
 import os
 import time
 import random
-from typing import Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 import google.generativeai as genai
 
-from ..utils.json_utils import clean_json_string
+from ..parsers.base import PARSER_LABELS
+from ..utils.circuit_breaker import CircuitOpenError, get_circuit_breaker, is_transient_error
+from ..utils.hedging import DEFAULT_HEDGE_BUDGET, Hedger
+from ..utils.json_utils import JSONExtractionStats, JSONRepairError
+from ..utils.usage import record_usage
 from ..config.prompts import (
     schema_generation_prompt, final_json_generation_prompt,
-    schema_generation_prompt_html, final_json_generation_prompt_html
+    schema_generation_prompt_html, final_json_generation_prompt_html,
+    structured_schema_output_instructions
 )
+from .response_formats import (
+    JSON_MIME_TYPE, SCHEMA_STEP_RESPONSE_SCHEMA,
+    parse_labeled_response, parse_structured_response, response_schema
+)
+
+# Seconds before a Gemini call is hedged, until its latency percentile is known
+GEMINI_INITIAL_HEDGE_DELAY = 120.0
+
+# Attempts per step, and the first backoff delay in seconds after an API error
+MAX_RETRIES = 5
+BASE_RETRY_DELAY = 2
+
+T = TypeVar("T")
 
 
 class GeminiProcessor:
@@ -21,99 +39,192 @@ class GeminiProcessor:
     Processor that uses Google's Gemini to generate structured JSON from parsed document text
     """
 
-    def __init__(self, api_key: str = None, model: str = "gemini-2.0-pro-exp-02-05"):
+    def __init__(self, api_key: str = None, model: str = "gemini-2.0-pro-exp-02-05",
+                 hedge_budget: float = DEFAULT_HEDGE_BUDGET, call_deadline: Optional[float] = None,
+                 structured_output: bool = False):
         """
         Initialize the Gemini processor
 
         Args:
             api_key: Gemini API key (defaults to GEMINI_API_KEY environment variable)
             model: Gemini model to use
+            hedge_budget: Fraction of calls that may be duplicated when they are slow (0 disables hedging)
+            call_deadline: Seconds after which a call is abandoned and retried (optional)
+            structured_output: Request JSON responses, with Step 2 constrained to the
+                structure of the Step 1 schema, instead of labeled free text
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("Gemini API key is required. Set GEMINI_API_KEY environment variable or pass it directly.")
 
         self.model_name = model
+        self.structured_output = structured_output
+        self.hedger = Hedger("Gemini", GEMINI_INITIAL_HEDGE_DELAY, budget=hedge_budget, deadline=call_deadline)
+        self.breaker = get_circuit_breaker("Gemini", model)
+        self.json_stats = JSONExtractionStats()
         genai.configure(api_key=self.api_key)
 
-    def generate_schema_and_confidence(self, parsed_outputs: Dict[str, str]) -> Tuple[str, str]:
+    def _generate_content(self, operation: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
         """
-        Generate JSON schema and confidence scores using Gemini for PDF documents
+        Send a prompt to Gemini, hedging the request if it is slow
+
+        Calls go through the model's circuit breaker, which raises CircuitOpenError
+        without calling Gemini while it is failing. The token counts of the answer are
+        recorded as the usage of the step; those of a discarded hedge are not known.
 
         Args:
-            parsed_outputs: Dictionary of parsed outputs from different parsers
+            operation: Name of the step ("schema" or "final"); latencies are tracked per step
+            prompt: Prompt to send
+            generation_config: Generation options, e.g. the response MIME type and schema
 
         Returns:
-            Tuple containing:
-                - JSON schema with extracted values
-                - Confidence scores JSON with identical structure
+            Response text
         """
-        print("Generating JSON schema and confidence scores...")
-
-        # Combine all parsed outputs into a single message
-        combined_text = f"""
-# Mistral OCR Output:
-{parsed_outputs.get('mistral_ocr', '')}
+        request_options = {"timeout": self.hedger.deadline} if self.hedger.deadline else None
+
+        def generate() -> Tuple[str, Any]:
+            model = genai.GenerativeModel(self.model_name, generation_config=generation_config)
+            response = model.generate_content(prompt, request_options=request_options)
+            return response.text, getattr(response, "usage_metadata", None)
+
+        text, metadata = self.breaker.call(lambda: self.hedger.call(operation, generate))
+        # Recorded here, in the caller's thread: hedged attempts run in threads of their own
+        record_usage(f"gemini_{operation}",
+                     prompt_tokens=getattr(metadata, "prompt_token_count", 0),
+                     output_tokens=getattr(metadata, "candidates_token_count", 0),
+                     cached_tokens=getattr(metadata, "cached_content_token_count", 0))
+        return text
+
+    def _generate_json(self, operation: str, prompt: str, parse: Callable[[str], T],
+                       generation_config: Optional[Dict[str, Any]] = None) -> Optional[T]:
+        """
+        Send a prompt to Gemini until a response parses
 
-# Docling Output:
-{parsed_outputs.get('docling', '')}
+        API errors are retried with exponential backoff and jitter. A response whose JSON
+        cannot be extracted even after local repair is retried immediately, since the
+        API itself is working.
 
-# PyMuPDF Output:
-{parsed_outputs.get('pymupdf', '')}
-"""
+        Args:
+            operation: Name of the step ("schema" or "final")
+            prompt: Prompt to send
+            parse: Function returning the JSON of a response, raising JSONRepairError if it has none
+            generation_config: Generation options passed to Gemini
 
-        prompt = schema_generation_prompt + "\n\nHere are the parsed outputs:\n" + combined_text
+        Returns:
+            The parsed response, or None if every attempt failed
 
-        # Implement retry logic with exponential backoff
-        max_retries = 5
-        base_delay = 2  # seconds
+        Raises:
+            CircuitOpenError: If the circuit is open, or opened because of the failed attempts
+        """
+        api_error = False
+        for attempt in range(1, MAX_RETRIES + 1):
+            attempt_start = time.perf_counter()
+            try:
+                response_text = self._generate_content(operation, prompt, generation_config)
+            except CircuitOpenError:
+                # Gemini is down: fail fast instead of spending the remaining attempts
+                raise
+            except Exception as e:
+                # Only outages count: a bad request is not parked even if other documents opened the circuit
+                api_error = is_transient_error(e)
+                record_usage(f"gemini_{operation}", api_calls=1, api_seconds=time.perf_counter() - attempt_start)
+                print(f"Gemini API error (attempt {attempt}/{MAX_RETRIES}): {str(e)}")
+                if attempt < MAX_RETRIES:
+                    # Calculate delay with exponential backoff and jitter
+                    delay = min(BASE_RETRY_DELAY * (2 ** (attempt - 1)), 60)  # Cap at 60 seconds
+                    adjusted_delay = delay * (1 + random.uniform(-0.2, 0.2))
+                    print(f"Retrying in {adjusted_delay:.2f} seconds...")
+                    time.sleep(adjusted_delay)
+                continue
+            api_error = False
+            record_usage(f"gemini_{operation}", api_calls=1, api_seconds=time.perf_counter() - attempt_start)
 
-        for attempt in range(1, max_retries + 1):
             try:
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(prompt)
-                response_text = response.text
+                return parse(response_text)
+            except JSONRepairError as e:
+                print(f"Response format incorrect (attempt {attempt}/{MAX_RETRIES}): {str(e)}")
+
+        # The last attempts failed on an outage that opened the circuit: report it, so the document is parked
+        if api_error and self.breaker.retry_in() > 0:
+            raise CircuitOpenError(self.breaker, self.breaker.retry_in())
+        return None
+
+    def _generate_schema(self, prompt: str) -> Tuple[str, str]:
+        """Run Step 1, raising RuntimeError if every attempt failed"""
+        if self.structured_output:
+            result = self._generate_json(
+                "schema", prompt + structured_schema_output_instructions,
+                lambda response_text: parse_structured_response(response_text, self.json_stats),
+                {"response_mime_type": JSON_MIME_TYPE, "response_schema": SCHEMA_STEP_RESPONSE_SCHEMA}
+            )
+        else:
+            result = self._generate_json("schema", prompt,
+                                         lambda response_text: parse_labeled_response(response_text, self.json_stats))
+        if result is None:
+            raise RuntimeError("Failed to generate schema and confidence scores after multiple attempts.")
+        return result
+
+    def _generate_final(self, prompt: str, schema_json: str, error: str) -> str:
+        """Run Step 2, returning an "Error: ..." message if every attempt failed"""
+        generation_config = None
+        if self.structured_output:
+            generation_config = {"response_mime_type": JSON_MIME_TYPE}
+            constraint = response_schema(schema_json)
+            if constraint is not None:
+                generation_config["response_schema"] = constraint
+            else:
+                print("Schema JSON cannot be used as a response schema; requesting unconstrained JSON")
+        # The final JSON is the document's output: a truncated answer is retried, not cut back
+        final_json = self._generate_json("final", prompt,
+                                         lambda response_text: self.json_stats.extract(response_text, expect=(dict,),
+                                                                                       allow_truncated=False),
+                                         generation_config)
+        if final_json is None:
+            print("Maximum retries reached. Failed to generate final JSON.")
+            return f"Error: {error}"
+        return final_json
+
+    @staticmethod
+    def _combine_outputs(parsed_outputs: Dict[str, str]) -> str:
+        """
+        Combine parser outputs into one prompt section, with a header per parser
 
-                # Extract schema and confidence JSONs from the response
-                schema_json = ""
-                confidence_json = ""
+        Only the parsers that produced output are included, so the prompt matches
+        whichever parser set the run used.
 
-                if "SCHEMA_JSON:" in response_text and "CONFIDENCE_JSON:" in response_text:
-                    parts = response_text.split("CONFIDENCE_JSON:")
-                    schema_part = parts[0].strip()
-                    confidence_part = parts[1].strip()
+        Args:
+            parsed_outputs: Dictionary of parsed outputs by parser name
 
-                    # Extract schema JSON
-                    if "SCHEMA_JSON:" in schema_part:
-                        schema_json = schema_part.split("SCHEMA_JSON:")[1].strip()
+        Returns:
+            The combined outputs, preceded by the list of parsing methods
+        """
+        labels = [PARSER_LABELS.get(name, name) for name in parsed_outputs]
+        sections = [f"# {label} Output:\n{output}" for label, output in zip(labels, parsed_outputs.values())]
+        return f"\nParsing methods used: {', '.join(labels)}\n\n" + "\n\n".join(sections) + "\n"
 
-                    # Extract confidence JSON
-                    confidence_json = confidence_part.strip()
+    def generate_schema_and_confidence(self, parsed_outputs: Dict[str, str]) -> Tuple[str, str]:
+        """
+        Generate JSON schema and confidence scores using Gemini for PDF documents
 
-                    # Clean the JSON strings
-                    schema_json = clean_json_string(schema_json)
-                    confidence_json = clean_json_string(confidence_json)
+        Args:
+            parsed_outputs: Dictionary of parsed outputs from different parsers
 
-                    return schema_json, confidence_json
-                else:
-                    print(f"Response format incorrect (attempt {attempt}/{max_retries})")
-                    if attempt == max_retries:
-                        return clean_json_string(response_text), "{}"
+        Returns:
+            Tuple containing:
+                - JSON schema with extracted values
+                - Confidence scores JSON with identical structure
 
-            except Exception as e:
-                print(f"Gemini API error (attempt {attempt}/{max_retries}): {str(e)}")
+        Raises:
+            RuntimeError: If no usable response was received
+            CircuitOpenError: If Gemini is unavailable
+        """
+        print("Generating JSON schema and confidence scores...")
 
-                if attempt < max_retries:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = min(base_delay * (2 ** (attempt - 1)), 60)  # Cap at 60 seconds
-                    jitter = random.uniform(-0.2, 0.2)
-                    adjusted_delay = delay * (1 + jitter)
+        # Combine the outputs of the parsers that ran into a single message
+        combined_text = self._combine_outputs(parsed_outputs)
 
-                    print(f"Retrying in {adjusted_delay:.2f} seconds...")
-                    time.sleep(adjusted_delay)
-                else:
-                    print("Maximum retries reached. Failed to generate schema and confidence scores.")
-                    return "{}", "{}"
+        prompt = schema_generation_prompt + "\n\nHere are the parsed outputs:\n" + combined_text
+        return self._generate_schema(prompt)
 
     def generate_schema_and_confidence_for_html(self, parsed_outputs: Dict[str, str]) -> Tuple[str, str]:
         """
@@ -126,70 +237,18 @@ class GeminiProcessor:
             Tuple containing:
                 - JSON schema with extracted values
                 - Confidence scores JSON with identical structure
+
+        Raises:
+            RuntimeError: If no usable response was received
+            CircuitOpenError: If Gemini is unavailable
         """
         print("Generating JSON schema and confidence scores for HTML content...")
 
         # Combine HTML and text outputs into a single message
-        combined_text = f"""
-# HTML Output:
-{parsed_outputs.get('html', '')}
-
-# Plain Text Output:
-{parsed_outputs.get('text', '')}
-"""
+        combined_text = self._combine_outputs(parsed_outputs)
 
         prompt = schema_generation_prompt_html + "\n\nHere are the parsed outputs:\n" + combined_text
-
-        # Implement retry logic with exponential backoff
-        max_retries = 5
-        base_delay = 2  # seconds
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(prompt)
-                response_text = response.text
-
-                # Extract schema and confidence JSONs from the response
-                schema_json = ""
-                confidence_json = ""
-
-                if "SCHEMA_JSON:" in response_text and "CONFIDENCE_JSON:" in response_text:
-                    parts = response_text.split("CONFIDENCE_JSON:")
-                    schema_part = parts[0].strip()
-                    confidence_part = parts[1].strip()
-
-                    # Extract schema JSON
-                    if "SCHEMA_JSON:" in schema_part:
-                        schema_json = schema_part.split("SCHEMA_JSON:")[1].strip()
-
-                    # Extract confidence JSON
-                    confidence_json = confidence_part.strip()
-
-                    # Clean the JSON strings
-                    schema_json = clean_json_string(schema_json)
-                    confidence_json = clean_json_string(confidence_json)
-
-                    return schema_json, confidence_json
-                else:
-                    print(f"Response format incorrect (attempt {attempt}/{max_retries})")
-                    if attempt == max_retries:
-                        return clean_json_string(response_text), "{}"
-
-            except Exception as e:
-                print(f"Gemini API error (attempt {attempt}/{max_retries}): {str(e)}")
-
-                if attempt < max_retries:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = min(base_delay * (2 ** (attempt - 1)), 60)  # Cap at 60 seconds
-                    jitter = random.uniform(-0.2, 0.2)
-                    adjusted_delay = delay * (1 + jitter)
-
-                    print(f"Retrying in {adjusted_delay:.2f} seconds...")
-                    time.sleep(adjusted_delay)
-                else:
-                    print("Maximum retries reached. Failed to generate schema and confidence scores.")
-                    return "{}", "{}"
+        return self._generate_schema(prompt)
 
     def generate_final_json(self, schema_json: str, parsed_outputs: Dict[str, str]) -> str:
         """
@@ -204,45 +263,11 @@ class GeminiProcessor:
         """
         print("Generating final structured JSON...")
 
-        # Combine all parsed outputs into a single message
-        combined_text = f"""
-# Mistral OCR Output:
-{parsed_outputs.get('mistral_ocr', '')}
-
-# Docling Output:
-{parsed_outputs.get('docling', '')}
-
-# PyMuPDF Output:
-{parsed_outputs.get('pymupdf', '')}
-"""
+        # Combine the outputs of the parsers that ran into a single message
+        combined_text = self._combine_outputs(parsed_outputs)
 
         prompt = final_json_generation_prompt + "\n\nHere is the schema JSON:\n" + schema_json + "\n\nHere are the parsed outputs:\n" + combined_text
-
-        # Implement retry logic with exponential backoff
-        max_retries = 5
-        base_delay = 2  # seconds
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(prompt)
-                final_json = clean_json_string(response.text)
-                return final_json
-
-            except Exception as e:
-                print(f"Gemini API error (attempt {attempt}/{max_retries}): {str(e)}")
-
-                if attempt < max_retries:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = min(base_delay * (2 ** (attempt - 1)), 60)  # Cap at 60 seconds
-                    jitter = random.uniform(-0.2, 0.2)
-                    adjusted_delay = delay * (1 + jitter)
-
-                    print(f"Retrying in {adjusted_delay:.2f} seconds...")
-                    time.sleep(adjusted_delay)
-                else:
-                    print("Maximum retries reached. Failed to generate final JSON.")
-                    return "Error: Failed to generate final JSON after multiple attempts."
+        return self._generate_final(prompt, schema_json, "Failed to generate final JSON after multiple attempts.")
 
     def generate_final_json_for_html(self, schema_json: str, parsed_outputs: Dict[str, str]) -> str:
         """
@@ -258,38 +283,7 @@ class GeminiProcessor:
         print("Generating final structured JSON for HTML content...")
 
         # Combine HTML and text outputs into a single message
-        combined_text = f"""
-# HTML Output:
-{parsed_outputs.get('html', '')}
-
-# Plain Text Output:
-{parsed_outputs.get('text', '')}
-"""
+        combined_text = self._combine_outputs(parsed_outputs)
 
         prompt = final_json_generation_prompt_html + "\n\nHere is the schema JSON:\n" + schema_json + "\n\nHere are the parsed outputs:\n" + combined_text
-
-        # Implement retry logic with exponential backoff
-        max_retries = 5
-        base_delay = 2  # seconds
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(prompt)
-                final_json = clean_json_string(response.text)
-                return final_json
-
-            except Exception as e:
-                print(f"Gemini API error (attempt {attempt}/{max_retries}): {str(e)}")
-
-                if attempt < max_retries:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = min(base_delay * (2 ** (attempt - 1)), 60)  # Cap at 60 seconds
-                    jitter = random.uniform(-0.2, 0.2)
-                    adjusted_delay = delay * (1 + jitter)
-
-                    print(f"Retrying in {adjusted_delay:.2f} seconds...")
-                    time.sleep(adjusted_delay)
-                else:
-                    print("Maximum retries reached. Failed to generate final JSON.")
-                    return "Error: Failed to generate final JSON for HTML content after multiple attempts."
+        return self._generate_final(prompt, schema_json, "Failed to generate final JSON for HTML content after multiple attempts.")
@@ -0,0 +1,176 @@
+"""
+Formats of Gemini responses: labeled text and schema-constrained structured output
+"""
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.json_utils import JSONExtractionStats, JSONRepairError
+
+# Labels the schema prompts ask the model to put before each of its two JSON objects
+SCHEMA_MARKER = "SCHEMA_JSON:"
+CONFIDENCE_MARKER = "CONFIDENCE_JSON:"
+
+# MIME type that makes Gemini return JSON only
+JSON_MIME_TYPE = "application/json"
+
+# Keys of the object returned by Step 1 in structured output mode
+SCHEMA_KEY = "schema"
+CONFIDENCE_KEY = "confidence"
+
+# Response schema of Step 1. The contents of the schema and confidence objects depend on
+# the document, and Gemini only accepts objects with declared properties, so only the
+# two keys are constrained
+SCHEMA_STEP_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {SCHEMA_KEY: {"type": "STRING"}, CONFIDENCE_KEY: {"type": "STRING"}},
+    "required": [SCHEMA_KEY, CONFIDENCE_KEY],
+}
+
+# Properties above which a Step 1 schema is not used as a response schema; Gemini rejects
+# schemas that are too large
+MAX_RESPONSE_SCHEMA_PROPERTIES = 500
+
+# Response schema type of each JSON scalar type; integers are examples of numbers, which
+# may have decimals in another document (bool is checked first, as it subclasses int)
+SCALAR_TYPES = {bool: "BOOLEAN", int: "NUMBER", float: "NUMBER", str: "STRING"}
+
+
+def parse_labeled_response(response_text: str, json_stats: JSONExtractionStats) -> Tuple[str, str]:
+    """
+    Extract the schema and confidence JSON objects from a labeled Step 1 response
+
+    Args:
+        response_text: Response with the objects after SCHEMA_JSON: and CONFIDENCE_JSON:
+        json_stats: Counters of the extracted JSON
+
+    Returns:
+        Tuple of the schema JSON and the confidence JSON
+
+    Raises:
+        JSONRepairError: If a label is missing or an object cannot be repaired
+    """
+    if SCHEMA_MARKER not in response_text or CONFIDENCE_MARKER not in response_text:
+        raise JSONRepairError(f"{SCHEMA_MARKER} or {CONFIDENCE_MARKER} label missing")
+    schema_part, confidence_part = response_text.split(CONFIDENCE_MARKER, 1)
+    schema_part = schema_part.split(SCHEMA_MARKER, 1)[-1]
+    return json_stats.extract(schema_part, expect=(dict,)), json_stats.extract(confidence_part, expect=(dict,))
+
+
+def parse_structured_response(response_text: str, json_stats: JSONExtractionStats) -> Tuple[str, str]:
+    """
+    Extract the schema and confidence JSON objects from a structured Step 1 response
+
+    Args:
+        response_text: JSON object with the schema and confidence keys, each holding a
+            JSON object or its serialization
+        json_stats: Counters of the extracted JSON
+
+    Returns:
+        Tuple of the schema JSON and the confidence JSON
+
+    Raises:
+        JSONRepairError: If the response cannot be repaired or a key is missing
+    """
+    value = json.loads(json_stats.extract(response_text, expect=(dict,)))
+    parts = []
+    for key in (SCHEMA_KEY, CONFIDENCE_KEY):
+        part = value.get(key)
+        if isinstance(part, str):
+            part = json.loads(json_stats.extract(part, expect=(dict,)))
+        if not isinstance(part, dict):
+            raise JSONRepairError(f'"{key}" object missing from the response')
+        parts.append(json.dumps(part, indent=2, ensure_ascii=False))
+    return parts[0], parts[1]
+
+
+def _merge(schemas: list) -> Optional[Dict[str, Any]]:
+    """Merge the schemas of the elements of an array into one, or return None if they conflict"""
+    types = {schema["type"] for schema in schemas if schema is not None}
+    nullable = any(schema is None or schema.get("nullable") for schema in schemas)
+    if not types:
+        return {"type": "STRING", "nullable": True}
+    if len(types) > 1:
+        return None
+    kind = types.pop()
+    present = [schema for schema in schemas if schema is not None]
+    if kind == "OBJECT":
+        properties: Dict[str, list] = {}
+        for schema in present:
+            for key, child in schema["properties"].items():
+                properties.setdefault(key, []).append(child)
+        merged = {}
+        for key, children in properties.items():
+            child = _merge(children)
+            if child is None:
+                return None
+            merged[key] = child
+        required = [key for key in merged if all(key in schema["properties"] for schema in present)]
+        result = {"type": "OBJECT", "properties": merged, "required": required}
+    elif kind == "ARRAY":
+        items = _merge([schema["items"] for schema in present])
+        if items is None:
+            return None
+        result = {"type": "ARRAY", "items": items}
+    else:
+        result = {"type": kind}
+    if nullable:
+        result["nullable"] = True
+    return result
+
+
+def _schema_of(value: Any) -> Optional[Dict[str, Any]]:
+    """Return the response schema of an example value, None for null"""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        if not value:
+            raise ValueError("empty object")
+        properties = {}
+        for key, child in value.items():
+            properties[str(key)] = _schema_of(child) or {"type": "STRING", "nullable": True}
+        return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+    if isinstance(value, list):
+        if not value:
+            raise ValueError("empty array")
+        items = _merge([_schema_of(item) for item in value])
+        if items is None:
+            raise ValueError("array with elements of different types")
+        return {"type": "ARRAY", "items": items}
+    for scalar_type, name in SCALAR_TYPES.items():
+        if isinstance(value, scalar_type):
+            # Values are examples: let the model answer null for fields it cannot find
+            return {"type": name, "nullable": True}
+    raise ValueError(f"unsupported value {value!r}")
+
+
+def _count_properties(schema: Dict[str, Any]) -> int:
+    if schema["type"] == "OBJECT":
+        return sum(1 + _count_properties(child) for child in schema["properties"].values())
+    if schema["type"] == "ARRAY":
+        return _count_properties(schema["items"])
+    return 0
+
+
+def response_schema(schema_json: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the Gemini response schema of Step 2 from the schema JSON of Step 1
+
+    The Step 1 schema holds example values; the response schema keeps its structure
+    (every key, array item shapes) and the type of each value, so Step 2 cannot rename,
+    drop or retype fields.
+
+    Args:
+        schema_json: Schema JSON with extracted values
+
+    Returns:
+        Response schema in Gemini's OpenAPI subset, or None if the structure cannot be
+        expressed (empty objects or arrays, arrays mixing types) or is too large
+    """
+    try:
+        schema = _schema_of(json.loads(schema_json))
+    except ValueError:
+        return None
+    if schema is None or schema["type"] != "OBJECT" or _count_properties(schema) > MAX_RESPONSE_SCHEMA_PROPERTIES:
+        return None
+    return schema
@@ -0,0 +1,77 @@
+"""
+Registry of the parser and processor backends, imported and constructed on first use
+"""
+
+import importlib
+import threading
+from typing import Any, Dict, Tuple
+
+# Backend name -> (module relative to this package, class name)
+BACKENDS: Dict[str, Tuple[str, str]] = {
+    "mistral": (".parsers.mistral_parser", "MistralParser"),
+    "docling": (".parsers.docling_parser", "DoclingParser"),
+    "pymupdf": (".parsers.pymupdf_parser", "PyMuPDFParser"),
+    "docx": (".parsers.docx_parser", "DocxParser"),
+    "gemini": (".processors.gemini_processor", "GeminiProcessor"),
+}
+
+
+def load_backend(name: str) -> type:
+    """
+    Import the module of a backend and return its class
+
+    Args:
+        name: Backend name (a key of BACKENDS)
+
+    Returns:
+        The backend class
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}. Choose one of: {', '.join(BACKENDS)}")
+    module_name, class_name = BACKENDS[name]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
+
+
+def create_backend(name: str, **options) -> Any:
+    """
+    Import and construct a backend
+
+    Args:
+        name: Backend name (a key of BACKENDS)
+        **options: Keyword arguments of the backend's constructor
+
+    Returns:
+        The backend instance
+    """
+    return load_backend(name)(**options)
+
+
+class LazyBackend:
+    """
+    Attribute that creates a backend the first time it is read
+
+    The owner keeps the constructor options of each backend in a `backend_options`
+    dictionary keyed by backend name. Assigning the attribute, e.g. to a stand-in,
+    replaces the backend without importing it.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type = None) -> Any:
+        if instance is None:
+            return self
+        with self._lock:
+            # Another thread may have created it while this one waited
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = create_backend(self.backend, **instance.backend_options.get(self.backend, {}))
+        return instance.__dict__[self.name]
+
+
+def is_loaded(instance: Any, attribute: str) -> bool:
+    """Return whether the lazy backend stored in an attribute has been created or assigned"""
+    return attribute in vars(instance)
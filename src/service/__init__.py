@@ -0,0 +1,3 @@
+"""
+Long-running HTTP service that processes documents submitted over a job API
+"""
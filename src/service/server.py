@@ -0,0 +1,572 @@
+"""
+HTTP job API for processing documents in a long-running process
+
+Endpoints:
+    POST /jobs?name=<file name>   Submit a PDF or DOCX (raw request body); returns the job.
+                                  Add &priority=interactive to use the interactive lane,
+                                  &parsers=fast|local|full or parser names to choose the PDF parsers
+    GET  /jobs                    List known jobs
+    GET  /jobs/<id>               Job status and progress
+    GET  /jobs/<id>/result        Final structured JSON of a finished job
+    GET  /jobs/<id>/stream        Server-sent events with the job's progress until it finishes
+    GET  /healthz                 Liveness and queue state
+    GET  /metrics                 Prometheus text format metrics
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+
+from ..document_processor import DocumentProcessor
+from ..parsers.base import DEFAULT_PARSER_PROFILE, resolve_parsers, use_offline_models
+from ..parsers.docx_parser import DOCX_ENGINES
+from ..storage.base import FINAL
+from ..storage.blob_store import BlobStore
+from ..storage.factory import OUTPUT_BACKENDS
+from ..utils.circuit_breaker import CLOSED, circuit_states
+from ..utils.hedging import DEFAULT_HEDGE_BUDGET
+from ..utils.job_queue import BATCH, FAILED, LANE_NAMES, QUEUED, RUNNING, SUCCEEDED, Job, JobQueue, QueueFullError
+from ..utils.profiling import DEFAULT_PROFILE_MODES, DEFAULT_SAMPLE_INTERVAL, DEFAULT_TOP, parse_profile_modes
+
+# File types the service accepts
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+# Seconds between progress checks of a streamed job
+STREAM_POLL_INTERVAL = 0.5
+
+# Seconds clients are asked to wait before resubmitting when the queue is full
+RETRY_AFTER_SECONDS = 5
+
+
+class ServiceMetrics:
+    """
+    Counters exported by the /metrics endpoint
+    """
+
+    def __init__(self):
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.duration_sum = 0.0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record_submitted(self) -> None:
+        with self._lock:
+            self.submitted += 1
+
+    def record_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_finished(self, succeeded: bool, seconds: float) -> None:
+        with self._lock:
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.duration_sum += seconds
+
+    def render(self, queue: JobQueue, hedging: Optional[Dict[str, Dict[str, float]]] = None,
+               json_repair: Optional[Dict[str, int]] = None,
+               usage: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Args:
+            queue: Job queue whose current state is included
+            hedging: Hedging counters per remote service, from DocumentProcessor.hedging_stats()
+            json_repair: JSON extraction counters, from DocumentProcessor.json_repair_stats()
+            usage: API usage by step, from DocumentProcessor.usage_report.steps()
+
+        Returns:
+            Metrics text
+        """
+        states = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        for job in queue.jobs():
+            states[job.status] += 1
+
+        with self._lock:
+            lines = [
+                "# HELP document_parser_jobs_submitted_total Jobs accepted by the service",
+                "# TYPE document_parser_jobs_submitted_total counter",
+                f"document_parser_jobs_submitted_total {self.submitted}",
+                "# HELP document_parser_jobs_rejected_total Jobs rejected because the queue was full",
+                "# TYPE document_parser_jobs_rejected_total counter",
+                f"document_parser_jobs_rejected_total {self.rejected}",
+                "# HELP document_parser_jobs_finished_total Jobs that finished, by outcome",
+                "# TYPE document_parser_jobs_finished_total counter",
+                f'document_parser_jobs_finished_total{{outcome="succeeded"}} {self.succeeded}',
+                f'document_parser_jobs_finished_total{{outcome="failed"}} {self.failed}',
+                "# HELP document_parser_job_duration_seconds Processing time of finished jobs",
+                "# TYPE document_parser_job_duration_seconds summary",
+                f"document_parser_job_duration_seconds_sum {self.duration_sum:.3f}",
+                f"document_parser_job_duration_seconds_count {self.succeeded + self.failed}",
+            ]
+        lines += [
+            "# HELP document_parser_jobs Jobs currently known to the queue, by status",
+            "# TYPE document_parser_jobs gauge",
+        ] + [f'document_parser_jobs{{status="{status}"}} {count}' for status, count in states.items()] + [
+            "# HELP document_parser_queue_capacity Maximum number of unfinished jobs",
+            "# TYPE document_parser_queue_capacity gauge",
+            f"document_parser_queue_capacity {queue.max_pending}",
+            "# HELP document_parser_workers Number of worker threads",
+            "# TYPE document_parser_workers gauge",
+            f"document_parser_workers {queue.max_workers}",
+            "# HELP document_parser_uptime_seconds Seconds since the service started",
+            "# TYPE document_parser_uptime_seconds gauge",
+            f"document_parser_uptime_seconds {time.time() - self.started_at:.0f}",
+        ]
+        circuits = circuit_states()
+        if circuits:
+            lines += [
+                "# HELP document_parser_circuit_open Whether calls to a remote service endpoint are stopped (1) or not (0)",
+                "# TYPE document_parser_circuit_open gauge",
+            ] + [f'document_parser_circuit_open{{circuit="{name}"}} {int(state != CLOSED)}' for name, state in circuits.items()]
+        if hedging:
+            for metric, key, description in (
+                ("remote_calls_total", "calls", "Calls to remote services"),
+                ("hedged_calls_total", "hedged", "Calls duplicated because they were slow"),
+                ("hedge_wins_total", "hedge_wins", "Hedged calls answered first by the duplicate"),
+                ("remote_call_deadlines_exceeded_total", "deadlines_exceeded", "Calls abandoned at their deadline"),
+            ):
+                lines += [f"# HELP document_parser_{metric} {description}", f"# TYPE document_parser_{metric} counter"]
+                lines += [f'document_parser_{metric}{{service="{name}"}} {stats[key]}' for name, stats in hedging.items()]
+        if json_repair:
+            lines += [
+                "# HELP document_parser_model_responses_total Model responses, by how their JSON was extracted",
+                "# TYPE document_parser_model_responses_total counter",
+            ] + [f'document_parser_model_responses_total{{json="{outcome}"}} {json_repair[outcome]}'
+                 for outcome in ("valid", "repaired", "invalid")]
+        if usage:
+            for metric, key, description in (
+                ("prompt_tokens_total", "prompt_tokens", "Prompt tokens sent to Gemini"),
+                ("cached_tokens_total", "cached_tokens", "Prompt tokens served from Gemini's context cache"),
+                ("output_tokens_total", "output_tokens", "Tokens generated by Gemini"),
+                ("ocr_pages_total", "ocr_pages", "Pages billed by Mistral OCR"),
+                ("api_attempts_total", "api_calls", "Attempted remote API calls, including retries"),
+                ("api_seconds_total", "api_seconds", "Seconds spent in remote API calls"),
+            ):
+                lines += [f"# HELP document_parser_{metric} {description}", f"# TYPE document_parser_{metric} counter"]
+                lines += [f'document_parser_{metric}{{step="{step}"}} {round(counters[key], 3)}'
+                          for step, counters in sorted(usage.items())]
+        return "\n".join(lines) + "\n"
+
+
+class _BodyReader:
+    """
+    Binary stream over a request body that stops after Content-Length bytes
+    """
+
+    def __init__(self, rfile: BinaryIO, length: int):
+        self._rfile = rfile
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._rfile.read(size)
+        if not data:
+            raise ConnectionError("Client closed the connection before sending the whole body")
+        self._remaining -= len(data)
+        return data
+
+
+class DocumentService:
+    """
+    Document processing shared by all requests: one processor, one job queue
+
+    Parsers and API clients are created once with the processor, so every job after the
+    first only pays for the processing itself.
+    """
+
+    def __init__(self, processor: DocumentProcessor, max_workers: int = 2, max_pending: int = 50,
+                 max_upload_bytes: int = 200 * 1024 * 1024, interactive_workers: int = 0):
+        """
+        Initialize the service
+
+        Args:
+            processor: Document processor used by every job
+            max_workers: Number of documents processed concurrently
+            max_pending: Maximum number of unfinished jobs; further submissions are rejected
+            max_upload_bytes: Maximum size of a submitted file
+            interactive_workers: Number of workers reserved for interactive jobs
+        """
+        self.processor = processor
+        self.queue = JobQueue(max_workers=max_workers, max_pending=max_pending, interactive_workers=interactive_workers)
+        self.blobs = BlobStore(os.path.join(processor.output_dir, "blobs"))
+        self.max_upload_bytes = max_upload_bytes
+        self.metrics = ServiceMetrics()
+
+    def accepting(self) -> bool:
+        """Whether the queue has room for another job"""
+        return self.queue.pending_count() < self.queue.max_pending
+
+    def submit(self, file_name: str, body: BinaryIO, lane: int = BATCH,
+               parsers: Optional[Sequence[str]] = None) -> Job:
+        """
+        Store a submitted file and enqueue it for processing
+
+        Batch jobs are ordered longest-first by the processor's cost model.
+
+        Args:
+            file_name: Original name of the file, used to determine its type
+            body: Stream of the file contents
+            lane: INTERACTIVE or BATCH
+            parsers: PDF parsers or profile for this job (defaults to the processor's)
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue already holds its maximum number of unfinished jobs
+        """
+        _, file_path = self.blobs.put_stream(body, suffix=os.path.splitext(file_name)[1])
+        cost = self.processor.cost_model.predict(self.processor.features.get(file_path))
+        try:
+            job = self.queue.submit(file_name, self._process, file_name, file_path, parsers, lane=lane, cost=cost)
+        except QueueFullError:
+            self.metrics.record_rejected()
+            raise
+        self.metrics.record_submitted()
+        return job
+
+    def result(self, job: Job) -> Optional[bytes]:
+        """
+        Return the final JSON of a succeeded job
+
+        Args:
+            job: A succeeded job
+
+        Returns:
+            Final JSON as UTF-8 bytes, or None if the output no longer exists
+        """
+        return self.processor.store.get(job.result["doc_id"], FINAL, "json")
+
+    def _process(self, progress_callback, file_name: str, file_path: str,
+                 parsers: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """
+        Job function that processes one stored file
+
+        Raises:
+            RuntimeError: If processing fails
+        """
+        start_time = time.perf_counter()
+        result = self.processor.process(file_path, name=file_name, progress_callback=progress_callback,
+                                        parsers=parsers)
+        self.metrics.record_finished(result.success, time.perf_counter() - start_time)
+
+        if not result.success:
+            raise RuntimeError(f"Failed to process {file_name}: {result.error}")
+        return {"doc_id": result.doc_id}
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the job API; the service is taken from the server
+    """
+
+    server_version = "document-parser"
+
+    @property
+    def service(self) -> DocumentService:
+        return self.server.service
+
+    def do_GET(self):
+        parts = self._path_parts()
+
+        if parts == ["healthz"]:
+            self._send_json(HTTPStatus.OK, {
+                "status": "ok",
+                "accepting": self.service.accepting(),
+                "pending": self.service.queue.pending_count(),
+                "capacity": self.service.queue.max_pending,
+                "workers": self.service.queue.max_workers,
+                "circuits": circuit_states(),
+            })
+        elif parts == ["metrics"]:
+            processor = self.service.processor
+            metrics = self.service.metrics.render(self.service.queue, processor.hedging_stats(),
+                                                  processor.json_repair_stats(), processor.usage_report.steps())
+            self._send(HTTPStatus.OK, metrics.encode("utf-8"),
+                       "text/plain; version=0.0.4; charset=utf-8")
+        elif parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, {"jobs": [job.to_dict() for job in self.service.queue.jobs()]})
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.service.queue.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job: {parts[1]}")
+            elif len(parts) == 2:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+            elif parts[2] == "result":
+                self._send_result(job)
+            elif parts[2] == "stream":
+                self._stream_job(job)
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+
+    def do_POST(self):
+        if self._path_parts() != ["jobs"]:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        file_name = os.path.basename(query.get("name", [self.headers.get("X-Filename", "")])[0])
+        if os.path.splitext(file_name)[1].lower() not in SUPPORTED_EXTENSIONS:
+            self._send_error(HTTPStatus.BAD_REQUEST,
+                             f"Pass the file name with ?name=; supported types: {', '.join(SUPPORTED_EXTENSIONS)}")
+            return
+
+        lanes = {name: lane for lane, name in LANE_NAMES.items()}
+        priority = query.get("priority", [LANE_NAMES[BATCH]])[0]
+        if priority not in lanes:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Unknown priority: {priority}. Choose one of: {', '.join(lanes)}")
+            return
+
+        parsers = query.get("parsers", [None])[0]
+        if parsers is not None:
+            try:
+                parsers = resolve_parsers(parsers)
+            except ValueError as e:
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+            return
+        if int(length) > self.service.max_upload_bytes:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             f"File is larger than {self.service.max_upload_bytes} bytes")
+            return
+
+        # Reject before reading the body when the queue is already full
+        if not self.service.accepting():
+            self.service.metrics.record_rejected()
+            self._send_queue_full()
+            return
+
+        try:
+            job = self.service.submit(file_name, _BodyReader(self.rfile, int(length)), lane=lanes[priority],
+                                      parsers=parsers)
+        except QueueFullError:
+            self._send_queue_full()
+            return
+
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+
+    def _path_parts(self) -> List[str]:
+        return [part for part in urlsplit(self.path).path.split("/") if part]
+
+    def _send_result(self, job: Job):
+        if job.status == FAILED:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, job.to_dict())
+        elif job.status != SUCCEEDED:
+            self._send_json(HTTPStatus.CONFLICT, job.to_dict())
+        else:
+            result = self.service.result(job)
+            if result is None:
+                self._send_error(HTTPStatus.GONE, "The job's output no longer exists")
+            else:
+                self._send(HTTPStatus.OK, result, "application/json")
+
+    def _stream_job(self, job: Job):
+        """Send the job's state as server-sent events whenever it changes, until it finishes"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        last_state = None
+        try:
+            while True:
+                state = job.to_dict()
+                if (state["status"], state["stage"], state["progress"]) != last_state:
+                    last_state = (state["status"], state["stage"], state["progress"])
+                    self.wfile.write(f"event: {state['status']}\ndata: {json.dumps(state)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                if job.done:
+                    break
+                time.sleep(STREAM_POLL_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _send_queue_full(self):
+        self._send_error(HTTPStatus.TOO_MANY_REQUESTS,
+                         f"Job queue is full ({self.service.queue.max_pending} jobs pending)",
+                         {"Retry-After": str(RETRY_AFTER_SECONDS)})
+        # The unread request body cannot be reused on this connection
+        self.close_connection = True
+
+    def _send_error(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None):
+        self._send_json(status, {"error": message}, headers)
+
+    def _send_json(self, status: HTTPStatus, payload: Any, headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class DocumentServiceServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server that hands every request the shared DocumentService
+    """
+
+    daemon_threads = True
+
+    # Connections waiting to be accepted; further connection attempts are refused by the OS
+    request_queue_size = 128
+
+    def __init__(self, address, service: DocumentService):
+        self.service = service
+        super().__init__(address, ServiceRequestHandler)
+
+
+def create_processor(args: argparse.Namespace) -> DocumentProcessor:
+    """
+    Create the processor shared by all jobs, with stand-in backends if requested
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Document processor
+    """
+    stand_ins = {}
+    if args.stand_in:
+        from .stand_ins import stand_in_backends
+
+        stand_ins = stand_in_backends(args.stand_in_delay)
+
+    use_offline_models(args.docling_artifacts)
+    return DocumentProcessor(
+        mistral_api_key=args.mistral_api_key,
+        gemini_api_key=args.gemini_api_key,
+        output_dir=args.output_dir,
+        docx_engine=args.docx_engine,
+        output_backend=args.output_backend,
+        hedge_budget=args.hedge_budget,
+        call_deadline=args.call_deadline,
+        structured_output=args.structured_output,
+        parsers=args.parsers,
+        docling_artifacts=args.docling_artifacts,
+        **stand_ins
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the document processing service until interrupted
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Exit code
+    """
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        prog='document-parser serve',
+        description='Serve an HTTP job API that processes PDF and DOCX documents',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--output-dir', '-o', default="parsed_outputs", help='Directory to save output files')
+    parser.add_argument('--output-backend', choices=OUTPUT_BACKENDS, default='files', help='Where to store outputs')
+    parser.add_argument('--docx-engine', choices=DOCX_ENGINES, default='mammoth', help='DOCX extraction engine')
+    parser.add_argument('--workers', type=int, default=2, help='Number of documents processed concurrently')
+    parser.add_argument('--interactive-workers', type=int, default=0,
+                        help='Workers reserved for jobs submitted with priority=interactive')
+    parser.add_argument('--max-pending', type=int, default=50,
+                        help='Maximum number of unfinished jobs before submissions are rejected with 429')
+    parser.add_argument('--max-upload-mb', type=int, default=200, help='Maximum size of a submitted file in MB')
+    parser.add_argument('--stand-in', action='store_true',
+                        help='Use stand-in parsers and model instead of Mistral, Docling, PyMuPDF and Gemini (for testing)')
+    parser.add_argument('--stand-in-delay', type=float, default=0.0,
+                        help='Seconds each stand-in call sleeps, to simulate latency')
+    parser.add_argument('--parsers', default=DEFAULT_PARSER_PROFILE,
+                        help='PDF parsers of jobs submitted without ?parsers=: a profile (fast: PyMuPDF only, '
+                             'local: Docling and PyMuPDF, full: all three) or comma-separated parser names')
+    parser.add_argument('--docling-artifacts',
+                        help='Directory of Docling models prepared by "document-parser warmup" '
+                             '(defaults to DOCLING_ARTIFACTS_PATH)')
+    parser.add_argument('--hedge-budget', type=float, default=DEFAULT_HEDGE_BUDGET,
+                        help='Fraction of Mistral and Gemini calls that may be duplicated when slower than their usual latency (0 disables hedging)')
+    parser.add_argument('--call-deadline', type=float, help='Seconds after which a Mistral or Gemini call is abandoned and retried')
+    parser.add_argument('--structured-output', action='store_true',
+                        help='Request JSON responses from Gemini, with the final JSON constrained to the generated schema')
+    parser.add_argument('--profile', nargs='?', const=list(DEFAULT_PROFILE_MODES), type=parse_profile_modes, metavar='MODES',
+                        help='Profile jobs into OUTPUT_DIR/profiles: comma-separated modes among sample, cprofile and memory; '
+                             'without MODES, sample')
+    parser.add_argument('--profile-rate', type=float, default=1.0,
+                        help='Fraction of jobs profiled (with --profile); keep it low to leave profiling on')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_SAMPLE_INTERVAL,
+                        help='Seconds between stack samples (with --profile)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                        help='Functions and allocation sites listed per stage in the reports (with --profile)')
+    parser.add_argument('--mistral-api-key', help='Mistral API key (defaults to MISTRAL_API_KEY environment variable)')
+    parser.add_argument('--gemini-api-key', help='Gemini API key (defaults to GEMINI_API_KEY environment variable)')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if not 0 < args.profile_rate <= 1:
+        parser.error("--profile-rate must be greater than 0 and at most 1")
+    if args.profile_interval <= 0:
+        parser.error("--profile-interval must be positive")
+
+    processor = create_processor(args)
+
+    # Load models before accepting jobs, so the first job does not pay for the cold start
+    for name, seconds in processor.warmup().items():
+        print(f"Warmup: {name} {seconds:.1f}s")
+
+    service = DocumentService(
+        processor,
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        max_upload_bytes=args.max_upload_mb * 1024 * 1024,
+        interactive_workers=args.interactive_workers
+    )
+    server = DocumentServiceServer((args.host, args.port), service)
+    print(f"Serving on http://{args.host}:{server.server_port} ({args.workers} workers"
+          f"{', stand-in backends' if args.stand_in else ''})")
+
+    profiling = contextlib.nullcontext()
+    if args.profile:
+        profiling = processor.profiling(args.profile, args.profile_rate, args.profile_interval, args.profile_top)
+    with profiling:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nShutting down, waiting for running jobs to finish...")
+        finally:
+            server.server_close()
+            service.queue.shutdown(wait=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Stand-in parsers and processor for running the service without API keys or models
+"""
+
+import os
+import json
+import time
+from typing import Any, Dict, Tuple
+
+from ..parsers.base import BaseParser
+
+
+class StandInParser(BaseParser):
+    """
+    Parser that returns a short deterministic description of the file instead of its text
+    """
+
+    def __init__(self, name: str, delay: float = 0.0):
+        """
+        Initialize the stand-in parser
+
+        Args:
+            name: Name of the parser it stands in for
+            delay: Seconds to sleep per call, to simulate the real parser's latency
+        """
+        self.name = name
+        self.delay = delay
+
+    def parse(self, pdf_path: str) -> str:
+        """
+        Describe a document the way a parser would return its markdown
+
+        Args:
+            pdf_path: Path to the document
+
+        Returns:
+            Markdown text naming the parser, file and size
+        """
+        time.sleep(self.delay)
+        return f"# {os.path.basename(pdf_path)}\n\nStand-in {self.name} output for a {os.path.getsize(pdf_path)} byte file.\n"
+
+
+class StandInMistralParser(StandInParser):
+    """
+    Stand-in for MistralParser, which also returns a document URL
+    """
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__("mistral_ocr", delay)
+
+    def parse(self, pdf_path: str) -> Tuple[str, str]:
+        return super().parse(pdf_path), f"file://{os.path.abspath(pdf_path)}"
+
+    def extract(self, pdf_path: str) -> str:
+        return self.parse(pdf_path)[0]
+
+
+class StandInGeminiProcessor:
+    """
+    Stand-in for GeminiProcessor that builds the schema and final JSON from the parser outputs
+    """
+
+    def __init__(self, delay: float = 0.0):
+        """
+        Initialize the stand-in processor
+
+        Args:
+            delay: Seconds to sleep per call, to simulate model latency
+        """
+        self.delay = delay
+
+    def generate_schema_and_confidence(self, parsed_outputs: Dict[str, str]) -> Tuple[str, str]:
+        time.sleep(self.delay)
+        schema = {"parsers": {name: "string" for name in parsed_outputs}}
+        confidence = {"parsers": {name: 1.0 for name in parsed_outputs}}
+        return json.dumps(schema, indent=2), json.dumps(confidence, indent=2)
+
+    def generate_schema_and_confidence_for_html(self, parsed_outputs: Dict[str, str]) -> Tuple[str, str]:
+        return self.generate_schema_and_confidence(parsed_outputs)
+
+    def generate_final_json(self, schema_json: str, parsed_outputs: Dict[str, str]) -> str:
+        time.sleep(self.delay)
+        final = {"parsers": {name: output[:200] for name, output in parsed_outputs.items()}}
+        return json.dumps(final, indent=2)
+
+    def generate_final_json_for_html(self, schema_json: str, parsed_outputs: Dict[str, str]) -> str:
+        return self.generate_final_json(schema_json, parsed_outputs)
+
+
+def stand_in_backends(delay: float = 0.0) -> Dict[str, Any]:
+    """
+    Return stand-ins for every remote or model-backed component of DocumentProcessor
+
+    Args:
+        delay: Seconds each stand-in call sleeps, to simulate latency
+
+    Returns:
+        Keyword arguments for DocumentProcessor
+    """
+    return {
+        "mistral_parser": StandInMistralParser(delay=delay),
+        "docling_parser": StandInParser("docling", delay=delay),
+        "pymupdf_parser": StandInParser("pymupdf", delay=delay),
+        "gemini_processor": StandInGeminiProcessor(delay=delay),
+    }
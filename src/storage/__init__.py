@@ -0,0 +1,3 @@
+"""
+Output storage backends
+"""
@@ -0,0 +1,115 @@
+"""
+Base class for output storage backends
+"""
+
+from typing import Iterator, Optional, Tuple, Union
+
+# Kinds of outputs stored per document
+RAW = "raw"                # Raw parser output, named after the parser (e.g. "docling")
+CONFIDENCE = "confidence"  # Confidence scores JSON
+FINAL = "final"            # Final structured JSON
+COPY = "copy"              # Copy of the input document, named after its file type ("pdf" or "docx")
+CHECKPOINT = "checkpoint"  # Processing checkpoint of the document, named "state"
+
+OUTPUT_KINDS = (RAW, CONFIDENCE, FINAL, COPY, CHECKPOINT)
+
+
+class OutputStore:
+    """
+    Interface of the storage backends used by DocumentProcessor to persist outputs
+
+    Every output is addressed by (document ID, kind, name). Writes to a store become
+    visible to readers of other processes once the document is committed.
+    """
+
+    def put(self, doc_id: str, kind: str, name: str, data: Union[str, bytes]) -> str:
+        """
+        Store an output
+
+        Args:
+            doc_id: Document ID (the base filename of the input)
+            kind: Kind of output (one of OUTPUT_KINDS)
+            name: Name of the output within its kind
+            data: Output content; text is stored as UTF-8
+
+        Returns:
+            Location of the stored output, for display and for the catalog
+        """
+        raise NotImplementedError
+
+    def put_file(self, doc_id: str, kind: str, name: str, source_path: str, digest: Optional[str] = None) -> str:
+        """
+        Store the contents of a file as an output
+
+        Args:
+            doc_id: Document ID
+            kind: Kind of output (one of OUTPUT_KINDS)
+            name: Name of the output within its kind
+            source_path: Path of the file to store
+            digest: SHA-256 hex digest of the file, if already known
+
+        Returns:
+            Location of the stored output
+        """
+        with open(source_path, "rb") as f:
+            return self.put(doc_id, kind, name, f.read())
+
+    def location(self, doc_id: str, kind: str, name: str) -> str:
+        """
+        Return the location of an output, as returned by put()
+
+        Args:
+            doc_id: Document ID
+            kind: Kind of output
+            name: Name of the output within its kind
+
+        Returns:
+            Location of the output
+        """
+        raise NotImplementedError
+
+    def get(self, doc_id: str, kind: str, name: str) -> Optional[bytes]:
+        """
+        Read an output
+
+        Args:
+            doc_id: Document ID
+            kind: Kind of output
+            name: Name of the output within its kind
+
+        Returns:
+            Output content, or None if it does not exist
+        """
+        raise NotImplementedError
+
+    def commit(self, doc_id: str) -> None:
+        """
+        Make all outputs written for a document since its last commit visible atomically
+
+        Args:
+            doc_id: Document ID
+        """
+
+    def discard(self, doc_id: str) -> None:
+        """
+        Drop any outputs written for a document since its last commit
+
+        Args:
+            doc_id: Document ID
+        """
+
+    def iter_outputs(self) -> Iterator[Tuple[str, str, str, bytes]]:
+        """
+        Iterate over all committed outputs
+
+        Yields:
+            Tuples of (document ID, kind, name, content)
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support iterating over outputs")
+
+    def describe(self) -> str:
+        """Return a short description of where outputs are stored"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
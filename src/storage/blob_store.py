@@ -0,0 +1,200 @@
+"""
+Content-addressed store for input files
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+from ..utils.file_utils import ensure_directory, file_sha256, temporary_path
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# ioctl request that clones a file's extents on Linux (btrfs, XFS and other CoW filesystems)
+FICLONE = 0x40049409
+
+# Number of bytes copied or hashed at a time
+CHUNK_SIZE = 1024 * 1024
+
+
+def _reflink(source_fd: int, target_fd: int) -> bool:
+    """Clone the source file into the target, sharing its blocks; return False if unsupported"""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(target_fd, FICLONE, source_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_in_kernel(source_fd: int, target_fd: int, size: int) -> bool:
+    """Copy a file with copy_file_range or sendfile so the data never enters user space"""
+    for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if copy is None:
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if copy is os.sendfile:
+                    sent = copy(target_fd, source_fd, copied, min(size - copied, 1 << 30))
+                else:
+                    sent = copy(source_fd, target_fd, min(size - copied, 1 << 30), copied, copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            # Not supported for this pair of files; start over with the next method
+            os.ftruncate(target_fd, 0)
+            continue
+        if copied == size:
+            return True
+        os.ftruncate(target_fd, 0)
+    return False
+
+
+def copy_file(source_path: str, target_path: str) -> str:
+    """
+    Copy a file using the cheapest method the platform and filesystem support
+
+    The methods tried are a reflink, copy_file_range, sendfile and finally a chunked
+    copy in user space.
+
+    Args:
+        source_path: Path of the file to copy
+        target_path: Path of the copy; an existing file is overwritten
+
+    Returns:
+        Name of the method used ("reflink", "kernel" or "chunked")
+    """
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        if _reflink(source.fileno(), target.fileno()):
+            return "reflink"
+        if _copy_in_kernel(source.fileno(), target.fileno(), os.fstat(source.fileno()).st_size):
+            return "kernel"
+        source.seek(0)
+        target.seek(0)
+        shutil.copyfileobj(source, target, CHUNK_SIZE)
+        return "chunked"
+
+
+def link_or_copy(source_path: str, target_path: str) -> str:
+    """
+    Make target_path refer to the contents of source_path without copying when possible
+
+    A hard link is used when both paths are on the same filesystem; otherwise the file
+    is copied with copy_file(). The target is replaced atomically.
+
+    Args:
+        source_path: Path of an immutable file, such as a blob
+        target_path: Path to create
+
+    Returns:
+        Name of the method used ("hardlink" or one of the copy_file() methods)
+    """
+    tmp_path = temporary_path(target_path)
+    try:
+        os.link(source_path, tmp_path)
+        method = "hardlink"
+    except OSError:
+        method = copy_file(source_path, tmp_path)
+    os.replace(tmp_path, target_path)
+    return method
+
+
+class BlobStore:
+    """
+    Content-addressed store for input documents
+
+    Blobs are named after the SHA-256 of their contents and never modified, so they can
+    be hard linked into the output layout and shared by every copy of the same file.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the blob store
+
+        Args:
+            directory: Directory in which to store blobs
+        """
+        self.directory = directory
+        ensure_directory(self.directory)
+
+    def path(self, digest: str, suffix: str = "") -> str:
+        """
+        Return the path of a blob
+
+        Args:
+            digest: SHA-256 hex digest of the blob
+            suffix: File extension kept on the blob (e.g. ".pdf") so parsers can detect its type
+
+        Returns:
+            Path of the blob
+        """
+        return os.path.join(self.directory, f"{digest}{suffix}")
+
+    def put_file(self, source_path: str, digest: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Store a file, skipping the copy if identical content is already stored
+
+        Args:
+            source_path: Path of the file to store
+            digest: SHA-256 hex digest of the file, if already known
+
+        Returns:
+            Tuple containing:
+                - SHA-256 hex digest of the file
+                - Path of the blob
+        """
+        digest = digest or file_sha256(source_path)
+        path = self.path(digest, os.path.splitext(source_path)[1].lower())
+
+        if not os.path.exists(path):
+            # Input files belong to the caller, so they are copied rather than hard linked
+            tmp_path = temporary_path(path)
+            copy_file(source_path, tmp_path)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+
+        return digest, path
+
+    def put_stream(self, stream: BinaryIO, suffix: str = "") -> Tuple[str, str]:
+        """
+        Store the contents of a binary stream, hashing it while it is written
+
+        The stream is read in chunks, so it is never held in memory as a whole.
+
+        Args:
+            stream: Readable binary stream, such as an uploaded file
+            suffix: File extension kept on the blob (e.g. ".pdf")
+
+        Returns:
+            Tuple containing:
+                - SHA-256 hex digest of the contents
+                - Path of the blob
+        """
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            path = self.path(digest.hexdigest(), suffix.lower())
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return digest.hexdigest(), path
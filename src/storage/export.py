@@ -0,0 +1,28 @@
+"""
+Export of stored outputs to the file-per-output layout
+"""
+
+from .base import OutputStore
+from .file_store import FileOutputStore
+
+
+def export_outputs(source: OutputStore, target_dir: str) -> int:
+    """
+    Export every committed output of a store to the default file layout
+
+    Args:
+        source: Store to export from
+        target_dir: Directory to write the file layout to
+
+    Returns:
+        Number of documents exported
+    """
+    target = FileOutputStore(target_dir)
+    doc_ids = set()
+
+    for doc_id, kind, name, data in source.iter_outputs():
+        target.put(doc_id, kind, name, data)
+        doc_ids.add(doc_id)
+        target.commit(doc_id)
+
+    return len(doc_ids)
@@ -0,0 +1,34 @@
+"""
+Factory for output storage backends
+"""
+
+import os
+
+from .base import OutputStore
+from .file_store import FileOutputStore
+from .sqlite_store import SQLiteOutputStore
+
+# Available output backends
+OUTPUT_BACKENDS = ("files", "sqlite")
+
+# Database file name of the SQLite backend inside the output directory
+SQLITE_STORE_FILENAME = "outputs.db"
+
+
+def create_output_store(backend: str, output_dir: str) -> OutputStore:
+    """
+    Create an output store
+
+    Args:
+        backend: Backend name ("files" for one file per output, "sqlite" for a single database file)
+        output_dir: Directory to save output files
+
+    Returns:
+        The output store
+    """
+    if backend == "files":
+        return FileOutputStore(output_dir)
+    if backend == "sqlite":
+        os.makedirs(output_dir, exist_ok=True)
+        return SQLiteOutputStore(os.path.join(output_dir, SQLITE_STORE_FILENAME))
+    raise ValueError(f"Unknown output backend: {backend}. Choose one of: {', '.join(OUTPUT_BACKENDS)}")
@@ -0,0 +1,135 @@
+"""
+File-per-output storage backend (the default output layout)
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Union
+
+from ..utils.file_utils import ensure_directory, temporary_path
+from .blob_store import BlobStore, link_or_copy
+from .base import CHECKPOINT, CONFIDENCE, COPY, FINAL, RAW, OutputStore
+
+# File extensions of raw outputs (everything else is markdown)
+RAW_EXTENSIONS = {"html": ".html"}
+
+# Output subdirectory for copies of each input file type
+COPY_DIRECTORIES = {"pdf": "pdf_copies", "docx": "docx_copies"}
+
+
+class FileOutputStore(OutputStore):
+    """
+    Output store that writes each output to its own file:
+
+        raw_outputs/<doc>_<name>.md     confidence_scores/<doc>_confidence.json
+        json_outputs/<doc>.json         pdf_copies/<doc>.pdf, docx_copies/<doc>.docx
+        checkpoints/<doc>.json
+
+    Every file is written to a temporary name next to its final path and renamed into
+    place when the document is committed, so readers never see a partially written
+    output and discard() leaves no outputs of a failed document behind. The checkpoint
+    is renamed last, so it never records a stage whose outputs are missing. Copies of
+    input files are stored once in a content-addressed blob store (blobs/) and hard
+    linked into the layout.
+    """
+
+    def __init__(self, output_dir: str):
+        """
+        Initialize the store, creating the output directories
+
+        Args:
+            output_dir: Directory to save output files
+        """
+        self.output_dir = output_dir
+        ensure_directory(self.output_dir)
+        for subdirectory in ("raw_outputs", "json_outputs", "confidence_scores", "checkpoints") + tuple(COPY_DIRECTORIES.values()):
+            ensure_directory(os.path.join(self.output_dir, subdirectory))
+        self.blobs = BlobStore(os.path.join(self.output_dir, "blobs"))
+        # Temporary files written since each document's last commit, by final path
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, doc_id: str, kind: str, name: str) -> str:
+        """
+        Return the path of an output
+
+        Args:
+            doc_id: Document ID
+            kind: Kind of output
+            name: Name of the output within its kind
+
+        Returns:
+            Path of the output file
+        """
+        if kind == RAW:
+            return os.path.join(self.output_dir, "raw_outputs", f"{doc_id}_{name}{RAW_EXTENSIONS.get(name, '.md')}")
+        if kind == CONFIDENCE:
+            return os.path.join(self.output_dir, "confidence_scores", f"{doc_id}_confidence.json")
+        if kind == FINAL:
+            return os.path.join(self.output_dir, "json_outputs", f"{doc_id}.json")
+        if kind == COPY:
+            return os.path.join(self.output_dir, COPY_DIRECTORIES[name], f"{doc_id}.{name}")
+        if kind == CHECKPOINT:
+            return os.path.join(self.output_dir, "checkpoints", f"{doc_id}.json")
+        raise ValueError(f"Unknown output kind: {kind}")
+
+    def put(self, doc_id: str, kind: str, name: str, data: Union[str, bytes]) -> str:
+        path = self.path(doc_id, kind, name)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        tmp_path = temporary_path(path)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        self._stage(doc_id, path, tmp_path)
+        return path
+
+    def put_file(self, doc_id: str, kind: str, name: str, source_path: str, digest: Optional[str] = None) -> str:
+        path = self.path(doc_id, kind, name)
+        if os.path.abspath(source_path) == os.path.abspath(path):
+            return path
+
+        _, blob_path = self.blobs.put_file(source_path, digest)
+        tmp_path = temporary_path(path)
+        link_or_copy(blob_path, tmp_path)
+        self._stage(doc_id, path, tmp_path)
+        return path
+
+    def _stage(self, doc_id: str, path: str, tmp_path: str) -> None:
+        """Record a temporary file to rename to path on commit, replacing an earlier one"""
+        with self._lock:
+            previous = self._pending.setdefault(doc_id, {}).pop(path, None)
+            self._pending[doc_id][path] = tmp_path
+        if previous is not None:
+            os.remove(previous)
+
+    def location(self, doc_id: str, kind: str, name: str) -> str:
+        return self.path(doc_id, kind, name)
+
+    def get(self, doc_id: str, kind: str, name: str) -> Optional[bytes]:
+        path = self.path(doc_id, kind, name)
+        with self._lock:
+            path = self._pending.get(doc_id, {}).get(path, path)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def commit(self, doc_id: str) -> None:
+        with self._lock:
+            pending = self._pending.pop(doc_id, {})
+        checkpoint_path = self.path(doc_id, CHECKPOINT, "state")
+        for path in sorted(pending, key=lambda path: path == checkpoint_path):
+            os.replace(pending[path], path)
+
+    def discard(self, doc_id: str) -> None:
+        with self._lock:
+            pending = self._pending.pop(doc_id, {})
+        for tmp_path in pending.values():
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def describe(self) -> str:
+        return f"files in {self.output_dir}"
@@ -0,0 +1,56 @@
+"""
+In-memory storage backend for documents processed without persistence
+"""
+
+import threading
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from .base import OutputStore
+
+
+class MemoryOutputStore(OutputStore):
+    """
+    Output store that keeps outputs in memory for the lifetime of the store
+
+    Used by DocumentProcessor.process(persist=False): a document's outputs are returned
+    to the caller and nothing is written to the output directory. Writes are buffered
+    per document until commit(), like the other backends.
+    """
+
+    def __init__(self):
+        self._outputs: Dict[Tuple[str, str, str], bytes] = {}
+        self._pending: Dict[str, Dict[Tuple[str, str, str], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, doc_id: str, kind: str, name: str, data: Union[str, bytes]) -> str:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self._lock:
+            self._pending.setdefault(doc_id, {})[(doc_id, kind, name)] = data
+        return self.location(doc_id, kind, name)
+
+    def location(self, doc_id: str, kind: str, name: str) -> str:
+        return f"memory:{doc_id}/{kind}/{name}"
+
+    def get(self, doc_id: str, kind: str, name: str) -> Optional[bytes]:
+        key = (doc_id, kind, name)
+        with self._lock:
+            pending = self._pending.get(doc_id, {})
+            return pending[key] if key in pending else self._outputs.get(key)
+
+    def commit(self, doc_id: str) -> None:
+        with self._lock:
+            self._outputs.update(self._pending.pop(doc_id, {}))
+
+    def discard(self, doc_id: str) -> None:
+        with self._lock:
+            self._pending.pop(doc_id, None)
+
+    def iter_outputs(self) -> Iterator[Tuple[str, str, str, bytes]]:
+        with self._lock:
+            outputs = sorted(self._outputs.items())
+        for (doc_id, kind, name), data in outputs:
+            yield doc_id, kind, name, data
+
+    def describe(self) -> str:
+        return "memory (not persisted)"
@@ -0,0 +1,149 @@
+"""
+Single-file SQLite storage backend
+"""
+
+import time
+import zlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; fall back to zlib
+    zstandard = None
+
+from .base import COPY, OutputStore
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    committed_at REAL
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    doc_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (doc_id, kind, name)
+);
+"""
+
+# Compression level used for zstd
+ZSTD_LEVEL = 10
+
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress data with zstd when available, otherwise zlib"""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    """Decompress data stored with the given codec"""
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This output was compressed with zstd. Install the zstandard package to read it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+class SQLiteOutputStore(OutputStore):
+    """
+    Output store that keeps all outputs of all documents in one SQLite database
+
+    Text outputs are compressed with zstd (zlib if the zstandard package is not
+    installed); input copies are stored as-is. Writes are buffered per document and
+    written in a single transaction on commit(), so the outputs written since the last
+    commit appear all at once or not at all.
+
+    The database uses the rollback journal rather than WAL: WAL needs shared memory,
+    which network filesystems such as NFS do not provide, and the store is meant for
+    output directories on shared storage.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the store, creating the database if necessary
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._pending: Dict[str, Dict[Tuple[str, str], Tuple[str, int, bytes]]] = {}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(SCHEMA_SQL)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def put(self, doc_id: str, kind: str, name: str, data: Union[str, bytes]) -> str:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        # Input documents are usually compressed already
+        codec, stored = ("none", data) if kind == COPY else _compress(data)
+
+        with self._lock:
+            self._pending.setdefault(doc_id, {})[(kind, name)] = (codec, len(data), stored)
+        return self.location(doc_id, kind, name)
+
+    def location(self, doc_id: str, kind: str, name: str) -> str:
+        return f"{self.db_path}#{doc_id}/{kind}/{name}"
+
+    def get(self, doc_id: str, kind: str, name: str) -> Optional[bytes]:
+        with self._lock:
+            pending = self._pending.get(doc_id, {}).get((kind, name))
+        if pending is not None:
+            return _decompress(pending[0], pending[2])
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT codec, data FROM outputs WHERE doc_id = ? AND kind = ? AND name = ?",
+                (doc_id, kind, name)
+            ).fetchone()
+        return _decompress(row[0], row[1]) if row else None
+
+    def commit(self, doc_id: str) -> None:
+        with self._lock:
+            pending = self._pending.pop(doc_id, None)
+        if not pending:
+            return
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO outputs (doc_id, kind, name, codec, size, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [(doc_id, kind, name, codec, size, data) for (kind, name), (codec, size, data) in pending.items()]
+            )
+            conn.execute("INSERT OR REPLACE INTO documents (doc_id, committed_at) VALUES (?, ?)", (doc_id, time.time()))
+
+    def discard(self, doc_id: str) -> None:
+        with self._lock:
+            self._pending.pop(doc_id, None)
+
+    def iter_outputs(self) -> Iterator[Tuple[str, str, str, bytes]]:
+        with self._connect() as conn:
+            keys = conn.execute("SELECT doc_id, kind, name FROM outputs ORDER BY doc_id, kind, name").fetchall()
+
+        # Read one output at a time so exports do not load the whole database
+        for doc_id, kind, name in keys:
+            yield doc_id, kind, name, self.get(doc_id, kind, name)
+
+    def describe(self) -> str:
+        return f"SQLite database {self.db_path}"
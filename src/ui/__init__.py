@@ -5,14 +5,21 @@ This module provides the Streamlit UI for the Document Parser.
 """
 
 import os
+import html
 import streamlit as st
 
 from src.ui.styles import load_styles
 from src.ui.components.pdf_viewer import render_pdf_viewer, render_pdf_placeholder
 from src.ui.components.docx_viewer import render_docx_viewer, render_docx_placeholder
 from src.ui.components.json_viewer import render_json_viewer
-from src.ui.utils.processor import process_uploaded_file, load_existing_json
+from src.ui.utils.processor import OUTPUT_DIR, get_document_catalog, get_search_index, load_existing_json
 from src.ui.utils.sticky_container import sticky_container
+from src.ui.utils.fragments import fragment, fragments_supported
+from src.ui.utils.jobs import enqueue_uploaded_file, get_session_jobs, dismiss_job
+from src.utils.job_queue import QueueFullError, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+# Seconds between refreshes of the job status panel
+JOB_POLL_INTERVAL = 2
 
 
 def setup_page():
@@ -52,15 +59,17 @@ def render_upload_section():
     Render the upload section for new documents.
     """
     # Upload section title
-    st.markdown('<h2 style="text-align: center; color: #3B82F6; margin-bottom: 1.5rem;">Upload Your Document</h2>', unsafe_allow_html=True)
+    st.markdown('<h2 style="text-align: center; color: #3B82F6; margin-bottom: 1.5rem;">Upload Your Documents</h2>', unsafe_allow_html=True)
 
     # File uploader with improved instructions
-    st.markdown('<p style="text-align: center; margin-bottom: 1.5rem;">Select a PDF or DOCX document to extract structured data</p>', unsafe_allow_html=True)
-    uploaded_file = st.file_uploader("Upload Document", type=["pdf", "docx"], label_visibility="collapsed")
+    st.markdown('<p style="text-align: center; margin-bottom: 1.5rem;">Select one or more PDF or DOCX documents to extract structured data</p>', unsafe_allow_html=True)
+    uploaded_files = st.file_uploader("Upload Documents", type=["pdf", "docx"], accept_multiple_files=True,
+                                      label_visibility="collapsed")
 
-    if uploaded_file:
+    if uploaded_files:
         # Show file details and process button
-        st.markdown(f'<p style="text-align: center; font-weight: 500; margin: 1rem 0;">Selected: <span style="color: #3B82F6;">{uploaded_file.name}</span></p>', unsafe_allow_html=True)
+        file_names = html.escape(", ".join(uploaded_file.name for uploaded_file in uploaded_files))
+        st.markdown(f'<p style="text-align: center; font-weight: 500; margin: 1rem 0;">Selected: <span style="color: #3B82F6;">{file_names}</span></p>', unsafe_allow_html=True)
 
         # Add some space
         st.markdown('<div style="height: 1rem;"></div>', unsafe_allow_html=True)
@@ -68,12 +77,13 @@ def render_upload_section():
         # Process button in a centered column
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            process_button = st.button("Process Document", type="primary", use_container_width=True)
+            label = "Process Document" if len(uploaded_files) == 1 else f"Process {len(uploaded_files)} Documents"
+            process_button = st.button(label, type="primary", use_container_width=True)
     else:
         # Show instructions when no file is uploaded
-        st.markdown('Drag and drop a PDF or DOCX file here or click to browse files', unsafe_allow_html=True)
+        st.markdown('Drag and drop PDF or DOCX files here or click to browse files', unsafe_allow_html=True)
         process_button = False
-        uploaded_file = None
+        uploaded_files = []
 
     # Option to view existing documents
     st.markdown('<div style="text-align: center; margin-top: 1.5rem;">', unsafe_allow_html=True)
@@ -82,145 +92,295 @@ def render_upload_section():
         st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
-    return uploaded_file, process_button
+    return uploaded_files, process_button
+
+
+def enqueue_documents(uploaded_files):
+    """
+    Enqueue the uploaded documents for background processing.
+
+    Args:
+        uploaded_files: The uploaded files from Streamlit
+    """
+    for uploaded_file in uploaded_files:
+        try:
+            enqueue_uploaded_file(uploaded_file)
+        except QueueFullError:
+            st.markdown(f'<div class="error-box">The server is busy. {html.escape(uploaded_file.name)} was not queued, please try again in a few minutes.</div>', unsafe_allow_html=True)
+            break
+
+
+def open_job_result(job):
+    """
+    Show the results of a finished job.
+
+    Args:
+        job: A successfully finished job
+    """
+    file_path = job.result["file_path"]
+
+    # Update session state
+    st.session_state.file_path = file_path
+    st.session_state.json_data = job.result["json_data"]
+    st.session_state.json_document_key = f"job:{job.id}"
+    st.session_state.processing_complete = True
+    st.session_state.show_upload = False
+
+    # Store file type in session state
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == '.pdf':
+        st.session_state.file_type = 'pdf'
+    elif file_extension == '.docx':
+        st.session_state.file_type = 'docx'
+
+
+@fragment(run_every=JOB_POLL_INTERVAL)
+def render_jobs_section():
+    """
+    Render the status of this session's background jobs.
+
+    Runs as a fragment that refreshes itself, so polling does not rerun the whole page.
+    """
+    jobs = get_session_jobs()
+    if not jobs:
+        return
+
+    st.markdown('<h3 style="color: #3B82F6; margin-top: 2rem;">Your Documents</h3>', unsafe_allow_html=True)
+
+    for job in jobs:
+        name_col, status_col, action_col = st.columns([3, 4, 2])
+
+        with name_col:
+            st.markdown(f"**{job.name}**")
+
+        with status_col:
+            if job.status in (QUEUED, RUNNING):
+                st.progress(job.progress, text=job.stage)
+            elif job.status == SUCCEEDED:
+                st.markdown('<span style="color: #059669;">Processed successfully</span>', unsafe_allow_html=True)
+            elif job.status == FAILED:
+                st.markdown(f'<span style="color: #DC2626;">Error: {html.escape(str(job.error))}</span>', unsafe_allow_html=True)
+
+        with action_col:
+            if job.status == SUCCEEDED:
+                if st.button("View Results", key=f"view_{job.id}", use_container_width=True):
+                    open_job_result(job)
+                    st.rerun()
+            elif job.status == FAILED:
+                if st.button("Dismiss", key=f"dismiss_{job.id}", use_container_width=True):
+                    dismiss_job(job.id)
+                    st.rerun()
+
+    # Without fragments the panel cannot refresh itself
+    if not fragments_supported() and any(not job.done for job in jobs):
+        st.button("Refresh Status")
+
+
+# Sort options for the catalog of processed documents: label -> (column, descending)
+CATALOG_SORT_OPTIONS = {
+    "Most recent": ("updated_at", True),
+    "Oldest": ("updated_at", False),
+    "Name": ("original_name", False),
+    "Most pages": ("page_count", True),
+    "Slowest": ("total_seconds", True),
+    "Most memory": ("peak_rss_mb", True),
+    "Most prompt tokens": ("prompt_tokens", True),
+}
+
+# Number of documents shown per catalog page
+CATALOG_PAGE_SIZE = 25
 
+# Number of full-text search results shown
+SEARCH_RESULT_LIMIT = 25
 
-def process_document(uploaded_file):
+
+def _reset_catalog_page():
+    """
+    Callback that returns the catalog browser to its first page.
+    """
+    st.session_state.catalog_page = 0
+
+
+def open_catalog_document(document):
     """
-    Process the uploaded document and update the session state.
+    Load a document from the catalog and show its results.
 
     Args:
-        uploaded_file: The uploaded file from Streamlit
+        document: Catalog row of the document
 
     Returns:
         Success flag (bool)
     """
-    with st.spinner("Processing document... This may take a minute."):
-        # Show a progress message
-        progress_placeholder = st.empty()
-        progress_placeholder.markdown('<div class="info-box" style="text-align: center;">Extracting text and generating structured data...</div>', unsafe_allow_html=True)
-
-        # Process the file
-        success, file_path, json_data = process_uploaded_file(uploaded_file)
-
-        # Clear the progress message
-        progress_placeholder.empty()
-
-    if success and json_data:
-        # Update session state
-        st.session_state.file_path = file_path
-        st.session_state.json_data = json_data
-        st.session_state.processing_complete = True
-        st.session_state.show_upload = False
-
-        # Store file type in session state
-        file_extension = os.path.splitext(file_path)[1].lower()
-        if file_extension == '.pdf':
-            st.session_state.file_type = 'pdf'
-        elif file_extension == '.docx':
-            st.session_state.file_type = 'docx'
-
-        # Show success message and rerun to update the UI
-        st.success("Document processed successfully!")
-        st.rerun()
-        return True
-    else:
-        st.markdown(f'<div class="error-box">Error: {file_path}</div>', unsafe_allow_html=True)
-
-        # Add a debug expander for troubleshooting
-        with st.expander("Debug Information"):
-            st.write("### Processing Details")
-            st.write(f"Uploaded file: {uploaded_file.name}")
-            st.write(f"Temporary file path: {file_path}")
-
-            # Check if the output directories exist
-            output_dir = "parsed_outputs"
-            json_dir = os.path.join(output_dir, "json_outputs")
-
-            if os.path.exists(json_dir):
-                st.write(f"Files in {json_dir}:")
-                files = os.listdir(json_dir)
-                if files:
-                    for file in files:
-                        st.write(f"- {file}")
-                else:
-                    st.write("No files found in the output directory.")
-            else:
-                st.write(f"Output directory does not exist: {json_dir}")
-
+    json_path = document.get("json_path") or os.path.join(OUTPUT_DIR, "json_outputs", f"{document['doc_id']}.json")
+    json_data = load_existing_json(json_path)
+    if not json_data:
         return False
 
+    # Store in session state
+    st.session_state.json_data = json_data
+    st.session_state.json_document_key = f"catalog:{document['doc_id']}:{document.get('updated_at')}"
+    st.session_state.processing_complete = True
+    st.session_state.show_upload = False
+
+    # Show the original document if a copy was kept
+    copy_path = document.get("copy_path")
+    if copy_path and os.path.exists(copy_path):
+        st.session_state.file_path = copy_path
+        st.session_state.file_type = document.get("file_type")
+
+    return True
+
+
+def render_search_section(catalog):
+    """
+    Render the full-text search over the contents of all processed documents.
+
+    Args:
+        catalog: Catalog of processed documents, used to show names and open results
+    """
+    query = st.text_input("Search document contents", key="content_search",
+                          placeholder="Words that must all appear, e.g. PO-1234 bracket (end a word with * for prefixes)")
+    if not query:
+        return
+
+    try:
+        hits = get_search_index().search(query, limit=SEARCH_RESULT_LIMIT)
+    except ValueError as e:
+        st.markdown(f'<div class="error-box">{html.escape(str(e))}</div>', unsafe_allow_html=True)
+        return
+    if not hits:
+        st.info("No documents contain all of these words.")
+        return
+
+    documents = {}
+    for hit in hits:
+        if hit["doc_id"] not in documents:
+            documents[hit["doc_id"]] = catalog.get(hit["doc_id"]) or {"doc_id": hit["doc_id"]}
+    names = {doc_id: document.get("original_name") or doc_id for doc_id, document in documents.items()}
+
+    st.dataframe(
+        [{
+            "Name": names[hit["doc_id"]],
+            "Found in": hit["path"] or f"{hit['source']} output",
+            "Match": " ".join(hit["snippet"].split()),
+        } for hit in hits],
+        use_container_width=True,
+        hide_index=True
+    )
+
+    selected_doc_id = st.selectbox(
+        "Open a matching document",
+        list(documents),
+        format_func=lambda doc_id: names[doc_id],
+        index=None,
+        placeholder="Choose a file...",
+        key="search_selection"
+    )
+    if selected_doc_id:
+        if open_catalog_document(documents[selected_doc_id]):
+            st.rerun()
+        else:
+            st.markdown('<div class="error-box">The output of this document could not be loaded.</div>', unsafe_allow_html=True)
+
 
 def render_existing_documents_section():
     """
-    Render the section for viewing existing documents.
+    Render the section for browsing previously processed documents.
+
+    Documents are read from the catalog one page at a time, so browsing stays fast
+    with any number of processed documents.
     """
     st.markdown('<h2 style="text-align: center; color: #3B82F6; margin-bottom: 1.5rem;">Previously Processed Documents</h2>', unsafe_allow_html=True)
 
-    # Check if the output directory exists
-    output_dir = "parsed_outputs"
-    json_dir = os.path.join(output_dir, "json_outputs")
-
-    if os.path.exists(json_dir):
-        # Get list of JSON files
-        json_files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
-
-        if json_files:
-            # Create a dropdown to select a JSON file
-            selected_json = st.selectbox(
-                "Select a document to view",
-                json_files,
-                index=None,
-                placeholder="Choose a file..."
-            )
-
-            if selected_json:
-                # Load the selected JSON file
-                json_path = os.path.join(json_dir, selected_json)
-                json_data = load_existing_json(json_path)
-
-                if json_data:
-                    # Store in session state
-                    st.session_state.json_data = json_data
-                    st.session_state.processing_complete = True
-                    st.session_state.show_upload = False
-
-                    # Try to find the corresponding document if it exists
-                    base_filename = os.path.splitext(selected_json)[0]
-                    pdf_dir = os.path.join(output_dir, "pdf_copies")
-                    docx_dir = os.path.join(output_dir, "docx_copies")
-
-                    # Check for PDF first
-                    if os.path.exists(pdf_dir):
-                        pdf_path = os.path.join(pdf_dir, f"{base_filename}.pdf")
-                        if os.path.exists(pdf_path):
-                            st.session_state.file_path = pdf_path
-                            st.session_state.file_type = 'pdf'
-
-                    # If no PDF found, check for DOCX
-                    elif os.path.exists(docx_dir):
-                        docx_path = os.path.join(docx_dir, f"{base_filename}.docx")
-                        if os.path.exists(docx_path):
-                            st.session_state.file_path = docx_path
-                            st.session_state.file_type = 'docx'
-
-                    # Show success message and rerun to update the UI
-                    st.success("Document loaded successfully!")
-                    st.rerun()
-        else:
-            st.info("No processed documents found. Process a document first.")
+    catalog = get_document_catalog()
 
-            # Button to go back to upload
-            if st.button("Upload a Document"):
-                st.session_state.show_existing = False
-                st.rerun()
-    else:
-        st.info(f"Output directory not found: {json_dir}")
+    # Search across the contents of every document
+    render_search_section(catalog)
+
+    # Filter and sort controls
+    filter_col, type_col, sort_col = st.columns([3, 1, 1])
+    with filter_col:
+        name_filter = st.text_input("Filter by name", key="catalog_filter", on_change=_reset_catalog_page,
+                                    placeholder="Type part of a file name...")
+    with type_col:
+        type_label = st.selectbox("Type", ["All", "PDF", "DOCX"], key="catalog_type", on_change=_reset_catalog_page)
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(CATALOG_SORT_OPTIONS), key="catalog_sort", on_change=_reset_catalog_page)
+
+    file_type = None if type_label == "All" else type_label.lower()
+    sort_by, descending = CATALOG_SORT_OPTIONS[sort_label]
+
+    # Only completed documents have an output to view
+    total = catalog.count(name_filter=name_filter, file_type=file_type, status="completed")
+    if total == 0:
+        st.info("No processed documents found. Process a document first.")
 
         # Button to go back to upload
         if st.button("Upload a Document"):
             st.session_state.show_existing = False
             st.rerun()
+        return
+
+    # Keep the current page in range
+    page_count = (total + CATALOG_PAGE_SIZE - 1) // CATALOG_PAGE_SIZE
+    page = min(st.session_state.get("catalog_page", 0), page_count - 1)
+    st.session_state.catalog_page = page
+
+    documents = catalog.list(offset=page * CATALOG_PAGE_SIZE, limit=CATALOG_PAGE_SIZE, sort_by=sort_by,
+                             descending=descending, name_filter=name_filter, file_type=file_type,
+                             status="completed")
+
+    # Show the current page of documents
+    st.dataframe(
+        [{
+            "Name": document["original_name"] or document["doc_id"],
+            "Type": (document["file_type"] or "").upper(),
+            "Pages": document["page_count"],
+            "Processing time (s)": round(document["total_seconds"], 1) if document["total_seconds"] else None,
+            "Tokens": (document["prompt_tokens"] or 0) + (document["output_tokens"] or 0) or None,
+        } for document in documents],
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # Page navigation
+    prev_col, info_col, next_col = st.columns([1, 3, 1])
+    with prev_col:
+        if st.button("← Previous", key="catalog_prev", disabled=page == 0, use_container_width=True):
+            st.session_state.catalog_page = page - 1
+            st.rerun()
+    with info_col:
+        st.markdown(f'<p class="caption-text" style="text-align: center;">Page {page + 1} of {page_count} ({total} documents)</p>', unsafe_allow_html=True)
+    with next_col:
+        if st.button("Next →", key="catalog_next", disabled=page >= page_count - 1, use_container_width=True):
+            st.session_state.catalog_page = page + 1
+            st.rerun()
+
+    # Create a dropdown to select a document from the current page
+    doc_ids = [document["doc_id"] for document in documents]
+    names = {document["doc_id"]: document["original_name"] or document["doc_id"] for document in documents}
+    selected_doc_id = st.selectbox(
+        "Select a document to view",
+        doc_ids,
+        format_func=lambda doc_id: names[doc_id],
+        index=None,
+        placeholder="Choose a file..."
+    )
+
+    if selected_doc_id:
+        # Load only the selected document's row
+        document = catalog.get(selected_doc_id)
+        if document and open_catalog_document(document):
+            # Show success message and rerun to update the UI
+            st.success("Document loaded successfully!")
+            st.rerun()
+        else:
+            st.markdown('<div class="error-box">The output of this document could not be loaded.</div>', unsafe_allow_html=True)
+
+    # Button to go back to upload
+    if st.button("Upload a Document"):
+        st.session_state.show_existing = False
+        st.rerun()
 
 
 def render_results():
@@ -291,7 +451,7 @@ def render_results():
                         st.info("Document not available for viewing.")
 
     with col2:
-        render_json_viewer(st.session_state.json_data)
+        render_json_viewer(st.session_state.json_data, st.session_state.get("json_document_key"))
 
 
 def render_footer():
@@ -324,11 +484,14 @@ def run_app():
             render_existing_documents_section()
         else:
             # Show the upload interface
-            uploaded_file, process_button = render_upload_section()
+            uploaded_files, process_button = render_upload_section()
+
+            # Queue the uploaded files for processing when the button is clicked
+            if uploaded_files and process_button:
+                enqueue_documents(uploaded_files)
 
-            # Process the uploaded file when the button is clicked
-            if uploaded_file and process_button:
-                process_document(uploaded_file)
+            # Show the status of queued and finished documents
+            render_jobs_section()
 
     # Display the results if processing is complete
     if st.session_state.processing_complete and 'json_data' in st.session_state:
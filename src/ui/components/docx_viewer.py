@@ -6,21 +6,26 @@ This module provides a component for viewing DOCX documents.
 
 import os
 import streamlit as st
-import mammoth
 
+from src.ui.utils.fragments import fragment
+from src.ui.utils.render_cache import get_render_cache
 
+
+@fragment
 def render_docx_viewer(docx_path: str):
     """
     Render a DOCX viewer for the given DOCX path.
 
+    The mammoth HTML is taken from the shared render cache, so it is only
+    converted once per file.
+
     Args:
         docx_path: Path to the DOCX file
     """
     try:
-        # Convert DOCX to HTML using mammoth
-        with open(docx_path, 'rb') as docx_file:
-            result = mammoth.convert_to_html(docx_file)
-            html = result.value
+        # Convert DOCX to HTML using mammoth (cached by file hash)
+        render_cache = get_render_cache()
+        html = render_cache.docx_html(docx_path, render_cache.file_digest(docx_path))
         
         # Create a container for the DOCX viewer
         docx_container = st.container()
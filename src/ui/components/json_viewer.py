@@ -5,33 +5,279 @@ This module provides a component for viewing JSON data.
 """
 
 import json
+import html
+import hashlib
 import streamlit as st
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.ui.utils.fragments import fragment
+from src.utils.json_utils import escape_pointer_token, iter_json_pointers, resolve_json_pointer
 
-def render_json_viewer(json_data: Dict):
+# Number of children of an object or array shown before "Show more"
+CHILDREN_PAGE_SIZE = 50
+
+# Maximum number of search results listed
+MAX_SEARCH_RESULTS = 50
+
+# Maximum length of a value preview in collapsed nodes and search results
+PREVIEW_LENGTH = 80
+
+# Indentation per tree level, in em
+INDENT_EM = 1
+
+# Em space used to indent button labels
+EM_SPACE = "\u2003"
+
+
+def _format_leaf(value: Any) -> str:
+    """
+    Format a scalar JSON value the way it appears in JSON text.
+
+    Args:
+        value: A scalar JSON value
+
+    Returns:
+        JSON representation of the value
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _summary(value: Any) -> str:
+    """
+    Describe a container without rendering its children.
+
+    Args:
+        value: A JSON object or array
+
+    Returns:
+        Short summary such as "{3 keys}" or "[120 items]"
+    """
+    if isinstance(value, dict):
+        return f"{{{len(value)} keys}}"
+    return f"[{len(value)} items]"
+
+
+def _build_search_index(json_data: Any) -> List[Tuple[str, str]]:
+    """
+    Build the search index of a document: one (JSON pointer, lowercase search text) entry per leaf.
+
+    Args:
+        json_data: The JSON data
+
+    Returns:
+        List of index entries
+    """
+    return [
+        (pointer, f"{pointer} {_format_leaf(value)}".lower())
+        for pointer, value in iter_json_pointers(json_data)
+        if not isinstance(value, (dict, list))
+    ]
+
+
+def _content_digest(json_data: Any) -> str:
     """
-    Render a simple JSON viewer for the given JSON data.
+    Return a digest of the JSON content, used to key the viewer state when no document key is given.
+
+    Args:
+        json_data: The JSON data
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON text
+    """
+    text = json.dumps(json_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _get_viewer_state(json_data: Any, document_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the viewer state for the given document, resetting it when the document changes.
+
+    The search index is computed once per document and kept with the state.
+
+    Args:
+        json_data: The JSON data being viewed
+        document_key: Stable identifier of the document (defaults to a digest of its content)
+
+    Returns:
+        Dictionary with the expanded pointers, per-node child limits and search index
+    """
+    document_key = document_key or _content_digest(json_data)
+    state = st.session_state.get("json_viewer_state")
+    if state is None or state["document_key"] != document_key:
+        state = {
+            "document_key": document_key,
+            "expanded": {""},
+            "limits": {},
+            "index": None,
+            "download_ready": False,
+        }
+        st.session_state.json_viewer_state = state
+    return state
+
+
+def _toggle(state: Dict[str, Any], pointer: str):
+    """
+    Callback that expands or collapses a node.
+    """
+    if pointer in state["expanded"]:
+        state["expanded"].discard(pointer)
+    else:
+        state["expanded"].add(pointer)
+
+
+def _show_more(state: Dict[str, Any], pointer: str):
+    """
+    Callback that shows the next page of a node's children.
+    """
+    state["limits"][pointer] = state["limits"].get(pointer, CHILDREN_PAGE_SIZE) + CHILDREN_PAGE_SIZE
+
+
+def _reveal(state: Dict[str, Any], json_data: Any, pointer: str):
+    """
+    Callback that expands every ancestor of a node so it becomes visible.
+    """
+    node = json_data
+    ancestor = ""
+    for token in pointer[1:].split("/") if pointer else []:
+        state["expanded"].add(ancestor)
+        key = token.replace("~1", "/").replace("~0", "~")
+        # Make sure the pages of arrays and objects reach the revealed child
+        if isinstance(node, list):
+            position = int(key)
+            child = node[position]
+        else:
+            position = list(node).index(key)
+            child = node[key]
+        needed = position + 1
+        limit = state["limits"].get(ancestor, CHILDREN_PAGE_SIZE)
+        if needed > limit:
+            state["limits"][ancestor] = ((needed // CHILDREN_PAGE_SIZE) + 1) * CHILDREN_PAGE_SIZE
+        node = child
+        ancestor = f"{ancestor}/{token}"
+    state["highlight"] = pointer
+
+
+def _prepare_download(state: Dict[str, Any]):
+    """
+    Callback that makes the download button available.
+    """
+    state["download_ready"] = True
+
+
+def _render_node(state: Dict[str, Any], key: str, value: Any, pointer: str, depth: int):
+    """
+    Render one node; children are only rendered when the node is expanded.
+
+    Args:
+        state: Viewer state
+        key: Object key or array index of the node
+        value: Value of the node
+        pointer: JSON pointer of the node
+        depth: Depth of the node in the tree
+    """
+    indent = EM_SPACE * depth * INDENT_EM
+
+    if isinstance(value, (dict, list)):
+        expanded = pointer in state["expanded"]
+        arrow = "▾" if expanded else "▸"
+        st.button(f"{indent}{arrow} {key} {_summary(value)}", key=f"json_node:{pointer}",
+                  on_click=_toggle, args=(state, pointer))
+        if expanded:
+            _render_children(state, value, pointer, depth + 1)
+    else:
+        highlight = "background-color: #FEF3C7;" if state.get("highlight") == pointer else ""
+        preview = html.escape(_format_leaf(value))
+        st.markdown(
+            f'<div style="padding-left: {depth * INDENT_EM}em; font-family: monospace; {highlight}">'
+            f'<span style="color: #1E40AF;">{html.escape(str(key))}</span>: {preview}</div>',
+            unsafe_allow_html=True
+        )
+
+
+def _render_children(state: Dict[str, Any], value: Any, pointer: str, depth: int):
+    """
+    Render the children of an expanded node, one page at a time.
+
+    Args:
+        state: Viewer state
+        value: JSON object or array
+        pointer: JSON pointer of the node
+        depth: Depth of the children in the tree
+    """
+    items = value.items() if isinstance(value, dict) else enumerate(value)
+    limit = state["limits"].get(pointer, CHILDREN_PAGE_SIZE)
+
+    for i, (child_key, child_value) in enumerate(items):
+        if i >= limit:
+            remaining = len(value) - limit
+            indent = EM_SPACE * depth * INDENT_EM
+            st.button(f"{indent}… show {min(remaining, CHILDREN_PAGE_SIZE)} more of {remaining}",
+                      key=f"json_more:{pointer}", on_click=_show_more, args=(state, pointer))
+            break
+        _render_node(state, child_key, child_value, f"{pointer}/{escape_pointer_token(child_key)}", depth)
+
+
+def _render_search(state: Dict[str, Any], json_data: Any):
+    """
+    Render the search box and its results.
+
+    Args:
+        state: Viewer state
+        json_data: The JSON data
+    """
+    query = st.text_input("Search", key="json_search", placeholder="Search field names and values...",
+                          label_visibility="collapsed")
+    if not query:
+        return
+
+    if state["index"] is None:
+        state["index"] = _build_search_index(json_data)
+
+    needle = query.lower()
+    matches = [pointer for pointer, text in state["index"] if needle in text]
+
+    st.caption(f"{len(matches)} match(es)" + (f", showing the first {MAX_SEARCH_RESULTS}" if len(matches) > MAX_SEARCH_RESULTS else ""))
+    for pointer in matches[:MAX_SEARCH_RESULTS]:
+        preview = _format_leaf(resolve_json_pointer(json_data, pointer))
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH] + "…"
+        st.button(f"{pointer or '/'} = {preview}", key=f"json_hit:{pointer}", on_click=_reveal, args=(state, json_data, pointer))
+
+
+@fragment
+def render_json_viewer(json_data: Dict, document_key: Optional[str] = None):
+    """
+    Render a lazy tree viewer for the given JSON data.
+
+    Only expanded nodes are rendered, large objects and arrays are shown one page at a
+    time, and the download payload is only serialized when it is requested.
 
     Args:
         json_data: The JSON data to display
+        document_key: Stable identifier of the document, such as its job or catalog ID;
+            the viewer state is reset when it changes (defaults to a digest of the content)
     """
     st.markdown('<div class="section-title">Structured Data Output</div>', unsafe_allow_html=True)
 
-    # Format the JSON with proper indentation for better readability
-    formatted_json = json.dumps(json_data, indent=2, ensure_ascii=False)
-
-    # Display the formatted JSON
-    st.code(formatted_json, language="json")
+    state = _get_viewer_state(json_data, document_key)
 
-    # Add a download button for the JSON data
-    st.download_button(
-        label="Download JSON",
-        data=formatted_json,
-        file_name="parsed_document.json",
-        mime="application/json",
-        help="Download the JSON data as a file"
-    )
+    _render_search(state, json_data)
 
+    # Render the tree starting from the root's children
+    if isinstance(json_data, (dict, list)):
+        _render_children(state, json_data, "", 0)
+    else:
+        st.code(_format_leaf(json_data), language="json")
 
-# The interactive JSON viewer functions have been removed to simplify the UI
+    # Serialize the JSON for download only when requested
+    if state["download_ready"]:
+        st.download_button(
+            label="Download JSON",
+            data=json.dumps(json_data, indent=2, ensure_ascii=False),
+            file_name="parsed_document.json",
+            mime="application/json",
+            help="Download the JSON data as a file"
+        )
+    else:
+        st.button("Prepare JSON Download", help="Prepare the JSON data for download",
+                  on_click=_prepare_download, args=(state,))
@@ -4,23 +4,50 @@ PDF Viewer component for the Document Parser UI.
 This module provides a component for viewing PDF documents.
 """
 
-import io
 import streamlit as st
-import fitz  # PyMuPDF
-from PIL import Image
 
+from src.ui.utils.fragments import fragment
+from src.ui.utils.render_cache import PREFETCH_RADIUS, get_render_cache
 
+# Zoom factor used to rasterize pages (higher zoom gives better resolution)
+PDF_ZOOM = 2.5
+
+
+def _go_to_page(page_num: int):
+    """
+    Navigation callback that moves the viewer to the given page.
+
+    Args:
+        page_num: 1-based page number
+    """
+    st.session_state.pdf_current_page = page_num
+    st.session_state.pdf_page_input = page_num
+
+
+def _sync_page_input():
+    """
+    Callback that applies the page typed into the page selector.
+    """
+    st.session_state.pdf_current_page = st.session_state.pdf_page_input
+
+
+@fragment
 def render_pdf_viewer(pdf_path: str):
     """
     Render a PDF viewer for the given PDF path.
 
+    The viewer runs as a fragment, so paging only reruns the viewer, and pages are
+    served from the shared render cache with neighboring pages prefetched.
+
     Args:
         pdf_path: Path to the PDF file
     """
     try:
-        # Get the number of pages in the PDF using PyMuPDF (fitz)
-        doc = fitz.open(pdf_path)
-        num_pages = len(doc)
+        render_cache = get_render_cache()
+        digest = render_cache.file_digest(pdf_path)
+
+        # Get the number of pages in the PDF
+        num_pages = render_cache.pdf_page_count(pdf_path, digest)
 
         # Create a container for the PDF viewer
         pdf_container = st.container()
@@ -28,12 +55,17 @@ def render_pdf_viewer(pdf_path: str):
         with pdf_container:
             st.markdown('<div class="section-title">Original Document</div>', unsafe_allow_html=True)
 
-            # Initialize page number in session state if not present
+            # Initialize page number in session state if not present, and keep it in range
             if 'pdf_current_page' not in st.session_state:
                 st.session_state.pdf_current_page = 1
+            if not 1 <= st.session_state.pdf_current_page <= num_pages:
+                _go_to_page(1)
 
             # Add page navigation if there are multiple pages
             if num_pages > 1:
+                if 'pdf_page_input' not in st.session_state:
+                    st.session_state.pdf_page_input = st.session_state.pdf_current_page
+
                 # Create a more visually appealing navigation bar
                 st.markdown('<div style="display: flex; align-items: center; margin-bottom: 1rem;">', unsafe_allow_html=True)
 
@@ -44,67 +76,49 @@ def render_pdf_viewer(pdf_path: str):
                 with col1:
                     # Disable the button if we're on the first page
                     prev_disabled = st.session_state.pdf_current_page <= 1
-                    if st.button("← Previous", key="prev_button", use_container_width=True,
-                                help="Go to previous page", disabled=prev_disabled):
-                        # Decrement page number
-                        st.session_state.pdf_current_page = max(1, st.session_state.pdf_current_page - 1)
-                        st.rerun()
+                    st.button("← Previous", key="prev_button", use_container_width=True,
+                              help="Go to previous page", disabled=prev_disabled,
+                              on_click=_go_to_page, args=(st.session_state.pdf_current_page - 1,))
 
                 # Page selector
                 with col2:
-                    # Create a number input for page selection
-                    page_num = st.number_input(
+                    st.number_input(
                         "Page",
                         min_value=1,
                         max_value=num_pages,
-                        value=st.session_state.pdf_current_page,
                         step=1,
-                        key="pdf_page_input"
+                        key="pdf_page_input",
+                        on_change=_sync_page_input
                     )
 
-                    # Update the current page if changed
-                    if page_num != st.session_state.pdf_current_page:
-                        st.session_state.pdf_current_page = page_num
-                        st.rerun()
-
                 # Next button
                 with col3:
                     # Disable the button if we're on the last page
                     next_disabled = st.session_state.pdf_current_page >= num_pages
-                    if st.button("Next →", key="next_button", use_container_width=True,
-                               help="Go to next page", disabled=next_disabled):
-                        # Increment page number
-                        st.session_state.pdf_current_page = min(num_pages, st.session_state.pdf_current_page + 1)
-                        st.rerun()
+                    st.button("Next →", key="next_button", use_container_width=True,
+                              help="Go to next page", disabled=next_disabled,
+                              on_click=_go_to_page, args=(st.session_state.pdf_current_page + 1,))
 
                 st.markdown('</div>', unsafe_allow_html=True)
 
-                # Get the current page number from session state
-                page_num = st.session_state.pdf_current_page
-            else:
-                # If there's only one page, set the page number to 1
-                page_num = 1
-                st.session_state.pdf_current_page = 1
+            # Get the current page number from session state
+            page_num = st.session_state.pdf_current_page
 
             # Display the current page with a CSS class for better styling in sticky container
             st.markdown('<div class="pdf-container" style="border: none; box-shadow: none;">', unsafe_allow_html=True)
-            # Convert the page to an image and display it
-            page = doc.load_page(page_num - 1)  # 0-based page number
-            pix = page.get_pixmap(matrix=fitz.Matrix(2.5, 2.5))  # Higher zoom factor for better resolution
-
-            # Convert pixmap to PIL Image
-            img_bytes = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_bytes))
+            png_bytes = render_cache.pdf_page_png(pdf_path, digest, page_num, PDF_ZOOM)
 
-            # Display the image (using use_container_width instead of deprecated use_column_width)
-            st.image(img, use_container_width=True)
+            # Display the PNG directly, without decoding it again
+            st.image(png_bytes, use_container_width=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
             # Display page information with better styling
             st.markdown(f'<p class="caption-text" style="text-align: center;">Page {page_num} of {num_pages}</p>', unsafe_allow_html=True)
 
-        # Close the document
-        doc.close()
+        # Render the neighboring pages in the background so the next click is instant
+        neighbors = [p for offset in range(1, PREFETCH_RADIUS + 1)
+                     for p in (page_num + offset, page_num - offset) if 1 <= p <= num_pages]
+        render_cache.prefetch_pdf_pages(pdf_path, digest, neighbors, PDF_ZOOM)
 
     except Exception as e:
         st.error(f"Error displaying PDF: {str(e)}")
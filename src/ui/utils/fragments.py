@@ -0,0 +1,46 @@
+"""
+Fragment utility for the Document Parser UI.
+
+This module provides a decorator for running components as Streamlit fragments.
+"""
+
+from typing import Optional
+
+import streamlit as st
+
+
+def _fragment_decorator():
+    """Return Streamlit's fragment decorator, or None if this version has none"""
+    return getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def fragments_supported() -> bool:
+    """
+    Check whether this Streamlit version supports fragments.
+
+    Returns:
+        True if fragments are available
+    """
+    return _fragment_decorator() is not None
+
+
+def fragment(func=None, *, run_every: Optional[float] = None):
+    """
+    Run a function as a Streamlit fragment, so its widgets only rerun the function itself.
+
+    Falls back to a regular function on Streamlit versions without fragments.
+
+    Args:
+        func: The function to decorate
+        run_every: Optional interval in seconds at which the fragment reruns on its own
+
+    Returns:
+        The decorated function
+    """
+    def decorate(f):
+        decorator = _fragment_decorator()
+        if decorator is None:
+            return f
+        return decorator(run_every=run_every)(f) if run_every else decorator(f)
+
+    return decorate(func) if func is not None else decorate
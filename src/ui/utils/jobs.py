@@ -0,0 +1,116 @@
+"""
+Background job utilities for the Document Parser UI.
+
+This module runs document processing on a worker pool shared by all sessions,
+so the Streamlit script thread is never blocked by the OCR and LLM pipeline.
+"""
+
+import os
+from typing import List
+
+import streamlit as st
+
+from src.utils.job_queue import INTERACTIVE, Job, JobQueue
+from src.ui.utils.processor import process_stored_file, store_uploaded_file
+
+# Query parameter that keeps the session's job IDs across browser refreshes
+JOBS_QUERY_PARAM = "jobs"
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """
+    Return the job queue shared by all sessions of this server.
+
+    The number of concurrent jobs is set with DOCUMENT_PARSER_UI_WORKERS (default 2)
+    and the number of unfinished jobs with DOCUMENT_PARSER_UI_MAX_PENDING (default 50).
+
+    Returns:
+        JobQueue: The shared job queue
+    """
+    return JobQueue(
+        max_workers=int(os.getenv("DOCUMENT_PARSER_UI_WORKERS", 2)),
+        max_pending=int(os.getenv("DOCUMENT_PARSER_UI_MAX_PENDING", 50))
+    )
+
+
+def _process_job(progress_callback, file_name: str, file_path: str):
+    """
+    Job function that processes one stored upload.
+
+    Raises:
+        RuntimeError: If processing fails, with the error message from the processor
+    """
+    success, file_path, json_data = process_stored_file(file_name, file_path, progress_callback=progress_callback)
+    if not success or not json_data:
+        raise RuntimeError(file_path)
+    return {"file_path": file_path, "json_data": json_data}
+
+
+def get_session_job_ids() -> List[str]:
+    """
+    Return the IDs of this session's jobs, restoring them from the URL after a refresh.
+
+    Returns:
+        List of job IDs
+    """
+    if 'job_ids' not in st.session_state:
+        job_param = st.query_params.get(JOBS_QUERY_PARAM, "")
+        st.session_state.job_ids = [job_id for job_id in job_param.split(",") if job_id]
+    return st.session_state.job_ids
+
+
+def _set_session_job_ids(job_ids: List[str]):
+    st.session_state.job_ids = job_ids
+    if job_ids:
+        st.query_params[JOBS_QUERY_PARAM] = ",".join(job_ids)
+    elif JOBS_QUERY_PARAM in st.query_params:
+        del st.query_params[JOBS_QUERY_PARAM]
+
+
+def enqueue_uploaded_file(uploaded_file) -> Job:
+    """
+    Enqueue an uploaded file for background processing.
+
+    The upload is streamed to disk first, so queued jobs do not hold file contents in memory.
+
+    Args:
+        uploaded_file: The uploaded file from Streamlit
+
+    Returns:
+        The queued job
+
+    Raises:
+        QueueFullError: If the server already has too many unfinished jobs
+    """
+    job = get_job_queue().submit(uploaded_file.name, _process_job, uploaded_file.name, store_uploaded_file(uploaded_file),
+                                 lane=INTERACTIVE)
+    _set_session_job_ids(get_session_job_ids() + [job.id])
+    return job
+
+
+def get_session_jobs() -> List[Job]:
+    """
+    Return this session's jobs that are still known to the job queue.
+
+    Returns:
+        List of jobs in submission order
+    """
+    job_ids = get_session_job_ids()
+    jobs = get_job_queue().jobs(job_ids)
+
+    # Forget jobs that expired or were lost in a server restart
+    if len(jobs) != len(job_ids):
+        _set_session_job_ids([job.id for job in jobs])
+
+    return jobs
+
+
+def dismiss_job(job_id: str):
+    """
+    Remove a job from this session's job list.
+
+    Args:
+        job_id: ID of the job to remove
+    """
+    _set_session_job_ids([j for j in get_session_job_ids() if j != job_id])
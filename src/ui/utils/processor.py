@@ -6,33 +6,93 @@ This module provides utilities for processing documents.
 
 import os
 import json
-import tempfile
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+import streamlit as st
 
 from src.document_processor import DocumentProcessor
+from src.parsers.base import use_offline_models
+from src.storage.blob_store import BlobStore
+from src.utils.catalog import DocumentCatalog
+from src.utils.search_index import SearchIndex
+from src.workqueue.factory import is_shared_output_dir
+
+# Output directory used by the UI
+OUTPUT_DIR = "parsed_outputs"
 
 
+@st.cache_resource
 def create_document_processor() -> DocumentProcessor:
     """
-    Create and return a document processor instance.
+    Return the document processor shared by all sessions and jobs of this server.
+
+    The processor is created once, so its parsers and models are loaded by the first
+    job and reused by the following ones; jobs on the worker pool share it.
 
     Returns:
-        DocumentProcessor: An instance of the document processor
+        DocumentProcessor: The shared document processor
     """
+    use_offline_models()
     processor = DocumentProcessor(
         mistral_api_key=os.getenv("MISTRAL_API_KEY"),
         gemini_api_key=os.getenv("GEMINI_API_KEY"),
-        output_dir="parsed_outputs"
+        output_dir=OUTPUT_DIR
     )
 
-    # Create a directory for PDF copies if it doesn't exist
-    pdf_dir = os.path.join(processor.output_dir, "pdf_copies")
-    os.makedirs(pdf_dir, exist_ok=True)
-
     return processor
 
 
+def get_document_catalog() -> DocumentCatalog:
+    """
+    Return the catalog of processed documents, importing existing outputs the first time.
+
+    Returns:
+        DocumentCatalog: The catalog of the UI's output directory
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    journal_mode = "DELETE" if is_shared_output_dir(OUTPUT_DIR) else "WAL"
+    catalog = DocumentCatalog(os.path.join(OUTPUT_DIR, "catalog.db"), journal_mode)
+
+    # Outputs written before the catalog existed are imported once
+    if catalog.count() == 0:
+        catalog.rebuild_from_directory(OUTPUT_DIR)
+
+    return catalog
+
+
+def get_search_index() -> SearchIndex:
+    """
+    Return the full-text index of the UI's output directory.
+
+    Returns:
+        SearchIndex: The search index of processed documents
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    journal_mode = "DELETE" if is_shared_output_dir(OUTPUT_DIR) else "WAL"
+    return SearchIndex(os.path.join(OUTPUT_DIR, "search.db"), journal_mode)
+
+
+def store_uploaded_file(uploaded_file) -> str:
+    """
+    Stream an uploaded file into the content-addressed blob store of the output directory.
+
+    The blob is hard linked into the output layout when the document is processed, so
+    the upload is written to disk once and never duplicated in memory.
+
+    Args:
+        uploaded_file: The uploaded file from Streamlit
+
+    Returns:
+        Path of the stored file
+    """
+    uploaded_file.seek(0)
+    _, blob_path = BlobStore(os.path.join(OUTPUT_DIR, "blobs")).put_stream(
+        uploaded_file, suffix=Path(uploaded_file.name).suffix
+    )
+    return blob_path
+
+
 def process_uploaded_file(uploaded_file) -> Tuple[bool, str, Optional[Dict]]:
     """
     Process an uploaded file (PDF or DOCX) and return the results.
@@ -46,72 +106,69 @@ def process_uploaded_file(uploaded_file) -> Tuple[bool, str, Optional[Dict]]:
             - File path or error message (str)
             - Parsed JSON data (Dict or None if failed)
     """
-    # Determine file type from the uploaded file's name
-    file_extension = Path(uploaded_file.name).suffix.lower()
+    uploaded_file.seek(0)
+    return _process_source(uploaded_file.name, uploaded_file)
+
 
-    # Create a temporary file to save the uploaded file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-        tmp_file.write(uploaded_file.getvalue())
-        tmp_path = tmp_file.name
+def process_file_bytes(file_name: str, file_bytes: bytes,
+                       progress_callback: Optional[Callable[[str, float], None]] = None) -> Tuple[bool, str, Optional[Dict]]:
+    """
+    Process the contents of a file (PDF or DOCX) and return the results.
+
+    Args:
+        file_name: Original name of the file, used to determine its type
+        file_bytes: Contents of the file
+        progress_callback: Optional callback receiving (stage description, fraction complete)
+
+    Returns:
+        Tuple containing:
+            - Success flag (bool)
+            - File path or error message (str)
+            - Parsed JSON data (Dict or None if failed)
+    """
+    return _process_source(file_name, file_bytes, progress_callback)
+
+
+def process_stored_file(file_name: str, file_path: str,
+                        progress_callback: Optional[Callable[[str, float], None]] = None) -> Tuple[bool, str, Optional[Dict]]:
+    """
+    Process a file (PDF or DOCX) that was saved with store_uploaded_file() and return the results.
+
+    Args:
+        file_name: Original name of the file, used to determine its type
+        file_path: Path of the stored file
+        progress_callback: Optional callback receiving (stage description, fraction complete)
+
+    Returns:
+        Tuple containing:
+            - Success flag (bool)
+            - File path or error message (str)
+            - Parsed JSON data (Dict or None if failed)
+    """
+    return _process_source(file_name, file_path, progress_callback)
+
+
+def _process_source(file_name: str, source: Union[str, bytes, BinaryIO],
+                    progress_callback: Optional[Callable[[str, float], None]] = None) -> Tuple[bool, str, Optional[Dict]]:
+    """
+    Process a stored file, file contents or a file object and return the results.
+
+    Returns:
+        Tuple containing:
+            - Success flag (bool)
+            - Stored file path or error message (str)
+            - Parsed JSON data (Dict or None if failed)
+    """
+    file_extension = Path(file_name).suffix.lower()
+    if file_extension not in ('.pdf', '.docx'):
+        return False, f"Unsupported file type: {file_extension}", None
 
     try:
-        # Create document processor
-        processor = create_document_processor()
-
-        # Get base filename without extension
-        base_filename = Path(tmp_path).stem
-
-        # Process based on file type
-        if file_extension == '.pdf':
-            # Save a copy of the PDF for future reference
-            pdf_copy_dir = os.path.join(processor.output_dir, "pdf_copies")
-            pdf_copy_path = os.path.join(pdf_copy_dir, f"{base_filename}.pdf")
-
-            with open(tmp_path, 'rb') as src_file, open(pdf_copy_path, 'wb') as dst_file:
-                dst_file.write(src_file.read())
-
-            # Process the PDF file
-            success = processor.process_pdf(tmp_path)
-        elif file_extension == '.docx':
-            # Save a copy of the DOCX for future reference
-            docx_copy_dir = os.path.join(processor.output_dir, "docx_copies")
-            docx_copy_path = os.path.join(docx_copy_dir, f"{base_filename}.docx")
-
-            with open(tmp_path, 'rb') as src_file, open(docx_copy_path, 'wb') as dst_file:
-                dst_file.write(src_file.read())
-
-            # Process the DOCX file
-            success = processor.process_docx(tmp_path)
-        else:
-            return False, f"Unsupported file type: {file_extension}", None
-
-        if success:
-            # Path to the generated JSON file
-            json_path = os.path.join(processor.output_dir, "json_outputs", f"{base_filename}.json")
-
-            # Add debug information
-            print(f"Looking for JSON file at: {json_path}")
-            print(f"Original uploaded filename: {uploaded_file.name}")
-            print(f"Temporary file path: {tmp_path}")
-
-            # Check if the JSON file exists
-            if os.path.exists(json_path):
-                # Load the JSON data
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-
-                return True, tmp_path, json_data
-            else:
-                # List files in the output directory to help debug
-                json_dir = os.path.join(processor.output_dir, "json_outputs")
-                if os.path.exists(json_dir):
-                    print(f"Files in {json_dir}:")
-                    for file in os.listdir(json_dir):
-                        print(f"  - {file}")
-
-                return False, f"JSON file not found: {json_path}", None
-        else:
-            return False, f"Failed to process the {file_extension} file", None
+        # The processor keeps a copy of the file for future reference and returns the outputs directly
+        result = create_document_processor().process(source, name=file_name, progress_callback=progress_callback)
+        if not result.success:
+            return False, f"Failed to process the {file_extension} file: {result.error}", None
+        return True, result.source_path, result.final
 
     except Exception as e:
         return False, f"Error processing file: {str(e)}", None
@@ -0,0 +1,209 @@
+"""
+Render cache utility for the Document Parser UI.
+
+This module provides a bounded LRU cache of rendered PDF pages and DOCX HTML,
+shared by all sessions, with background prefetching of neighboring pages.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import streamlit as st
+
+# Default cache budget in megabytes (override with DOCUMENT_PARSER_RENDER_CACHE_MB)
+DEFAULT_CACHE_MB = 256
+
+# Number of pages before and after the current page to render in the background
+PREFETCH_RADIUS = 2
+
+# Chunk size for hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Maximum number of file digests and PDF page counts kept
+MAX_METADATA_ENTRIES = 1024
+
+
+class RenderCache:
+    """
+    Thread-safe LRU cache bounded by the total size of the cached values
+    """
+
+    def __init__(self, max_bytes: int, prefetch_workers: int = 2):
+        """
+        Initialize the render cache
+
+        Args:
+            max_bytes: Maximum total size of cached values in bytes
+            prefetch_workers: Number of background threads used for prefetching
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="render-prefetch")
+        self._page_counts: "OrderedDict[str, int]" = OrderedDict()
+        self._digests: "OrderedDict[Tuple[str, float, int], str]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return a cached value and mark it as recently used, or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """Store a value, evicting the least recently used entries beyond the budget"""
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            if len(value) > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _get_metadata(self, entries: OrderedDict, key: Hashable):
+        """Return a file digest or page count and mark it as recently used, or None"""
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def _put_metadata(self, entries: OrderedDict, key: Hashable, value) -> None:
+        """Store a file digest or page count, evicting the least recently used beyond the limit"""
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > MAX_METADATA_ENTRIES:
+                entries.popitem(last=False)
+
+    def file_digest(self, path: str) -> str:
+        """
+        Return the SHA-256 digest of a file, hashing it only when its size or mtime changes
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            Hex digest of the file contents
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        digest = self._get_metadata(self._digests, key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._put_metadata(self._digests, key, digest)
+        return digest
+
+    def pdf_page_count(self, pdf_path: str, digest: str) -> int:
+        """Return the number of pages of a PDF, opening it only once per file"""
+        page_count = self._get_metadata(self._page_counts, digest)
+        if page_count is None:
+            import fitz  # PyMuPDF
+
+            with fitz.open(pdf_path) as doc:
+                page_count = len(doc)
+            self._put_metadata(self._page_counts, digest, page_count)
+        return page_count
+
+    def pdf_page_png(self, pdf_path: str, digest: str, page_num: int, zoom: float) -> bytes:
+        """
+        Return a PDF page rendered to PNG, rendering it on a cache miss
+
+        Args:
+            pdf_path: Path to the PDF file
+            digest: Digest of the PDF file
+            page_num: 1-based page number
+            zoom: Zoom factor used for rasterization
+
+        Returns:
+            PNG image bytes
+        """
+        key = ("pdf", digest, page_num, zoom)
+        png = self.get(key)
+        if png is not None:
+            return png
+
+        # Reuse an in-flight prefetch of the same page instead of rendering it twice
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return pending.result()
+
+        png = self._render_pdf_page(pdf_path, page_num, zoom)
+        self.put(key, png)
+        return png
+
+    def prefetch_pdf_pages(self, pdf_path: str, digest: str, page_nums: Iterable[int], zoom: float) -> None:
+        """
+        Render pages in the background so that navigating to them is instant
+
+        Args:
+            pdf_path: Path to the PDF file
+            digest: Digest of the PDF file
+            page_nums: 1-based page numbers to prefetch
+            zoom: Zoom factor used for rasterization
+        """
+        for page_num in page_nums:
+            key = ("pdf", digest, page_num, zoom)
+            with self._lock:
+                if key in self._entries or key in self._pending:
+                    continue
+                self._pending[key] = self._executor.submit(self._prefetch, key, pdf_path, page_num, zoom)
+
+    def docx_html(self, docx_path: str, digest: str) -> str:
+        """Return the mammoth HTML for a DOCX file, converting it only on a cache miss"""
+        key = ("docx", digest)
+        html = self.get(key)
+        if html is None:
+            import mammoth
+
+            with open(docx_path, "rb") as docx_file:
+                html = mammoth.convert_to_html(docx_file).value.encode("utf-8")
+            self.put(key, html)
+        return html.decode("utf-8")
+
+    def _prefetch(self, key: Hashable, pdf_path: str, page_num: int, zoom: float) -> bytes:
+        try:
+            png = self._render_pdf_page(pdf_path, page_num, zoom)
+            self.put(key, png)
+            return png
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    @staticmethod
+    def _render_pdf_page(pdf_path: str, page_num: int, zoom: float) -> bytes:
+        import fitz  # PyMuPDF
+
+        # Documents are opened per render because PyMuPDF objects are not thread-safe
+        with fitz.open(pdf_path) as doc:
+            page = doc.load_page(page_num - 1)  # 0-based page number
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            return pix.tobytes("png")
+
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """
+    Return the render cache shared by all sessions of this server.
+
+    Returns:
+        RenderCache: The shared render cache
+    """
+    max_mb = int(os.getenv("DOCUMENT_PARSER_RENDER_CACHE_MB", DEFAULT_CACHE_MB))
+    return RenderCache(max_bytes=max_mb * 1024 * 1024)
+
@@ -0,0 +1,291 @@
+"""
+SQLite catalog of processed documents
+"""
+
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Columns of the documents table, in order
+CATALOG_COLUMNS = (
+    "doc_id", "original_name", "file_type", "page_count", "status",
+    "source_path", "copy_path", "json_path", "confidence_path", "raw_paths",
+    "parse_seconds", "schema_seconds", "final_seconds", "total_seconds",
+    "created_at", "updated_at", "size_bytes", "text_coverage", "predicted_seconds",
+    "peak_rss_mb", "prompt_tokens", "output_tokens", "cached_tokens", "ocr_pages", "api_calls", "api_seconds",
+    "usage",
+)
+
+# Columns added after the first release, with their types; older databases are migrated on open
+ADDED_COLUMNS = {
+    "size_bytes": "INTEGER",
+    "text_coverage": "REAL",
+    "predicted_seconds": "REAL",
+    "peak_rss_mb": "REAL",
+    "prompt_tokens": "INTEGER",
+    "output_tokens": "INTEGER",
+    "cached_tokens": "INTEGER",
+    "ocr_pages": "INTEGER",
+    "api_calls": "INTEGER",
+    "api_seconds": "REAL",
+    "usage": "TEXT",
+}
+
+# Columns the catalog can be sorted by
+SORTABLE_COLUMNS = ("updated_at", "original_name", "file_type", "page_count", "total_seconds", "peak_rss_mb",
+                    "prompt_tokens", "output_tokens")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    original_name TEXT,
+    file_type TEXT,
+    page_count INTEGER,
+    status TEXT,
+    source_path TEXT,
+    copy_path TEXT,
+    json_path TEXT,
+    confidence_path TEXT,
+    raw_paths TEXT,
+    parse_seconds REAL,
+    schema_seconds REAL,
+    final_seconds REAL,
+    total_seconds REAL,
+    created_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_updated_at ON documents (updated_at);
+CREATE INDEX IF NOT EXISTS idx_documents_original_name ON documents (original_name);
+CREATE INDEX IF NOT EXISTS idx_documents_file_type ON documents (file_type, updated_at);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents (status, updated_at);
+"""
+
+
+class DocumentCatalog:
+    """
+    Persistent index of processed documents, their output paths and timings
+
+    Each call opens its own short-lived connection, so a catalog can be shared
+    between threads and processes.
+    """
+
+    def __init__(self, db_path: str, journal_mode: str = "WAL"):
+        """
+        Initialize the catalog, creating the database if necessary
+
+        Args:
+            db_path: Path to the SQLite database file
+            journal_mode: SQLite journal mode; "DELETE" (the rollback journal) for a
+                database on storage shared between hosts, where WAL does not work
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            conn.executescript(SCHEMA_SQL)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(documents)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE documents ADD COLUMN {column} {column_type}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, doc_id: str, **fields: Any) -> None:
+        """
+        Insert a document or update the given fields of an existing one
+
+        Args:
+            doc_id: Document ID (the base filename of its outputs)
+            **fields: Column values to set; raw_paths and usage may be given as dictionaries
+        """
+        unknown = set(fields) - set(CATALOG_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown catalog columns: {', '.join(sorted(unknown))}")
+
+        for column in ("raw_paths", "usage"):
+            if isinstance(fields.get(column), dict):
+                fields[column] = json.dumps(fields[column])
+
+        now = time.time()
+        fields["updated_at"] = now
+        columns = ["doc_id", "created_at"] + list(fields)
+        values = [doc_id, now] + list(fields.values())
+        updates = ", ".join(f"{column} = excluded.{column}" for column in fields)
+
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO documents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (doc_id) DO UPDATE SET {updates}",
+                values
+            )
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a single document
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            Dictionary of column values, or None if the document is not in the catalog
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def count(self, name_filter: Optional[str] = None, file_type: Optional[str] = None,
+              status: Optional[str] = None) -> int:
+        """
+        Count the documents matching the filters
+
+        Args:
+            name_filter: Case-insensitive substring of the original name or document ID
+            file_type: File type ("pdf" or "docx")
+            status: Document status, such as "completed"
+
+        Returns:
+            Number of matching documents
+        """
+        where, params = self._where(name_filter, file_type, status)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM documents {where}", params).fetchone()[0]
+
+    def list(self, offset: int = 0, limit: int = 25, sort_by: str = "updated_at", descending: bool = True,
+             name_filter: Optional[str] = None, file_type: Optional[str] = None,
+             status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return one page of documents
+
+        Args:
+            offset: Number of matching documents to skip
+            limit: Maximum number of documents to return
+            sort_by: Column to sort by (one of SORTABLE_COLUMNS)
+            descending: Whether to sort in descending order
+            name_filter: Case-insensitive substring of the original name or document ID
+            file_type: File type ("pdf" or "docx")
+            status: Document status, such as "completed"
+
+        Returns:
+            List of documents as dictionaries
+        """
+        if sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by}. Choose one of: {', '.join(SORTABLE_COLUMNS)}")
+
+        where, params = self._where(name_filter, file_type, status)
+        order = "DESC" if descending else "ASC"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM documents {where} ORDER BY {sort_by} {order}, doc_id LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def doc_ids(self, status: Optional[str] = "completed") -> List[str]:
+        """
+        Return the IDs of the documents with a status
+
+        Args:
+            status: Document status, or None for all documents
+
+        Returns:
+            Document IDs, oldest first
+        """
+        with self._connect() as conn:
+            if status is None:
+                rows = conn.execute("SELECT doc_id FROM documents ORDER BY created_at").fetchall()
+            else:
+                rows = conn.execute("SELECT doc_id FROM documents WHERE status = ? ORDER BY created_at",
+                                    (status,)).fetchall()
+        return [row["doc_id"] for row in rows]
+
+    def timings(self, limit: int = 2000) -> List[Dict[str, Any]]:
+        """
+        Return the features and processing times of the most recently completed documents
+
+        Args:
+            limit: Maximum number of documents to return
+
+        Returns:
+            List of dictionaries with file_type, size_bytes, page_count, text_coverage,
+            predicted_seconds and total_seconds
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT file_type, size_bytes, page_count, text_coverage, predicted_seconds, total_seconds "
+                "FROM documents WHERE status = 'completed' AND total_seconds IS NOT NULL "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def rebuild_from_directory(self, output_dir: str) -> int:
+        """
+        Add documents found in an output directory that are missing from the catalog
+
+        Args:
+            output_dir: Output directory of a DocumentProcessor
+
+        Returns:
+            Number of documents added
+        """
+        json_dir = os.path.join(output_dir, "json_outputs")
+        if not os.path.isdir(json_dir):
+            return 0
+
+        added = 0
+        with os.scandir(json_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                doc_id = entry.name[:-len(".json")]
+                if self.get(doc_id):
+                    continue
+
+                fields = {"original_name": doc_id, "status": "completed", "json_path": entry.path}
+                for file_type, copy_dir in (("pdf", "pdf_copies"), ("docx", "docx_copies")):
+                    copy_path = os.path.join(output_dir, copy_dir, f"{doc_id}.{file_type}")
+                    if os.path.exists(copy_path):
+                        fields.update(file_type=file_type, copy_path=copy_path,
+                                      original_name=f"{doc_id}.{file_type}")
+                        break
+                confidence_path = os.path.join(output_dir, "confidence_scores", f"{doc_id}_confidence.json")
+                if os.path.exists(confidence_path):
+                    fields["confidence_path"] = confidence_path
+
+                self.upsert(doc_id, **fields)
+                added += 1
+
+        return added
+
+    @staticmethod
+    def _where(name_filter: Optional[str], file_type: Optional[str], status: Optional[str]):
+        clauses, params = [], []
+        if name_filter:
+            clauses.append("(original_name LIKE ? ESCAPE '\\' OR doc_id LIKE ? ESCAPE '\\')")
+            pattern = "%" + name_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params.extend([pattern, pattern])
+        if file_type:
+            clauses.append("file_type = ?")
+            params.append(file_type)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        document = dict(row)
+        for column in ("raw_paths", "usage"):
+            if document.get(column):
+                document[column] = json.loads(document[column])
+        return document
@@ -0,0 +1,205 @@
+"""
+Circuit breakers that stop calling a remote service while it is failing
+"""
+
+import time
+import threading
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# Circuit states
+CLOSED = "closed"        # Calls go through
+OPEN = "open"            # Calls fail immediately until the reset timeout has passed
+HALF_OPEN = "half_open"  # One trial call decides whether the circuit closes again
+
+# Consecutive failures that open a circuit
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# Seconds a circuit stays open before a trial call; doubled after every failed trial
+DEFAULT_RESET_TIMEOUT = 60.0
+
+# Longest time a circuit stays open before a trial call
+MAX_RESET_TIMEOUT = 900.0
+
+# HTTP status of rate limiting; it and 5xx responses count as service failures
+TOO_MANY_REQUESTS = 429
+
+# Words in the class names of timeout, connection and availability errors raised by
+# client libraries (e.g. DeadlineExceeded, ServiceUnavailable, ConnectError, ReadTimeout)
+TRANSIENT_ERROR_NAMES = ("Timeout", "Deadline", "Connect", "Unavailable", "ServerError", "ResourceExhausted")
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Return whether an error means the service is failing, rather than the request
+
+    Timeouts, connection errors, rate limiting (429) and server errors (5xx) are
+    transient. Client and content errors, such as an invalid or oversized request or a
+    blocked answer, recur on every retry of the same request and say nothing about
+    the health of the service.
+
+    Args:
+        error: Exception raised by a call
+
+    Returns:
+        True if the error should count as a failure of the service
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(error, "status_code", None)
+    if isinstance(status, int) and not isinstance(status, bool):
+        return status == TOO_MANY_REQUESTS or 500 <= status < 600
+    return any(word in cls.__name__ for cls in type(error).__mro__ for word in TRANSIENT_ERROR_NAMES)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a service whose circuit is open
+    """
+
+    def __init__(self, breaker: "CircuitBreaker", retry_in: float):
+        super().__init__(f"{breaker.name} is unavailable (circuit open, next trial in {retry_in:.0f}s)")
+        self.breaker = breaker
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint of a remote service
+
+    After DEFAULT_FAILURE_THRESHOLD consecutive failures the circuit opens and calls fail
+    immediately with CircuitOpenError instead of spending retries and backoff on an
+    outage. Only transient errors (see is_transient_error) are failures: an error the
+    service answered with, such as an invalid request, shows that it is up. Once the reset timeout has passed, a single trial call is let through: if it
+    succeeds the circuit closes, otherwise it opens again for twice as long.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            name: Name of the service and endpoint, used in messages
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before the first trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_count = 0
+        self._state = CLOSED
+        self._open_seconds = reset_timeout
+        self._opened_until = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._opened_until:
+                return HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Return the seconds until the circuit lets a call through again (0 if it does now)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_until - time.monotonic())
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                now = time.monotonic()
+                if now < self._opened_until:
+                    raise CircuitOpenError(self, self._opened_until - now)
+                self._state = HALF_OPEN
+            if self._trial_running:
+                raise CircuitOpenError(self, 0.0)
+            self._trial_running = True
+
+    def _record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"{self.name} recovered, circuit closed")
+            self._state = CLOSED
+            self.failures = 0
+            self._open_seconds = self.reset_timeout
+            self._trial_running = False
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == OPEN:
+                return
+            if self._state == HALF_OPEN:
+                self._open_seconds = min(self._open_seconds * 2, MAX_RESET_TIMEOUT)
+            elif self.failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_until = time.monotonic() + self._open_seconds
+            self._trial_running = False
+            self.opened_count += 1
+            print(f"{self.name} failed {self.failures} time(s) in a row, circuit open for {self._open_seconds:.0f}s")
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        Call the service through the circuit
+
+        Args:
+            func: Function making the call
+
+        Returns:
+            Result of the call
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self._before_call()
+        try:
+            result = func()
+        except Exception as e:
+            if is_transient_error(e):
+                self._record_failure()
+            else:
+                # The service answered: the request, not the service, is at fault
+                self._record_success()
+            raise
+        self._record_success()
+        return result
+
+
+# Circuit breakers shared by every processor in the process, by service and endpoint
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(service: str, endpoint: str) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker of a service endpoint, creating it if necessary
+
+    Args:
+        service: Name of the remote service (e.g. "Gemini")
+        endpoint: Endpoint or model of the service
+
+    Returns:
+        The circuit breaker
+    """
+    name = f"{service} {endpoint}"
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def circuit_states() -> Dict[str, str]:
+    """Return the state of every circuit breaker created in this process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
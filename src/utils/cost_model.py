@@ -0,0 +1,268 @@
+"""
+Cost model that predicts how long a document takes to process
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .file_utils import get_docx_page_count
+
+# Number of PDF pages sampled to estimate text-layer coverage
+COVERAGE_SAMPLE_PAGES = 5
+
+# Pages assumed per byte when a document does not record its page count (about 50 KB per page)
+BYTES_PER_PAGE_ESTIMATE = 50 * 1024
+
+# Coefficients used before there is any history, per file type, for the features
+# [1, pages, pages without a text layer, megabytes]
+DEFAULT_COEFFICIENTS = {
+    "pdf": [20.0, 2.0, 3.0, 0.5],
+    "docx": [10.0, 0.5, 0.0, 0.2],
+}
+
+# Weight that keeps fitted coefficients close to the defaults when there is little history
+PRIOR_WEIGHT = 5.0
+
+# Number of most recent completed documents used to fit the model
+HISTORY_LIMIT = 2000
+
+# Shortest predicted processing time, in seconds
+MIN_PREDICTION = 1.0
+
+# Documents whose features a FeatureCache keeps
+FEATURE_CACHE_SIZE = 10000
+
+
+@dataclass
+class DocumentFeatures:
+    """
+    Cheap features of a document that drive its processing time
+    """
+    file_type: str
+    size_bytes: int
+    page_count: Optional[int] = None
+    text_coverage: float = 1.0
+
+    @property
+    def estimated_pages(self) -> int:
+        """Page count, estimated from the file size when the document does not record it"""
+        if self.page_count:
+            return self.page_count
+        return max(1, self.size_bytes // BYTES_PER_PAGE_ESTIMATE)
+
+    def vector(self) -> List[float]:
+        """Return the model's feature vector: [1, pages, pages without a text layer, megabytes]"""
+        pages = self.estimated_pages
+        return [1.0, float(pages), pages * (1.0 - self.text_coverage), self.size_bytes / (1024 * 1024)]
+
+
+def extract_features(path: str) -> DocumentFeatures:
+    """
+    Extract cost features from a PDF or DOCX file
+
+    For PDFs, a few evenly spaced pages are checked for a text layer; scanned pages
+    without one are much slower to OCR.
+
+    Args:
+        path: Path to the document
+
+    Returns:
+        Features of the document
+    """
+    size_bytes = os.path.getsize(path)
+
+    if not path.lower().endswith(".pdf"):
+        return DocumentFeatures("docx", size_bytes, get_docx_page_count(path))
+
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(path) as doc:
+            page_count = doc.page_count
+            if page_count == 0:
+                return DocumentFeatures("pdf", size_bytes, 0)
+            step = max(1, page_count // COVERAGE_SAMPLE_PAGES)
+            sampled = list(range(0, page_count, step))[:COVERAGE_SAMPLE_PAGES]
+            with_text = sum(1 for number in sampled if doc[number].get_text("text").strip())
+            return DocumentFeatures("pdf", size_bytes, page_count, with_text / len(sampled))
+    except Exception:
+        # Unreadable or PyMuPDF missing: fall back to the size alone
+        return DocumentFeatures("pdf", size_bytes)
+
+
+class FeatureCache:
+    """
+    Features of recently seen documents, so that scheduling a document and processing
+    it open the file only once
+
+    Entries are keyed by path and dropped when the file's size or modification time
+    changes; the least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = FEATURE_CACHE_SIZE):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of documents kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], DocumentFeatures]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> DocumentFeatures:
+        """
+        Return the features of a document, extracting them if they are not cached
+
+        Args:
+            path: Path to the document
+
+        Returns:
+            Features of the document
+        """
+        stat = os.stat(path)
+        key, version = os.path.abspath(path), (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        features = extract_features(path)
+        with self._lock:
+            self._entries[key] = (version, features)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return features
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small linear system with Gaussian elimination and partial pivoting"""
+    size = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(rows[r][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(column + 1, size):
+            factor = rows[row][column] / rows[column][column]
+            for k in range(column, size + 1):
+                rows[row][k] -= factor * rows[column][k]
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        solution[row] = (rows[row][size] - sum(rows[row][k] * solution[k] for k in range(row + 1, size))) / rows[row][row]
+    return solution
+
+
+class CostModel:
+    """
+    Linear model of processing time per file type, fitted to the catalog's history
+
+    The model is a ridge regression pulled towards DEFAULT_COEFFICIENTS, so it gives
+    sensible predictions with no history and follows the measurements as they accumulate.
+    """
+
+    def __init__(self, catalog=None):
+        """
+        Initialize the model
+
+        Args:
+            catalog: DocumentCatalog whose completed documents are used as history (optional)
+        """
+        self.catalog = catalog
+        self.coefficients: Dict[str, List[float]] = {k: v[:] for k, v in DEFAULT_COEFFICIENTS.items()}
+        self.samples: Dict[str, int] = dict.fromkeys(DEFAULT_COEFFICIENTS, 0)
+
+    def fit(self) -> "CostModel":
+        """
+        Refit the coefficients to the catalog's completed documents
+
+        Returns:
+            The model itself
+        """
+        if self.catalog is None:
+            return self
+
+        history: Dict[str, List[Tuple[List[float], float]]] = {file_type: [] for file_type in DEFAULT_COEFFICIENTS}
+        for row in self.catalog.timings(limit=HISTORY_LIMIT):
+            if row["file_type"] not in history or not row["size_bytes"]:
+                continue
+            features = DocumentFeatures(row["file_type"], row["size_bytes"], row["page_count"],
+                                        row["text_coverage"] if row["text_coverage"] is not None else 1.0)
+            history[row["file_type"]].append((features.vector(), row["total_seconds"]))
+
+        for file_type, samples in history.items():
+            self.samples[file_type] = len(samples)
+            if samples:
+                self.coefficients[file_type] = self._fit(samples, DEFAULT_COEFFICIENTS[file_type])
+        return self
+
+    @staticmethod
+    def _fit(samples: Sequence[Tuple[List[float], float]], prior: List[float]) -> List[float]:
+        """
+        Solve (XᵀX + λI) w = Xᵀy + λ w0 for the coefficients w, keeping them non-negative
+
+        A document never gets faster by having more pages, so coefficients that come out
+        negative are fixed at zero and the others are refitted without them.
+        """
+        free = list(range(len(prior)))
+        while True:
+            matrix = [[PRIOR_WEIGHT if i == j else 0.0 for j in free] for i in free]
+            vector = [PRIOR_WEIGHT * prior[i] for i in free]
+            for x, y in samples:
+                for row, i in enumerate(free):
+                    vector[row] += x[i] * y
+                    for column, j in enumerate(free):
+                        matrix[row][column] += x[i] * x[j]
+            solution = _solve(matrix, vector)
+
+            negative = [i for i, value in zip(free, solution) if value < 0]
+            if not negative:
+                coefficients = [0.0] * len(prior)
+                for i, value in zip(free, solution):
+                    coefficients[i] = value
+                return coefficients
+            free = [i for i in free if i not in negative]
+            if not free:
+                return [0.0] * len(prior)
+
+    def predict(self, features: DocumentFeatures) -> float:
+        """
+        Predict the processing time of a document
+
+        Args:
+            features: Features of the document
+
+        Returns:
+            Predicted processing time in seconds
+        """
+        coefficients = self.coefficients.get(features.file_type, DEFAULT_COEFFICIENTS["pdf"])
+        return max(MIN_PREDICTION, sum(c * x for c, x in zip(coefficients, features.vector())))
+
+
+def order_longest_first(paths: Sequence[str], model: CostModel,
+                        features_cache: Optional[FeatureCache] = None) -> List[Tuple[str, DocumentFeatures, float]]:
+    """
+    Order documents by predicted processing time, longest first
+
+    Starting the longest documents first keeps a single long document from stretching
+    the end of a batch that several workers share. It only shortens a batch whose
+    documents are processed concurrently.
+
+    Args:
+        paths: Paths of the documents
+        model: Cost model used for the predictions
+        features_cache: Cache to read and store the documents' features in (optional)
+
+    Returns:
+        List of (path, features, predicted seconds), longest first
+    """
+    scheduled = []
+    for path in paths:
+        features = features_cache.get(path) if features_cache is not None else extract_features(path)
+        scheduled.append((path, features, model.predict(features)))
+    scheduled.sort(key=lambda entry: entry[2], reverse=True)
+    return scheduled
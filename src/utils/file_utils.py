@@ -2,8 +2,21 @@
 File utility functions
 """
 
+import io
 import os
-from typing import List
+import mmap
+import uuid
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+# Namespace of the extended properties part (docProps/app.xml) of Office documents
+EXTENDED_PROPERTIES_NS = "http://schemas.openxmlformats.org/officeDocument/2006/extended-properties"
+
+# Supported input file types, by the leading bytes of their contents
+FILE_SIGNATURES = {"pdf": b"%PDF", "docx": b"PK\x03\x04"}
 
 
 def get_pdf_files(directory: str) -> List[str]:
@@ -31,3 +44,158 @@ def ensure_directory(directory: str) -> None:
         directory: Directory to ensure exists
     """
     os.makedirs(directory, exist_ok=True)
+
+
+def temporary_path(path: str) -> str:
+    """
+    Return a unique temporary path next to a file, to write it before renaming it into place
+
+    The name is unique across threads, processes and hosts sharing the directory.
+
+    Args:
+        path: Final path of the file
+
+    Returns:
+        Temporary path in the same directory
+    """
+    return f"{path}.{uuid.uuid4().hex}.tmp"
+
+
+def get_pdf_page_count(pdf_path: str) -> Optional[int]:
+    """
+    Get the number of pages in a PDF file
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Number of pages, or None if the file cannot be read
+    """
+    try:
+        import fitz  # PyMuPDF
+
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        return None
+
+
+def get_docx_page_count(docx_path: str) -> Optional[int]:
+    """
+    Get the page count Word recorded in a DOCX file's document properties
+
+    Args:
+        docx_path: Path to the DOCX file
+
+    Returns:
+        Number of pages, or None if the document does not record it
+    """
+    try:
+        with zipfile.ZipFile(docx_path) as docx:
+            app_xml = docx.read("docProps/app.xml")
+        pages = ET.fromstring(app_xml).find(f"{{{EXTENDED_PROPERTIES_NS}}}Pages")
+        return int(pages.text) if pages is not None and pages.text else None
+    except Exception:
+        return None
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file without reading it into memory at once
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detect_file_type(name: Optional[str] = None, path: Optional[str] = None,
+                     stream: Optional[BinaryIO] = None) -> str:
+    """
+    Determine whether an input is a PDF or a DOCX, from its file name or its contents
+
+    Args:
+        name: File name; its extension is used when it is .pdf or .docx
+        path: Path of the file, read when the name does not tell
+        stream: Seekable binary file object, read when the name does not tell and left
+            at its original position
+
+    Returns:
+        "pdf" or "docx"
+    """
+    extension = os.path.splitext(name or "")[1].lower().lstrip(".")
+    if extension in FILE_SIGNATURES:
+        return extension
+
+    head = b""
+    if path is not None:
+        with open(path, "rb") as f:
+            head = f.read(8)
+    elif stream is not None and stream.seekable():
+        position = stream.tell()
+        head = stream.read(8)
+        stream.seek(position)
+    for file_type, signature in FILE_SIGNATURES.items():
+        if head.startswith(signature):
+            return file_type
+    raise ValueError(f"Unsupported file type: {name or 'unnamed input'}. Only PDF and DOCX files are supported")
+
+
+class MappedFile(io.RawIOBase):
+    """
+    Read-only binary file object backed by a memory map
+
+    Pages are loaded by the operating system on demand and shared with the page
+    cache, so readers such as zipfile can work on large files without copying them
+    into the process.
+    """
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+
+@contextmanager
+def open_mapped(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a file for reading through a read-only memory map
+
+    Empty files, which cannot be mapped, are opened as regular files.
+
+    Args:
+        path: Path to the file
+
+    Yields:
+        Readable, seekable binary file object
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield io.BufferedReader(MappedFile(mapped))
@@ -0,0 +1,191 @@
+"""
+Hedged calls to remote APIs, to cut the tail latency of slow responses
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Default fraction of calls that may be duplicated by a hedge
+DEFAULT_HEDGE_BUDGET = 0.1
+
+# Latency percentile after which a call is hedged
+DEFAULT_HEDGE_PERCENTILE = 0.95
+
+# Number of recent latencies the percentile is computed over
+LATENCY_WINDOW = 200
+
+# Number of latencies needed before the percentile replaces the initial delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """
+    Raised when no attempt of a hedged call answered before its deadline
+    """
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies
+    """
+
+    def __init__(self, initial_delay: float, percentile: float = DEFAULT_HEDGE_PERCENTILE):
+        """
+        Initialize the tracker
+
+        Args:
+            initial_delay: Hedge delay in seconds until enough latencies have been recorded
+            percentile: Latency percentile used as the hedge delay
+        """
+        self.initial_delay = initial_delay
+        self.percentile = percentile
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def threshold(self) -> float:
+        """Return the latency after which a call is considered slow"""
+        with self._lock:
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return self.initial_delay
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+
+class Hedger:
+    """
+    Runs remote calls and sends a duplicate request when the first one is slow
+
+    A call that has not answered after the tracked latency percentile is hedged: a second
+    attempt starts, optionally on another client (e.g. another API key), and the first
+    answer wins. Hedges are limited to a fraction of all calls so they cannot multiply the
+    spend, and every call can have a deadline after which it fails with
+    CallDeadlineExceeded. The losing attempt is not cancelled, because the SDKs offer no
+    way to, but its answer is discarded.
+    """
+
+    def __init__(self, name: str, initial_delay: float, budget: float = DEFAULT_HEDGE_BUDGET,
+                 percentile: float = DEFAULT_HEDGE_PERCENTILE, deadline: Optional[float] = None):
+        """
+        Initialize the hedger
+
+        Args:
+            name: Name of the remote service, used in messages
+            initial_delay: Hedge delay in seconds until enough latencies have been recorded
+            budget: Fraction of calls that may be hedged (0 disables hedging)
+            percentile: Latency percentile after which a call is hedged
+            deadline: Seconds after which a call fails if no attempt has answered (optional)
+        """
+        self.name = name
+        self.initial_delay = initial_delay
+        self.budget = budget
+        self.percentile = percentile
+        self.deadline = deadline
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadlines_exceeded = 0
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, operation: str) -> LatencyTracker:
+        with self._lock:
+            if operation not in self._trackers:
+                self._trackers[operation] = LatencyTracker(self.initial_delay, self.percentile)
+            return self._trackers[operation]
+
+    def _try_hedge(self) -> bool:
+        """Count a hedge if the budget allows one more"""
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def call(self, operation: str, func: Callable[[], T], alternate: Optional[Callable[[], T]] = None) -> T:
+        """
+        Run a call, hedging it if it is slow
+
+        Args:
+            operation: Name of the operation; latencies are tracked per operation
+            func: Function making the call
+            alternate: Function making the hedged call (defaults to func)
+
+        Returns:
+            Result of the first attempt that succeeds
+
+        Raises:
+            CallDeadlineExceeded: If no attempt succeeded before the deadline
+            Exception: The error of the last attempt, if all attempts failed
+        """
+        tracker = self._tracker(operation)
+        with self._lock:
+            self.calls += 1
+
+        results: "queue.Queue" = queue.Queue()
+
+        def attempt(number: int, target: Callable[[], T]) -> None:
+            try:
+                results.put((number, True, target()))
+            except Exception as e:
+                results.put((number, False, e))
+
+        def start(number: int, target: Callable[[], T]) -> None:
+            threading.Thread(target=attempt, args=(number, target), name=f"{self.name}-{operation}-{number}",
+                             daemon=True).start()
+
+        started = time.monotonic()
+        hedge_at = started + tracker.threshold() if self.budget > 0 else None
+        deadline = started + self.deadline if self.deadline else None
+        start(0, func)
+        running = 1
+
+        while True:
+            wake_times = [t for t in (hedge_at, deadline) if t is not None]
+            timeout = max(0.0, min(wake_times) - time.monotonic()) if wake_times else None
+            try:
+                number, succeeded, value = results.get(timeout=timeout)
+            except queue.Empty:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    with self._lock:
+                        self.deadlines_exceeded += 1
+                    raise CallDeadlineExceeded(f"{self.name} {operation} call did not answer within {self.deadline:g}s")
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if self._try_hedge():
+                        print(f"{self.name} {operation} call slower than {now - started:.1f}s, sending a hedged request")
+                        start(1, alternate or func)
+                        running += 1
+                continue
+
+            running -= 1
+            if succeeded:
+                # The whole call's latency, so a slow first attempt still counts when a hedge wins
+                tracker.record(time.monotonic() - started)
+                if number == 1:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return value
+            if running == 0:
+                raise value
+
+    def stats(self) -> Dict[str, float]:
+        """Return the call, hedge and deadline counters, with the hedge and win rates"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "deadlines_exceeded": self.deadlines_exceeded,
+                "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+                "win_rate": self.hedge_wins / self.hedged if self.hedged else 0.0,
+            }
@@ -0,0 +1,54 @@
+"""
+HTML utility functions
+"""
+
+from html.parser import HTMLParser
+from typing import List
+
+# Elements that end a block of text (mirrors how mammoth separates paragraphs in raw text)
+BLOCK_TAGS = {
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "td", "th", "tr",
+    "table", "ul", "ol", "div", "blockquote", "pre",
+}
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Minimal HTML parser that collects text content, separating blocks with blank lines
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+
+    def _end_block(self) -> None:
+        if self.parts and not self.parts[-1].endswith("\n\n"):
+            self.parts.append("\n\n")
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "br":
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if data:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Convert HTML to plain text, one block element per paragraph
+
+    Args:
+        html: HTML content
+
+    Returns:
+        Plain text content with blocks separated by blank lines
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return "".join(extractor.parts)
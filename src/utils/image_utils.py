@@ -0,0 +1,165 @@
+"""
+Image utility functions for externalizing embedded images from HTML
+"""
+
+import os
+import re
+import base64
+import binascii
+import hashlib
+import struct
+from typing import Dict, Optional, Tuple
+
+from .file_utils import ensure_directory, temporary_path
+
+# Matches <img> tags whose src is an inline base64 data URI
+DATA_URI_IMG_PATTERN = re.compile(
+    r'<img\b[^>]*?\bsrc="data:(?P<content_type>[\w.+/-]+);base64,(?P<data>[^"]*)"[^>]*>',
+    re.IGNORECASE
+)
+ALT_PATTERN = re.compile(r'\balt="(?P<alt>[^"]*)"', re.IGNORECASE)
+
+# File extensions for common image content types
+IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/bmp": ".bmp",
+    "image/tiff": ".tiff",
+    "image/x-emf": ".emf",
+    "image/x-wmf": ".wmf",
+    "image/svg+xml": ".svg",
+}
+
+# Number of hex digits of the content hash used in placeholders
+PLACEHOLDER_HASH_LENGTH = 12
+
+
+class ImageStore:
+    """
+    Content-addressed store for images extracted from documents
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the image store
+
+        Args:
+            directory: Directory in which to store images
+        """
+        self.directory = directory
+        ensure_directory(self.directory)
+
+    def put(self, data: bytes, content_type: str) -> Tuple[str, str]:
+        """
+        Store an image, skipping the write if identical content is already stored
+
+        Args:
+            data: Image bytes
+            content_type: MIME type of the image
+
+        Returns:
+            Tuple containing:
+                - SHA-256 hex digest of the image
+                - Path to the stored image
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        extension = IMAGE_EXTENSIONS.get(content_type.lower(), ".bin")
+        path = os.path.join(self.directory, f"{digest}{extension}")
+
+        if not os.path.exists(path):
+            tmp_path = temporary_path(path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        return digest, path
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read the pixel dimensions from a PNG, GIF or JPEG header
+
+    Args:
+        data: Image bytes
+
+    Returns:
+        (width, height), or None if the format is not recognized
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+
+    if data[:2] == b"\xff\xd8":
+        # Walk the JPEG segments until a start-of-frame marker
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                offset += 2
+                continue
+            segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + segment_length
+
+    return None
+
+
+def externalize_images(html: str, store: ImageStore) -> Tuple[str, Dict[str, int]]:
+    """
+    Move inline base64 images out of HTML into an image store
+
+    Each embedded image is written to the store and its <img> tag is replaced by a short
+    placeholder that keeps the alt text and pixel dimensions, e.g.
+    <img src="image:3f2a9c1b7d4e" alt="Company logo" width="120" height="40" />
+
+    Args:
+        html: HTML content, typically from mammoth
+        store: Image store to write the images to
+
+    Returns:
+        Tuple containing:
+            - HTML with placeholders instead of inline images
+            - Statistics with the image count and HTML sizes before and after, in bytes
+    """
+    image_count = 0
+
+    def replace(match: "re.Match") -> str:
+        nonlocal image_count
+        try:
+            data = base64.b64decode(match.group("data"), validate=False)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+
+        digest, _ = store.put(data, match.group("content_type"))
+        image_count += 1
+
+        attributes = [f'src="image:{digest[:PLACEHOLDER_HASH_LENGTH]}"']
+        alt_match = ALT_PATTERN.search(match.group(0))
+        if alt_match and alt_match.group("alt"):
+            # The alt text is already HTML-escaped in the source tag
+            attributes.append(f'alt="{alt_match.group("alt")}"')
+        dimensions = image_dimensions(data)
+        if dimensions:
+            attributes.append(f'width="{dimensions[0]}" height="{dimensions[1]}"')
+
+        return f"<img {' '.join(attributes)} />"
+
+    stripped_html = DATA_URI_IMG_PATTERN.sub(replace, html)
+
+    bytes_before = len(html.encode("utf-8"))
+    bytes_after = len(stripped_html.encode("utf-8"))
+    stats = {
+        "images": image_count,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+    }
+
+    return stripped_html, stats
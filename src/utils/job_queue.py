@@ -0,0 +1,223 @@
+"""
+Background job queue for running document processing off the caller's thread
+"""
+
+import time
+import uuid
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Job lanes: interactive jobs (e.g. UI uploads) always start before batch jobs
+INTERACTIVE = 0
+BATCH = 1
+
+# Names of the lanes, as used in job dictionaries
+LANE_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Type of the progress callback handed to job functions: (stage description, fraction complete)
+ProgressCallback = Callable[[str, float], None]
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted to a queue that has reached its capacity
+    """
+
+
+@dataclass
+class Job:
+    """
+    State of a single background job
+    """
+    id: str
+    name: str
+    status: str = QUEUED
+    stage: str = "Waiting in queue"
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    lane: int = BATCH
+    predicted_seconds: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished, successfully or not"""
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job state without its result"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "lane": LANE_NAMES[self.lane],
+            "predicted_seconds": self.predicted_seconds,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Bounded job queue backed by a shared pool of worker threads
+
+    Jobs are functions that take a progress callback as their first argument. Their
+    state is kept in the queue, so callers can poll it by job ID from any thread.
+
+    Waiting jobs start in lane order (interactive before batch) and, within a lane,
+    longest predicted cost first. Workers can be reserved for the interactive lane so
+    an upload never waits behind a long batch.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 50, retention_seconds: float = 24 * 3600,
+                 interactive_workers: int = 0):
+        """
+        Initialize the job queue
+
+        Args:
+            max_workers: Maximum number of jobs running concurrently
+            max_pending: Maximum number of jobs queued or running at once
+            retention_seconds: How long finished jobs are kept before being discarded
+            interactive_workers: Number of the workers that only run interactive jobs
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._waiting: List[Tuple[int, float, int, str]] = []
+        self._tasks: Dict[str, Tuple[Callable[..., Any], tuple, dict]] = {}
+        self._sequence = itertools.count()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._work, args=(i < interactive_workers,), name=f"job-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, name: str, func: Callable[..., Any], *args, lane: int = BATCH,
+               cost: Optional[float] = None, **kwargs) -> Job:
+        """
+        Enqueue a job
+
+        Args:
+            name: Display name of the job
+            func: Function to run, called as func(progress_callback, *args, **kwargs)
+            *args: Positional arguments for the function
+            lane: INTERACTIVE or BATCH
+            cost: Predicted run time in seconds; longer jobs start first within a lane
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If the queue already holds max_pending unfinished jobs
+        """
+        with self._lock:
+            self._prune()
+            if self.pending_count() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} jobs pending)")
+
+            job = Job(id=uuid.uuid4().hex, name=name, lane=lane, predicted_seconds=cost)
+            self._jobs[job.id] = job
+            self._tasks[job.id] = (func, args, kwargs)
+            heapq.heappush(self._waiting, (lane, -(cost or 0.0), next(self._sequence), job.id))
+            self._available.notify_all()
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID, or None if it is unknown or has expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids: Optional[List[str]] = None) -> List[Job]:
+        """
+        Return jobs in submission order
+
+        Args:
+            job_ids: IDs of the jobs to return (all jobs if None); unknown IDs are skipped
+
+        Returns:
+            List of jobs
+        """
+        with self._lock:
+            if job_ids is None:
+                return list(self._jobs.values())
+            return [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+
+    def pending_count(self) -> int:
+        """Return the number of queued or running jobs"""
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once the waiting jobs have run, optionally waiting for them"""
+        with self._lock:
+            self._shutdown = True
+            self._available.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _work(self, interactive_only: bool) -> None:
+        """Worker thread loop: run the first waiting job this worker may take"""
+        while True:
+            with self._available:
+                while not self._can_take(interactive_only):
+                    if self._shutdown:
+                        return
+                    self._available.wait()
+                job_id = heapq.heappop(self._waiting)[3]
+                func, args, kwargs = self._tasks.pop(job_id)
+                job = self._jobs[job_id]
+            self._run(job, func, args, kwargs)
+
+    def _can_take(self, interactive_only: bool) -> bool:
+        """Whether a waiting job is available to a worker (caller holds the lock)"""
+        return bool(self._waiting) and (not interactive_only or self._waiting[0][0] == INTERACTIVE)
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        def report_progress(stage: str, fraction: float) -> None:
+            job.stage = stage
+            job.progress = max(0.0, min(1.0, fraction))
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        report_progress("Starting", 0.0)
+
+        try:
+            job.result = func(report_progress, *args, **kwargs)
+            job.status = SUCCEEDED
+            report_progress("Done", 1.0)
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            job.stage = "Failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than the retention period (caller holds the lock)"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
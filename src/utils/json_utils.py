@@ -2,6 +2,11 @@
 JSON utility functions
 """
 
+import json
+import itertools
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 
 def clean_json_string(json_str: str) -> str:
     """
@@ -35,3 +40,312 @@ def clean_json_string(json_str: str) -> str:
             json_str = json_str[square_bracket_index:]
     
     return json_str
+
+
+class JSONRepairError(ValueError):
+    """Raised when no valid JSON can be extracted from a text, even after repair"""
+
+
+# Closing character of each opening bracket
+CLOSERS = {"{": "}", "[": "]"}
+
+# Python literals models sometimes write instead of their JSON equivalents
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+# Candidate start positions tried before giving up on a text
+MAX_CANDIDATES = 20
+
+# Cut points tried, from the end, when repairing truncated JSON
+MAX_TRUNCATION_CUTS = 50
+
+
+def _normalize(text: str, start: int) -> Tuple[str, List[str], bool, List[Tuple[int, List[str]]]]:
+    """
+    Scan a JSON value from an opening bracket, dropping what JSON does not allow
+
+    Comments and trailing commas are removed and Python literals replaced, outside
+    strings. Scanning stops after the bracket that closes the value, or at the end of
+    the text if the value is truncated.
+
+    Args:
+        text: Text containing the value
+        start: Index of the opening bracket
+
+    Returns:
+        Tuple containing:
+            - The normalized value text
+            - Closing brackets still open at the end (empty if the value is complete)
+            - Whether the text ends inside a string
+            - Cut points: (length of the normalized text, open brackets) at which the
+              value can be truncated and closed to leave only complete elements: after
+              an opening bracket, before a comma, and after a closed string or bracket
+    """
+    # Characters of the normalized value, one per item
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, List[str]]] = []
+    in_string = escaped = False
+    i, n = start, len(text)
+    while i < n:
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                cuts.append((len(out), list(stack)))
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+            out.append(char)
+            cuts.append((len(out), list(stack)))
+            i += 1
+            continue
+        elif char in "}]":
+            # Drop a trailing comma before the closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack or stack[-1] != char:
+                break
+            stack.pop()
+            out.append(char)
+            i += 1
+            if not stack:
+                break
+            cuts.append((len(out), list(stack)))
+            continue
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = n if newline < 0 else newline
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        elif char.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.extend(PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out), stack, in_string, cuts
+
+
+def _close(value: str, stack: List[str]) -> str:
+    """Strip a dangling separator from truncated JSON and close its open brackets"""
+    value = value.rstrip()
+    if value.endswith(","):
+        value = value[:-1]
+    return value + "".join(reversed(stack))
+
+
+def _repair(text: str, start: int, expect: Tuple[type, ...]) -> Tuple[Optional[Tuple[str, Any]], bool]:
+    """
+    Repair the JSON value starting at an opening bracket
+
+    Returns:
+        Tuple containing:
+            - (JSON text, parsed value), or None if the value could not be repaired
+            - Whether the value was truncated, i.e. runs to the end of the text
+    """
+    value, stack, in_string, cuts = _normalize(text, start)
+    attempts = []
+    if not stack:
+        attempts.append(value)
+    else:
+        # Truncated: the last value may be cut short (a string or number that stops
+        # early), so drop it and close the value after its last complete element
+        for length, open_stack in reversed(cuts[-MAX_TRUNCATION_CUTS:]):
+            attempts.append(_close(value[:length], open_stack))
+    for attempt in attempts:
+        try:
+            parsed = json.loads(attempt)
+        except ValueError:
+            continue
+        if isinstance(parsed, expect):
+            return (attempt, parsed), bool(stack)
+    return None, bool(stack)
+
+
+def extract_json(text: str, expect: Tuple[type, ...] = (dict, list), allow_truncated: bool = True) -> Tuple[str, bool]:
+    """
+    Extract the first JSON object or array from a model response, repairing it if needed
+
+    Code fences and surrounding prose are ignored. Values that do not parse are
+    repaired locally: comments, trailing commas and Python literals (True, False, None)
+    are fixed, and truncated output is cut back to its last complete element and
+    closed. Valid JSON is returned unchanged; repaired JSON is re-serialized.
+
+    Cutting back truncated output drops the values it stopped in, so callers whose
+    output must be complete pass allow_truncated=False: truncated output, and repairs
+    that leave an empty value, are then rejected instead.
+
+    Args:
+        text: Model response
+        expect: Accepted types of the value, (dict,) to only accept objects
+        allow_truncated: Whether truncated output may be cut back to its complete elements
+
+    Returns:
+        Tuple containing:
+            - The JSON text
+            - Whether it had to be repaired
+
+    Raises:
+        JSONRepairError: If the text contains no JSON value of the expected type that can be repaired
+    """
+    openers = "".join(opener for opener, kind in (("{", dict), ("[", list)) if kind in expect)
+    decoder = json.JSONDecoder()
+    starts = (i for i, char in enumerate(text) if char in openers)
+    for start in itertools.islice(starts, MAX_CANDIDATES):
+        try:
+            parsed, end = decoder.raw_decode(text, start)
+            if isinstance(parsed, expect):
+                return text[start:end], False
+        except ValueError:
+            pass
+
+        repaired, truncated = _repair(text, start, expect)
+        # Without allow_truncated, only repairs that kept every value are accepted
+        if repaired is not None and (allow_truncated or (not truncated and repaired[1])):
+            return json.dumps(repaired[1], indent=2, ensure_ascii=False), True
+        if truncated:
+            if not allow_truncated:
+                raise JSONRepairError(f"Truncated JSON in the response: {text[-200:]!r}")
+            # Every later candidate is nested inside this value; returning one would drop the rest
+            break
+
+    raise JSONRepairError(f"No valid JSON found in the response: {text[:200]!r}")
+
+
+class JSONExtractionStats:
+    """
+    Thread-safe counters of JSON extracted from model responses
+
+    Every response is counted once as valid (parsed as-is), repaired (fixed locally,
+    saving a model round trip) or invalid (a new response is needed).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"valid": 0, "repaired": 0, "invalid": 0}
+
+    def extract(self, text: str, expect: Tuple[type, ...] = (dict, list), allow_truncated: bool = True) -> str:
+        """
+        Extract the JSON of a response with extract_json() and count the outcome
+
+        Args:
+            text: Model response
+            expect: Accepted types of the value (see extract_json)
+            allow_truncated: Whether truncated output may be cut back (see extract_json)
+
+        Returns:
+            The JSON text
+
+        Raises:
+            JSONRepairError: If the response contains no repairable JSON
+        """
+        try:
+            value, repaired = extract_json(text, expect, allow_truncated)
+        except JSONRepairError:
+            self._record("invalid")
+            raise
+        self._record("repaired" if repaired else "valid")
+        if repaired:
+            print("Repaired invalid JSON in the model response locally instead of retrying")
+        return value
+
+    def _record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the counters
+
+        Returns:
+            Dictionary with responses, valid, repaired, invalid and retries_saved (the
+            model round trips avoided by repairs)
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["responses"] = sum(counts.values())
+        counts["retries_saved"] = counts["repaired"]
+        return counts
+
+
+def escape_pointer_token(token) -> str:
+    """
+    Escape a key for use in a JSON pointer (RFC 6901)
+
+    Args:
+        token: Object key or array index
+
+    Returns:
+        Escaped pointer token
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def iter_json_pointers(data: Any, pointer: str = "") -> Iterator[Tuple[str, Any]]:
+    """
+    Walk a JSON value depth-first, yielding every node with its JSON pointer
+
+    Args:
+        data: Parsed JSON value
+        pointer: JSON pointer of the value ("" for the document root)
+
+    Yields:
+        Tuples of (JSON pointer, value), containers before their children
+    """
+    stack = [(pointer, data)]
+    while stack:
+        current_pointer, value = stack.pop()
+        yield current_pointer, value
+        if isinstance(value, dict):
+            children = [(f"{current_pointer}/{escape_pointer_token(k)}", v) for k, v in value.items()]
+        elif isinstance(value, list):
+            children = [(f"{current_pointer}/{i}", v) for i, v in enumerate(value)]
+        else:
+            continue
+        stack.extend(reversed(children))
+
+
+def resolve_json_pointer(data: Any, pointer: str) -> Any:
+    """
+    Return the value a JSON pointer refers to
+
+    Args:
+        data: Parsed JSON value
+        pointer: JSON pointer ("" for the document root)
+
+    Returns:
+        The referenced value
+
+    Raises:
+        KeyError: If the pointer does not resolve
+    """
+    value = data
+    if not pointer:
+        return value
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        try:
+            value = value[int(token)] if isinstance(value, list) else value[token]
+        except (IndexError, ValueError, KeyError, TypeError):
+            raise KeyError(pointer)
+    return value
@@ -0,0 +1,72 @@
+"""
+Process memory utilities
+"""
+
+import os
+from typing import Optional
+
+
+def _read_status_kb(field: str, pid: Optional[int] = None) -> Optional[float]:
+    """Read a memory field of /proc/<pid>/status in kilobytes, or None where it is unavailable"""
+    path = f"/proc/{pid or 'self'}/status"
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return float(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def current_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Return the resident set size of a process
+
+    Args:
+        pid: Process ID (defaults to the current process)
+
+    Returns:
+        Resident memory in megabytes, or None on platforms without /proc
+    """
+    kb = _read_status_kb("VmRSS", pid)
+    return kb / 1024 if kb is not None else None
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Return the peak resident set size of a process since it started or since reset_peak_rss()
+
+    Args:
+        pid: Process ID (defaults to the current process)
+
+    Returns:
+        Peak resident memory in megabytes, or None where it is unavailable
+    """
+    kb = _read_status_kb("VmHWM", pid)
+    if kb is not None:
+        return kb / 1024
+    if pid is not None:
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if os.uname().sysname == "Darwin" else maxrss / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak resident set size of the current process to its current size
+
+    Returns:
+        True if the peak was reset (Linux only), False otherwise
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
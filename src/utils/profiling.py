@@ -0,0 +1,404 @@
+"""
+Profiling of document processing: sampled stacks, cProfile and tracemalloc per stage
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Union
+
+# Profiling modes: stack sampling (low overhead), deterministic cProfile, tracemalloc snapshots
+SAMPLE, CPROFILE, MEMORY = "sample", "cprofile", "memory"
+PROFILE_MODES = (SAMPLE, CPROFILE, MEMORY)
+
+# Modes used when profiling is enabled without naming any
+DEFAULT_PROFILE_MODES = (SAMPLE,)
+
+# Seconds between stack samples
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+# Entries in the cProfile and allocation reports
+DEFAULT_TOP = 25
+
+# Whether tracemalloc peaks can be reset per stage (Python 3.9+); otherwise no stage peak is reported
+CAN_RESET_TRACED_PEAK = hasattr(tracemalloc, "reset_peak")
+
+# Stage of a document before its first stage starts (hashing, copying, feature extraction)
+SETUP_STAGE = "setup"
+
+
+def parse_profile_modes(value: str) -> List[str]:
+    """
+    Parse a comma-separated list of profiling modes
+
+    Args:
+        value: Modes, e.g. "sample,memory"
+
+    Returns:
+        List of modes
+
+    Raises:
+        ValueError: If a mode is unknown or none is given
+    """
+    modes = [mode.strip().lower() for mode in value.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in PROFILE_MODES]
+    if unknown or not modes:
+        raise ValueError(f"Unknown profiling mode: {', '.join(unknown) or value!r}. "
+                         f"Choose from: {', '.join(PROFILE_MODES)}")
+    return modes
+
+
+def collapse_stack(frame) -> str:
+    """
+    Return a stack in the collapsed format of flame graph tools, outermost frame first
+
+    Args:
+        frame: Innermost frame of the stack
+
+    Returns:
+        Frames as "function (file:line)" joined by semicolons
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _StackSampler:
+    """
+    Background thread that samples the stacks of the threads processing profiled documents
+
+    Only registered threads are sampled, so idle threads cost nothing, and the interval
+    bounds the overhead whatever the code being profiled does.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets: Dict[int, "DocumentProfile"] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, thread_id: int, profile: "DocumentProfile") -> None:
+        with self._lock:
+            self._targets[thread_id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def unregister(self, thread_id: int) -> None:
+        with self._lock:
+            self._targets.pop(thread_id, None)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                targets = dict(self._targets)
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for thread_id, profile in targets.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.add_sample(collapse_stack(frame))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class NullProfile:
+    """Profile of a document that is not profiled"""
+
+    def stage(self, name: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+class DocumentProfile:
+    """
+    Profile of one document, split into the stages of its processing
+
+    Created by Profiler.document(). Call stage() when a stage starts and close() when the
+    document is done; the reports are written to a directory named after the document.
+    Only the thread processing the document is profiled: parsers running in worker
+    processes (isolate_parsers) and the threads of hedged API calls are not.
+    """
+
+    def __init__(self, profiler: "Profiler", doc_id: str):
+        self.profiler = profiler
+        self.doc_id = doc_id
+        self.modes = profiler.modes
+        self.thread_id = threading.get_ident()
+        self.current_stage: Optional[str] = None
+        self.samples: Counter = Counter()
+        self.stage_seconds: Dict[str, float] = {}
+        self.cpu_profiles: Dict[str, cProfile.Profile] = {}
+        self.allocations: Dict[str, List[tracemalloc.StatisticDiff]] = {}
+        self.peak_memory: Dict[str, int] = {}
+        self._stage_start = 0.0
+        self._cpu: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+        # Only one deterministic profiler can run at a time; other documents go without
+        self._cprofile = CPROFILE in self.modes and profiler._cprofile_lock.acquire(blocking=False)
+        self._memory = MEMORY in self.modes
+        if self._memory:
+            profiler._start_tracemalloc()
+        if SAMPLE in self.modes:
+            profiler._sampler.register(self.thread_id, self)
+        self.stage(SETUP_STAGE)
+
+    def add_sample(self, stack: str) -> None:
+        """Count a sampled stack under the current stage"""
+        with self._lock:
+            self.samples[f"{self.current_stage};{stack}"] += 1
+
+    def stage(self, name: str) -> None:
+        """
+        End the current stage and start the next one
+
+        Args:
+            name: Stage name, e.g. "parse", "schema" or "final"
+        """
+        self._end_stage()
+        with self._lock:
+            self.current_stage = name
+        self._stage_start = time.perf_counter()
+        if self._memory:
+            if CAN_RESET_TRACED_PEAK:
+                tracemalloc.reset_peak()
+            self._snapshot = self.profiler._take_snapshot()
+        if self._cprofile:
+            self._cpu = self.cpu_profiles.setdefault(name, cProfile.Profile())
+            try:
+                self._cpu.enable()
+            except ValueError as e:
+                # Another profiler is active in this thread (or process, on Python 3.12+)
+                print(f"Warning: cProfile disabled for {self.doc_id}: {str(e)}")
+                self._cpu = None
+                self.cpu_profiles.pop(name)
+                self._cprofile = False
+                self.profiler._cprofile_lock.release()
+
+    def _end_stage(self) -> None:
+        if self.current_stage is None:
+            return
+        if self._cpu is not None:
+            self._cpu.disable()
+            self._cpu = None
+        stage = self.current_stage
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - self._stage_start
+        if self._snapshot is not None:
+            if CAN_RESET_TRACED_PEAK:
+                self.peak_memory[stage] = tracemalloc.get_traced_memory()[1]
+            snapshot = self.profiler._take_snapshot()
+            self.allocations[stage] = snapshot.compare_to(self._snapshot, "lineno")[:self.profiler.top]
+            self._snapshot = None
+
+    def close(self) -> None:
+        """End the last stage, stop profiling the document and write its reports"""
+        self._end_stage()
+        if SAMPLE in self.modes:
+            self.profiler._sampler.unregister(self.thread_id)
+        if self._memory:
+            self.profiler._stop_tracemalloc()
+        if self._cprofile:
+            self.profiler._cprofile_lock.release()
+        self.profiler._finish(self)
+
+    def write(self, directory: str) -> List[str]:
+        """
+        Write the document's reports
+
+        Args:
+            directory: Directory to write to, created if necessary
+
+        Returns:
+            Paths of the files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        written = []
+
+        if self.samples:
+            path = os.path.join(directory, "stacks.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f"{stack} {count}\n")
+            written.append(path)
+
+        if self.cpu_profiles:
+            report = io.StringIO()
+            for stage, profile in self.cpu_profiles.items():
+                profile.dump_stats(os.path.join(directory, f"{stage}.prof"))
+                written.append(os.path.join(directory, f"{stage}.prof"))
+                report.write(f"=== {stage} ({self.stage_seconds.get(stage, 0.0):.2f}s) ===\n")
+                pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(self.profiler.top)
+            path = os.path.join(directory, "cpu.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(report.getvalue())
+            written.append(path)
+
+        if self.allocations:
+            path = os.path.join(directory, "memory.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                for stage, statistics in self.allocations.items():
+                    peak = (f", peak traced {self.peak_memory[stage] / 2**20:.1f} MB"
+                            if stage in self.peak_memory else "")
+                    f.write(f"=== {stage} ({self.stage_seconds.get(stage, 0.0):.2f}s{peak}) ===\n")
+                    f.write(f"Top {len(statistics)} allocation sites by growth during the stage:\n")
+                    for statistic in statistics:
+                        f.write(f"{statistic}\n")
+                    f.write("\n")
+            written.append(path)
+        return written
+
+
+class Profiler:
+    """
+    Profiles a sample of the documents a processor handles
+
+    Each profiled document gets a directory under output_dir with:
+      - stacks.collapsed: sampled stacks prefixed with the stage, for flame graph tools
+        (flamegraph.pl, speedscope, inferno) (sample mode)
+      - <stage>.prof and cpu.txt: cProfile statistics per stage and the top functions by
+        cumulative time (cprofile mode)
+      - memory.txt: the top allocation sites per stage and the stage's peak traced memory
+        (memory mode); tracemalloc traces the whole process, so documents processed
+        concurrently show up in each other's reports
+    On close, the samples of all profiled documents are also written to
+    run-<timestamp>.collapsed.
+
+    Stack sampling adds a few percent of overhead to the profiled documents; with
+    sample_rate below 1, only that fraction of documents is profiled, so it can stay on
+    in production. cProfile and tracemalloc slow the profiled documents down noticeably.
+    """
+
+    def __init__(self, output_dir: str,
+                 modes: Sequence[str] = DEFAULT_PROFILE_MODES,
+                 sample_rate: float = 1.0,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 top: int = DEFAULT_TOP):
+        """
+        Initialize the profiler
+
+        Args:
+            output_dir: Directory the reports are written to
+            modes: Profiling modes (see PROFILE_MODES)
+            sample_rate: Fraction of documents profiled, between 0 and 1
+            interval: Seconds between stack samples
+            top: Entries in the cProfile and allocation reports
+        """
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown or not modes:
+            raise ValueError(f"Unknown profiling mode: {', '.join(sorted(unknown))}. Choose from: {', '.join(PROFILE_MODES)}")
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.output_dir = output_dir
+        self.modes = tuple(modes)
+        self.sample_rate = sample_rate
+        self.top = top
+        self.started_at = time.time()
+        self.documents = 0
+        self._samples: Counter = Counter()
+        self._sampler = _StackSampler(interval)
+        self._cprofile_lock = threading.Lock()
+        self._tracemalloc_users = 0
+        self._tracemalloc_started = False
+        self._lock = threading.Lock()
+
+    def document(self, doc_id: str) -> Union[DocumentProfile, NullProfile]:
+        """
+        Start profiling a document in the calling thread, if it is part of the sample
+
+        Args:
+            doc_id: Document ID, used as the name of its report directory
+
+        Returns:
+            The document's profile, or NULL_PROFILE if the document is not profiled
+        """
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return NULL_PROFILE
+        return DocumentProfile(self, doc_id)
+
+    def _start_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracemalloc_users += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracemalloc_started = True
+
+    def _stop_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracemalloc_users -= 1
+            # Leave tracing on if it was started by someone else
+            if self._tracemalloc_users == 0 and self._tracemalloc_started:
+                tracemalloc.stop()
+                self._tracemalloc_started = False
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Take a snapshot of traced allocations, leaving out those of tracemalloc and the profiler"""
+        return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                          tracemalloc.Filter(False, __file__)))
+
+    def _finish(self, profile: DocumentProfile) -> None:
+        """Write a document's reports and add its samples to the run's"""
+        with self._lock:
+            self.documents += 1
+            self._samples.update(profile.samples)
+        try:
+            written = profile.write(os.path.join(self.output_dir, profile.doc_id))
+        except OSError as e:
+            print(f"Warning: Could not write the profile of {profile.doc_id}: {str(e)}")
+            return
+        if written:
+            print(f"  - Profile written to {os.path.dirname(written[0])}")
+
+    def close(self) -> Optional[str]:
+        """
+        Stop sampling and write the samples of all profiled documents
+
+        Returns:
+            Path of the run's collapsed stacks, or None if nothing was sampled
+        """
+        self._sampler.stop()
+        with self._lock:
+            samples = dict(self._samples)
+        if not samples:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(self.output_dir, f"run-{stamp}.collapsed")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sorted(samples.items()):
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"Warning: Could not write the run profile: {str(e)}")
+            return None
+        return path
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
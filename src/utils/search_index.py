@@ -0,0 +1,265 @@
+"""
+SQLite FTS5 full-text index of processed documents
+"""
+
+import re
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Source name of the entries made from the final JSON; raw outputs use their parser name
+FINAL_SOURCE = "final"
+
+SCHEMA_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    text,
+    doc_id UNINDEXED,
+    source UNINDEXED,
+    path UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS indexed_documents (
+    doc_id TEXT PRIMARY KEY,
+    first_rowid INTEGER,
+    last_rowid INTEGER,
+    indexed_at REAL
+);
+"""
+
+# Suffix that turns a search term into a prefix query
+PREFIX_SUFFIX = "*"
+
+# Queries matching more entries than this return the newest matches instead of the best
+# ranked ones: ranking scores every match, which takes seconds for common words in
+# millions of documents, while newest-first stops after the first page
+RANK_LIMIT = 5000
+
+
+def iter_json_leaves(value: Any, path: str = "$") -> Iterator[Tuple[str, str]]:
+    """
+    Iterate over the scalar values of a JSON document with their JSON paths
+
+    Args:
+        value: Parsed JSON value
+        path: JSON path of the value
+
+    Yields:
+        Tuples of (JSON path, value as text), e.g. ("$.items[0].part_number", "X-100");
+        null and empty values are skipped
+    """
+    if isinstance(value, dict):
+        for key, child in value.items():
+            key = str(key)
+            child_path = f"{path}.{key}" if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", key) else f"{path}[{json.dumps(key)}]"
+            yield from iter_json_leaves(child, child_path)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from iter_json_leaves(child, f"{path}[{index}]")
+    elif value is not None and value != "":
+        yield path, json.dumps(value) if isinstance(value, bool) else str(value)
+
+
+def to_match_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching entries that contain every term
+
+    Each whitespace-separated term is quoted, so punctuation such as "PO-1234" or
+    "A/B" is searched literally instead of being read as query syntax. A term ending
+    in * matches words starting with it.
+
+    Args:
+        text: Search text
+
+    Returns:
+        FTS5 MATCH expression, empty if the text has no terms
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith(PREFIX_SUFFIX) and len(term) > 1
+        term = term.rstrip(PREFIX_SUFFIX)
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + (PREFIX_SUFFIX if prefix else ""))
+    return " AND ".join(terms)
+
+
+class SearchIndex:
+    """
+    Full-text index over the final JSON values and raw parser outputs of documents
+
+    Each leaf value of a document's final JSON is one entry, with its JSON path, and
+    each raw parser output is one entry. A document's entries are written in one
+    transaction with consecutive row IDs, so re-indexing a document deletes its old
+    entries by row ID range without scanning the index.
+
+    Each call opens its own short-lived connection, so an index can be shared between
+    threads and processes.
+    """
+
+    def __init__(self, db_path: str, journal_mode: str = "WAL"):
+        """
+        Initialize the index, creating the database if necessary
+
+        Args:
+            db_path: Path to the SQLite database file
+            journal_mode: SQLite journal mode; "DELETE" (the rollback journal) for a
+                database on storage shared between hosts, where WAL does not work
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            conn.executescript(SCHEMA_SQL)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, doc_id: str) -> None:
+        """Delete the entries of a document inside the caller's transaction"""
+        row = conn.execute("SELECT first_rowid, last_rowid FROM indexed_documents WHERE doc_id = ?",
+                           (doc_id,)).fetchone()
+        if row is None:
+            return
+        if row["first_rowid"] is not None:
+            conn.execute("DELETE FROM entries WHERE rowid BETWEEN ? AND ?", (row["first_rowid"], row["last_rowid"]))
+        conn.execute("DELETE FROM indexed_documents WHERE doc_id = ?", (doc_id,))
+
+    def index_document(self, doc_id: str, final_json: Optional[str] = None,
+                       raw_outputs: Optional[Dict[str, str]] = None) -> int:
+        """
+        Index a document, replacing its previous entries
+
+        Args:
+            doc_id: Document ID
+            final_json: Final structured JSON; invalid JSON is indexed as a single entry
+            raw_outputs: Raw outputs by parser name
+
+        Returns:
+            Number of entries written
+        """
+        return self.index_documents([(doc_id, final_json, raw_outputs)])
+
+    def index_documents(self, documents: Iterable[Tuple[str, Optional[str], Optional[Dict[str, str]]]]) -> int:
+        """
+        Index several documents in one transaction, replacing their previous entries
+
+        Args:
+            documents: Tuples of (document ID, final JSON, raw outputs by parser name)
+
+        Returns:
+            Number of entries written
+        """
+        written = 0
+        with self._connect() as conn:
+            # Hold the write lock so each document's row IDs are consecutive
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for doc_id, final_json, raw_outputs in documents:
+                    self._delete(conn, doc_id)
+                    first_rowid = last_rowid = None
+                    for text, source, path in self._entries(final_json, raw_outputs):
+                        cursor = conn.execute("INSERT INTO entries (text, doc_id, source, path) VALUES (?, ?, ?, ?)",
+                                              (text, doc_id, source, path))
+                        first_rowid = first_rowid if first_rowid is not None else cursor.lastrowid
+                        last_rowid = cursor.lastrowid
+                        written += 1
+                    conn.execute("INSERT INTO indexed_documents (doc_id, first_rowid, last_rowid, indexed_at) "
+                                 "VALUES (?, ?, ?, ?)", (doc_id, first_rowid, last_rowid, time.time()))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return written
+
+    @staticmethod
+    def _entries(final_json: Optional[str], raw_outputs: Optional[Dict[str, str]]) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """Yield the (text, source, path) entries of a document"""
+        if final_json:
+            try:
+                parsed = json.loads(final_json)
+            except ValueError:
+                yield final_json, FINAL_SOURCE, None
+            else:
+                for path, text in iter_json_leaves(parsed):
+                    yield text, FINAL_SOURCE, path
+        for name, output in (raw_outputs or {}).items():
+            if output:
+                yield output, name, None
+
+    def remove(self, doc_id: str) -> None:
+        """
+        Remove a document from the index
+
+        Args:
+            doc_id: Document ID
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete(conn, doc_id)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def is_indexed(self, doc_id: str) -> bool:
+        """Return whether a document is in the index"""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM indexed_documents WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    def count(self) -> int:
+        """Return the number of indexed documents"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM indexed_documents").fetchone()[0]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, source: Optional[str] = None,
+               raw_query: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find the entries matching a query
+
+        Results are ranked by relevance (BM25) when the query matches at most RANK_LIMIT
+        entries, and otherwise listed newest first, so that common words stay fast.
+
+        Args:
+            query: Search text; every term must appear in an entry (see to_match_query)
+            limit: Maximum number of entries to return
+            offset: Number of matching entries to skip
+            source: Only search entries of this source ("final" or a parser name)
+            raw_query: Pass the query to FTS5 unchanged, for its full syntax (OR, NOT,
+                NEAR, column filters)
+
+        Returns:
+            List of dictionaries with doc_id, source, path (the JSON path of final JSON
+            values) and snippet (the matching text, with matches in [brackets])
+        """
+        match = query if raw_query else to_match_query(query)
+        if not match:
+            return []
+
+        where = "entries MATCH ?"
+        params: List[Any] = [match]
+        if source:
+            where += " AND source = ?"
+            params.append(source)
+
+        with self._connect() as conn:
+            try:
+                matches = conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM entries WHERE {where} LIMIT ?)",
+                                       params + [RANK_LIMIT + 1]).fetchone()[0]
+                order = "rank" if matches <= RANK_LIMIT else "rowid DESC"
+                rows = conn.execute(
+                    f"SELECT doc_id, source, path, snippet(entries, 0, '[', ']', '…', 16) AS snippet "
+                    f"FROM entries WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                    params + [limit, offset]
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query: {query} ({str(e)})") from e
+        return [dict(row) for row in rows]
@@ -0,0 +1,37 @@
+"""
+Signal handling utilities
+"""
+
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def drain_on_interrupt(stop_requested: threading.Event, message: str) -> Iterator[None]:
+    """
+    Turn the first SIGINT into a stop request while the block runs
+
+    A second SIGINT raises KeyboardInterrupt as usual. Signal handlers can only be
+    installed from the main thread; elsewhere the block runs with the default behavior.
+
+    Args:
+        stop_requested: Event set when the first SIGINT arrives
+        message: Message printed when the first SIGINT arrives
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def request_stop(signum, frame):
+        if stop_requested.is_set():
+            raise KeyboardInterrupt
+        stop_requested.set()
+        print(f"\n{message} Press Ctrl+C again to abort.")
+
+    previous_handler = signal.signal(signal.SIGINT, request_stop)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
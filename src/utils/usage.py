@@ -0,0 +1,182 @@
+"""
+Usage accounting of remote API calls: tokens, OCR pages, attempts and time
+"""
+
+import os
+import csv
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Counters of a processing step, e.g. the Gemini schema call or Mistral OCR
+USAGE_COUNTERS = ("prompt_tokens", "output_tokens", "cached_tokens", "ocr_pages", "api_calls", "api_seconds")
+
+# Usage of the steps of a document: step name -> counters
+Usage = Dict[str, Dict[str, float]]
+
+# File extensions a usage report can be exported to
+USAGE_REPORT_FORMATS = (".csv", ".json")
+
+# Documents a usage report keeps individually; the oldest are dropped from the per-document
+# view (but not from the totals) so a long-running service does not grow without bound
+MAX_REPORT_DOCUMENTS = 100000
+
+_local = threading.local()
+
+
+def reset_usage() -> None:
+    """Start recording the usage of a new document in this thread"""
+    _local.usage = {}
+
+
+def record_usage(step: str, **counters: float) -> None:
+    """
+    Add to the usage of a step of the document being processed in this thread
+
+    Calls made outside of a document (e.g. warmup) are not recorded.
+
+    Args:
+        step: Step name, e.g. "gemini_schema", "gemini_final" or "mistral_ocr"
+        **counters: Amounts to add, by counter name (one of USAGE_COUNTERS)
+    """
+    usage = getattr(_local, "usage", None)
+    if usage is None:
+        return
+    totals = usage.setdefault(step, dict.fromkeys(USAGE_COUNTERS, 0))
+    for name, amount in counters.items():
+        totals[name] += amount or 0
+
+
+def current_usage() -> Usage:
+    """Return a copy of the usage recorded for the current document in this thread"""
+    return {step: dict(counters) for step, counters in (getattr(_local, "usage", None) or {}).items()}
+
+
+def merge_usage(*usages: Optional[Usage]) -> Usage:
+    """
+    Add up the usage of several runs of a document, e.g. before and after a resume
+
+    Args:
+        *usages: Usage by step (None is ignored)
+
+    Returns:
+        Combined usage by step
+    """
+    merged: Usage = {}
+    for usage in usages:
+        for step, counters in (usage or {}).items():
+            totals = merged.setdefault(step, dict.fromkeys(USAGE_COUNTERS, 0))
+            for name in USAGE_COUNTERS:
+                totals[name] += counters.get(name, 0)
+    return merged
+
+
+def usage_totals(usage: Optional[Usage]) -> Dict[str, float]:
+    """Return the counters of all steps added up"""
+    totals = dict.fromkeys(USAGE_COUNTERS, 0)
+    for counters in (usage or {}).values():
+        for name in USAGE_COUNTERS:
+            totals[name] += counters.get(name, 0)
+    return totals
+
+
+class UsageReport:
+    """
+    Usage of the documents processed by a run, for the run summary and exports
+
+    Only the calls made by this run are counted; usage recorded by earlier runs of a
+    resumed document is in the catalog. A document processed again (e.g. a parked
+    document retried at the end of a run) adds to its entry and takes its latest status.
+    """
+
+    def __init__(self, max_documents: int = MAX_REPORT_DOCUMENTS):
+        """
+        Initialize the report
+
+        Args:
+            max_documents: Documents kept individually (see MAX_REPORT_DOCUMENTS)
+        """
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._steps: Usage = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: str, status: str, usage: Usage) -> None:
+        """
+        Record the usage of a document
+
+        Args:
+            doc_id: Document ID
+            status: Outcome ("completed", "failed" or "parked")
+            usage: Usage of the calls made for the document by step
+        """
+        with self._lock:
+            previous = self._documents.pop(doc_id, None)
+            self._documents[doc_id] = {"status": status, "usage": merge_usage(previous and previous["usage"], usage)}
+            if len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+            self._steps = merge_usage(self._steps, usage)
+
+    def documents(self) -> Dict[str, Dict[str, Any]]:
+        """Return the status, usage by step and totals of each document"""
+        with self._lock:
+            documents = dict(self._documents)
+        return {doc_id: dict(entry, totals=usage_totals(entry["usage"])) for doc_id, entry in documents.items()}
+
+    def steps(self) -> Usage:
+        """Return the usage of the run by step"""
+        with self._lock:
+            return merge_usage(self._steps)
+
+    def totals(self) -> Dict[str, float]:
+        """Return the usage of the run, all steps added up"""
+        return usage_totals(self.steps())
+
+    def top_documents(self, count: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the documents that used the most tokens
+
+        Args:
+            count: Number of documents
+
+        Returns:
+            List of dictionaries with doc_id, status and the document's totals, most tokens first
+        """
+        rows = [dict(entry["totals"], doc_id=doc_id, status=entry["status"])
+                for doc_id, entry in self.documents().items()]
+        rows.sort(key=lambda row: row["prompt_tokens"] + row["output_tokens"], reverse=True)
+        return rows[:count]
+
+    def export(self, path: str) -> None:
+        """
+        Write the usage of every document to a CSV or JSON file, by the file's extension
+
+        The CSV file has one row per document and step. The JSON file has the usage by
+        step of each document, and the run's usage by step and in total.
+
+        Args:
+            path: Output file path ending in .csv or .json
+
+        Raises:
+            ValueError: If the extension is neither .csv nor .json
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in USAGE_REPORT_FORMATS:
+            raise ValueError(f"Unsupported usage report format: {path}. Use a .csv or .json file")
+
+        documents = self.documents()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if extension == ".json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"documents": documents, "steps": self.steps(), "totals": self.totals()}, f, indent=2)
+            return
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("doc_id", "status", "step") + USAGE_COUNTERS)
+            for doc_id, entry in sorted(documents.items()):
+                for step, counters in sorted(entry["usage"].items()):
+                    writer.writerow([doc_id, entry["status"], step] + [round(counters.get(name, 0), 3) for name in USAGE_COUNTERS])
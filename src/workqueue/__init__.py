@@ -0,0 +1,3 @@
+"""
+Lease-based work queues that let several worker processes or hosts share one batch
+"""
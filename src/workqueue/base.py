@@ -0,0 +1,162 @@
+"""
+Base class for work queue backends
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Work item statuses
+PENDING = "pending"  # Waiting to be claimed
+LEASED = "leased"    # Claimed by a worker whose lease has not expired
+DONE = "done"        # Processed successfully
+FAILED = "failed"    # Failed on every allowed attempt
+
+WORK_STATUSES = (PENDING, LEASED, DONE, FAILED)
+
+# Times an item can be released without counting the attempt
+MAX_RELEASES = 5
+
+
+@dataclass
+class WorkItem:
+    """
+    A document in a work queue
+    """
+    id: int
+    path: str
+    doc_id: str
+    status: str
+    attempts: int = 0
+    worker: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class WorkQueue:
+    """
+    Interface of the work queues used by distributed workers
+
+    A worker claims an item, which leases it for a limited time. The worker renews the
+    lease with heartbeats while it processes the item; if the worker dies, the lease
+    expires and another worker claims the item again.
+    """
+
+    def enqueue(self, paths: List[str], predicted_seconds: Optional[List[float]] = None) -> int:
+        """
+        Add documents to the queue, skipping paths that are already queued
+
+        Every item gets a document ID unique within the queue, so documents with the
+        same file name in different directories do not overwrite each other's outputs.
+        Items with the longest predicted processing time are claimed first.
+
+        Args:
+            paths: Absolute paths of the documents, readable from every worker
+            predicted_seconds: Predicted processing time of each document, from the cost model
+
+        Returns:
+            Number of documents added
+        """
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[WorkItem]:
+        """
+        Lease the next pending item, or an item whose lease has expired
+
+        Args:
+            worker_id: ID of the claiming worker
+            lease_seconds: Duration of the lease
+
+        Returns:
+            The leased item, or None if no item is available
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, item_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease held by a worker
+
+        Args:
+            item_id: ID of the leased item
+            worker_id: ID of the worker holding the lease
+            lease_seconds: New duration of the lease, from now
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        raise NotImplementedError
+
+    def complete(self, item_id: int, worker_id: str) -> bool:
+        """
+        Mark a leased item as done
+
+        Args:
+            item_id: ID of the leased item
+            worker_id: ID of the worker holding the lease
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def fail(self, item_id: int, worker_id: str, error: str) -> bool:
+        """
+        Release a leased item after a failed attempt
+
+        The item is retried until it has used up its attempts, then marked as failed.
+
+        Args:
+            item_id: ID of the leased item
+            worker_id: ID of the worker holding the lease
+            error: Description of the failure
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def release(self, item_id: int, worker_id: str) -> bool:
+        """
+        Return a leased item to the queue without counting the attempt
+
+        Used for documents that could not be processed because a remote service was
+        unavailable, which says nothing about the document itself. After MAX_RELEASES
+        releases the attempt counts, so an item that keeps being released is eventually
+        marked as failed like any other.
+
+        Args:
+            item_id: ID of the leased item
+            worker_id: ID of the worker holding the lease
+
+        Returns:
+            False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        """
+        Return items whose lease has expired to the pending state
+
+        Returns:
+            Number of items requeued
+        """
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of items in each status"""
+        raise NotImplementedError
+
+    def items(self, status: Optional[str] = None) -> List[WorkItem]:
+        """
+        Return the items of the queue
+
+        Args:
+            status: Only return items with this status
+
+        Returns:
+            List of items in queue order
+        """
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        """Return a short description of where the queue is stored"""
+        raise NotImplementedError
@@ -0,0 +1,48 @@
+"""
+Factory for work queue backends
+"""
+
+import os
+
+from .base import WorkQueue
+from .sqlite_queue import SQLiteWorkQueue
+
+# Available work queue backends
+WORK_QUEUE_BACKENDS = ("sqlite",)
+
+# Database file name of the SQLite backend inside the output directory
+SQLITE_QUEUE_FILENAME = "workqueue.db"
+
+
+def is_shared_output_dir(output_dir: str) -> bool:
+    """
+    Return whether an output directory is shared by distributed workers, i.e. holds a work queue
+
+    Databases in a shared output directory must use SQLite's rollback journal: WAL needs
+    shared memory, which only works for processes on one host and not over NFS.
+
+    Args:
+        output_dir: Output directory
+
+    Returns:
+        True if the directory holds a work queue database
+    """
+    return os.path.exists(os.path.join(output_dir, SQLITE_QUEUE_FILENAME))
+
+
+def create_work_queue(backend: str, output_dir: str, max_attempts: int = 3) -> WorkQueue:
+    """
+    Create a work queue
+
+    Args:
+        backend: Backend name ("sqlite" for a database file in the shared output directory)
+        output_dir: Output directory shared by all workers
+        max_attempts: Number of times an item is tried before it is marked as failed
+
+    Returns:
+        The work queue
+    """
+    if backend == "sqlite":
+        os.makedirs(output_dir, exist_ok=True)
+        return SQLiteWorkQueue(os.path.join(output_dir, SQLITE_QUEUE_FILENAME), max_attempts=max_attempts)
+    raise ValueError(f"Unknown work queue backend: {backend}. Choose one of: {', '.join(WORK_QUEUE_BACKENDS)}")
@@ -0,0 +1,222 @@
+"""
+SQLite work queue backend for workers sharing a filesystem
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .base import DONE, FAILED, LEASED, MAX_RELEASES, PENDING, WORK_STATUSES, WorkItem, WorkQueue
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    doc_id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires_at REAL,
+    error TEXT,
+    predicted_seconds REAL NOT NULL DEFAULT 0,
+    releases INTEGER NOT NULL DEFAULT 0,
+    created_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items (status, id);
+"""
+
+# Index a claim reads its next item from; created after older databases are migrated
+CLAIM_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_work_items_claim ON work_items (status, predicted_seconds DESC, id);
+"""
+
+# Columns added after the first release, with their types; older databases are migrated on open
+ADDED_COLUMNS = {
+    "predicted_seconds": "REAL NOT NULL DEFAULT 0",
+    "releases": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Columns of the work_items table that make up a WorkItem
+ITEM_COLUMNS = "id, path, doc_id, status, attempts, worker, lease_expires_at, error"
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue stored in a SQLite database on storage shared by all workers
+
+    Items are claimed longest-first by predicted processing time, then in queue order.
+
+    The database uses the rollback journal rather than WAL, because WAL needs shared
+    memory and does not work for processes on different hosts. Every state change runs
+    in an immediate transaction, so two workers can never lease the same item.
+    Lease expiry is compared against each worker's clock, so hosts should keep their
+    clocks synchronized (e.g. with NTP) well within the lease duration.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        """
+        Initialize the queue, creating the database if necessary
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_attempts: Number of times an item is tried before it is marked as failed
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(SCHEMA_SQL)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(work_items)")}
+            for column, column_type in ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE work_items ADD COLUMN {column} {column_type}")
+            # Databases that added predicted_seconds as nullable: claims order by it without COALESCE
+            with conn:
+                conn.execute("UPDATE work_items SET predicted_seconds = 0 WHERE predicted_seconds IS NULL")
+            conn.executescript(CLAIM_INDEX_SQL)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in an immediate transaction on a short-lived connection"""
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def enqueue(self, paths: List[str], predicted_seconds: Optional[List[float]] = None) -> int:
+        added = 0
+        now = time.time()
+        predicted_seconds = predicted_seconds or [None] * len(paths)
+        with self._transaction() as conn:
+            for path, predicted in zip(paths, predicted_seconds):
+                path = os.path.abspath(path)
+                if conn.execute("SELECT 1 FROM work_items WHERE path = ?", (path,)).fetchone():
+                    continue
+
+                doc_id = os.path.splitext(os.path.basename(path))[0]
+                if conn.execute("SELECT 1 FROM work_items WHERE doc_id = ?", (doc_id,)).fetchone():
+                    doc_id = f"{doc_id}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}"
+
+                conn.execute(
+                    "INSERT INTO work_items (path, doc_id, status, predicted_seconds, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, doc_id, PENDING, predicted or 0.0, now, now)
+                )
+                added += 1
+        return added
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[WorkItem]:
+        now = time.time()
+        with self._transaction() as conn:
+            # Items whose workers died on their last attempt are not retried
+            conn.execute(
+                "UPDATE work_items SET status = ?, worker = NULL, error = ?, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (FAILED, "Lease expired on the last attempt", now, LEASED, now, self.max_attempts)
+            )
+            # The first pending item is one entry of the claim index; expired leases are
+            # few (at most one per worker), so the two candidates are compared here
+            row = conn.execute(
+                "SELECT id FROM ("
+                "SELECT * FROM (SELECT id, predicted_seconds FROM work_items WHERE status = ? "
+                "ORDER BY predicted_seconds DESC, id LIMIT 1) "
+                "UNION ALL "
+                "SELECT * FROM (SELECT id, predicted_seconds FROM work_items WHERE status = ? AND lease_expires_at < ? "
+                "ORDER BY predicted_seconds DESC, id LIMIT 1)"
+                ") ORDER BY predicted_seconds DESC, id LIMIT 1",
+                (PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE work_items SET status = ?, worker = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (LEASED, worker_id, now + lease_seconds, now, row[0])
+            )
+            return self._item(conn.execute(f"SELECT {ITEM_COLUMNS} FROM work_items WHERE id = ?", (row[0],)).fetchone())
+
+    def heartbeat(self, item_id: int, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE work_items SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease_seconds, now, item_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def complete(self, item_id: int, worker_id: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE work_items SET status = ?, lease_expires_at = NULL, error = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, time.time(), item_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def fail(self, item_id: int, worker_id: str, error: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE work_items SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "worker = NULL, lease_expires_at = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, time.time(), item_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def release(self, item_id: int, worker_id: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE work_items SET "
+                "status = CASE WHEN releases >= ? AND attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN releases >= ? AND attempts >= ? THEN ? ELSE error END, "
+                "attempts = CASE WHEN releases >= ? THEN attempts ELSE attempts - 1 END, "
+                "releases = releases + 1, worker = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (MAX_RELEASES, self.max_attempts, FAILED, PENDING,
+                 MAX_RELEASES, self.max_attempts, "Service unavailable on every attempt",
+                 MAX_RELEASES, time.time(), item_id, worker_id, LEASED)
+            ).rowcount == 1
+
+    def requeue_expired(self) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE work_items SET status = ?, worker = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ?",
+                (PENDING, now, LEASED, now)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM work_items GROUP BY status").fetchall()
+        counts = dict.fromkeys(WORK_STATUSES, 0)
+        counts.update(dict(rows))
+        return counts
+
+    def items(self, status: Optional[str] = None) -> List[WorkItem]:
+        with self._transaction() as conn:
+            if status is None:
+                rows = conn.execute(f"SELECT {ITEM_COLUMNS} FROM work_items ORDER BY id").fetchall()
+            else:
+                rows = conn.execute(f"SELECT {ITEM_COLUMNS} FROM work_items WHERE status = ? ORDER BY id",
+                                    (status,)).fetchall()
+        return [self._item(row) for row in rows]
+
+    def describe(self) -> str:
+        return f"SQLite work queue {self.db_path}"
+
+    @staticmethod
+    def _item(row) -> WorkItem:
+        return WorkItem(*row)
@@ -0,0 +1,130 @@
+"""
+Worker loop that processes documents claimed from a work queue
+"""
+
+import os
+import socket
+import threading
+from typing import Optional, Tuple
+
+from ..document_processor import DocumentProcessor
+from ..utils.signals import drain_on_interrupt
+from .base import LEASED, PENDING, WorkItem, WorkQueue
+
+# Default lease duration; heartbeats renew it three times per lease
+DEFAULT_LEASE_SECONDS = 300
+
+# Seconds an idle worker waits before looking for work again
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def default_worker_id() -> str:
+    """Return an ID unique to this process across the hosts sharing a queue"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseHeartbeat:
+    """
+    Context manager that renews a lease in a background thread while the block runs
+    """
+
+    def __init__(self, queue: WorkQueue, item_id: int, worker_id: str, lease_seconds: float):
+        self.queue = queue
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{item_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.item_id, self.worker_id, self.lease_seconds):
+                    self.lost = True
+                    return
+            except Exception as e:
+                # A missed heartbeat is retried; the lease only expires after several
+                print(f"Warning: Could not renew the lease of work item {self.item_id}: {str(e)}")
+
+
+def _process_item(processor: DocumentProcessor, item: WorkItem) -> bool:
+    """Process a claimed document under the document ID assigned by the queue"""
+    original_name = os.path.basename(item.path)
+    if item.path.lower().endswith(".pdf"):
+        return processor.process_pdf(item.path, original_name=original_name, doc_id=item.doc_id)
+    if item.path.lower().endswith(".docx"):
+        return processor.process_docx(item.path, original_name=original_name, doc_id=item.doc_id)
+    print(f"Error: Unsupported file type: {item.path}")
+    return False
+
+
+def run_worker(processor: DocumentProcessor, queue: WorkQueue, worker_id: Optional[str] = None,
+               lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = DEFAULT_POLL_INTERVAL,
+               exit_when_empty: bool = True) -> Tuple[int, int]:
+    """
+    Claim and process documents from a work queue until it is empty or the worker is interrupted
+
+    The first Ctrl+C lets the current document finish and then stops the worker. A
+    processor created with resume=True continues documents whose previous worker died
+    from their last checkpoint. Documents parked because a remote service is unavailable
+    go back to the queue without using up an attempt, and the worker pauses until the
+    service's circuit breaker allows calls again.
+
+    Args:
+        processor: Document processor writing to the output directory shared by all workers
+        queue: Work queue to claim documents from
+        worker_id: ID of this worker (defaults to host name and process ID)
+        lease_seconds: Duration of each lease
+        poll_interval: Seconds to wait when no document is available
+        exit_when_empty: Stop once no document is pending or leased; otherwise keep polling
+
+    Returns:
+        Tuple containing (successful_count, failed_count) for this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    successful = 0
+    failed = 0
+    stop_requested = threading.Event()
+
+    with drain_on_interrupt(stop_requested, f"[{worker_id}] Interrupt received: finishing the current document, then stopping."):
+        while not stop_requested.is_set():
+            item = queue.claim(worker_id, lease_seconds)
+            if item is None:
+                counts = queue.counts()
+                if exit_when_empty and counts[PENDING] == 0 and counts[LEASED] == 0:
+                    break
+                # Documents leased by other workers may still come back if their leases expire
+                stop_requested.wait(poll_interval)
+                continue
+
+            print(f"\n[{worker_id}] Claimed {item.path} as {item.doc_id} (attempt {item.attempts})")
+            with LeaseHeartbeat(queue, item.id, worker_id, lease_seconds) as heartbeat:
+                success = _process_item(processor, item)
+
+            if heartbeat.lost:
+                print(f"[{worker_id}] Lost the lease of {item.doc_id}; leaving it to the worker that took it over")
+            elif item.doc_id in processor.parked:
+                # A remote service is down: give the document back and wait for the service to recover
+                breaker = processor.parked.pop(item.doc_id)
+                queue.release(item.id, worker_id)
+                wait = max(poll_interval, breaker.retry_in())
+                print(f"[{worker_id}] Released {item.doc_id} while {breaker.name} is unavailable, waiting {wait:.0f}s")
+                stop_requested.wait(wait)
+            elif success:
+                queue.complete(item.id, worker_id)
+                successful += 1
+            else:
+                queue.fail(item.id, worker_id, f"Processing failed on {worker_id}")
+                failed += 1
+
+    print(f"\n[{worker_id}] Stopped after {successful} successful and {failed} failed document(s)")
+    return successful, failed